@@ -10,13 +10,19 @@ import os
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from chemlambda import Graph, Simulator
+from chemlambda import Graph
+from chemlambda.cache import ReductionCache
 from church_encodings import (
-    church_numeral, church_add, church_multiply, church_successor
+    church_numeral, church_add, church_multiply, church_successor,
+    apply_church_function
 )
 from result_extractor import decode_church_numeral, extract_result
 
 
+# Shared normal-form cache; set CHEMLAMBDA_CACHE_DIR to also keep results on disk
+REDUCTION_CACHE = ReductionCache(directory=os.environ.get("CHEMLAMBDA_CACHE_DIR"))
+
+
 def compute_addition(m: int, n: int, max_steps: int = 1000) -> dict:
     """
     Compute m + n using Church numerals.
@@ -42,20 +48,20 @@ def compute_addition(m: int, n: int, max_steps: int = 1000) -> dict:
     # This is: add m n = (λm.λn.λf.λx.m f (n f x)) m n
     graph = apply_function_to_args(add_func, [m_church, n_church])
     
-    # Run simulation
-    simulator = Simulator(graph)
-    steps = simulator.run(max_steps=max_steps, random_order=False)
+    # Run simulation (or look up the normal form of an identical molecule)
+    final_graph, stats = REDUCTION_CACHE.reduce(graph, max_steps=max_steps)
     
     # Try to extract result
-    result_type, result_value = extract_result(simulator.graph)
+    result_type, result_value = extract_result(final_graph)
     
     return {
         "operation": f"{m} + {n}",
-        "steps": steps,
+        "steps": stats["steps"],
         "result_type": result_type,
         "result_value": result_value,
-        "final_graph": simulator.graph,
-        "stats": simulator.get_stats(),
+        "final_graph": final_graph,
+        "stats": stats,
+        "cached": stats["cached"],
     }
 
 
@@ -83,20 +89,20 @@ def compute_multiplication(m: int, n: int, max_steps: int = 1000) -> dict:
     # Apply multiplication function to m and n
     graph = apply_function_to_args(mult_func, [m_church, n_church])
     
-    # Run simulation
-    simulator = Simulator(graph)
-    steps = simulator.run(max_steps=max_steps, random_order=False)
+    # Run simulation (or look up the normal form of an identical molecule)
+    final_graph, stats = REDUCTION_CACHE.reduce(graph, max_steps=max_steps)
     
     # Try to extract result
-    result_type, result_value = extract_result(simulator.graph)
+    result_type, result_value = extract_result(final_graph)
     
     return {
         "operation": f"{m} * {n}",
-        "steps": steps,
+        "steps": stats["steps"],
         "result_type": result_type,
         "result_value": result_value,
-        "final_graph": simulator.graph,
-        "stats": simulator.get_stats(),
+        "final_graph": final_graph,
+        "stats": stats,
+        "cached": stats["cached"],
     }
 
 
@@ -122,20 +128,20 @@ def compute_successor(n: int, max_steps: int = 1000) -> dict:
     # Apply successor function to n
     graph = apply_function_to_args(succ_func, [n_church])
     
-    # Run simulation
-    simulator = Simulator(graph)
-    steps = simulator.run(max_steps=max_steps, random_order=False)
+    # Run simulation (or look up the normal form of an identical molecule)
+    final_graph, stats = REDUCTION_CACHE.reduce(graph, max_steps=max_steps)
     
     # Try to extract result
-    result_type, result_value = extract_result(simulator.graph)
+    result_type, result_value = extract_result(final_graph)
     
     return {
         "operation": f"succ({n})",
-        "steps": steps,
+        "steps": stats["steps"],
         "result_type": result_type,
         "result_value": result_value,
-        "final_graph": simulator.graph,
-        "stats": simulator.get_stats(),
+        "final_graph": final_graph,
+        "stats": stats,
+        "cached": stats["cached"],
     }
 
 
@@ -153,36 +159,7 @@ def apply_function_to_args(func_graph: Graph, arg_graphs: list) -> Graph:
     Returns:
         New graph with function applied to arguments
     """
-    # For now, create a simple merged graph
-    # In a full implementation, we'd properly merge and connect graphs
-    
-    result = Graph()
-    
-    # Copy function graph
-    func_start_id = result.next_node_id
-    func_node_map = {}
-    for node_id, node in func_graph.nodes.items():
-        new_id = result.add_node(node.node_type)
-        func_node_map[node_id] = new_id
-    
-    # Copy edges from function graph
-    for port1, port2 in func_graph.edges.items():
-        if port1.node_id in func_node_map and port2.node_id in func_node_map:
-            new_port1 = result.nodes[func_node_map[port1.node_id]].ports[port1.port_type]
-            new_port2 = result.nodes[func_node_map[port2.node_id]].ports[port2.port_type]
-            result.connect(new_port1, new_port2)
-    
-    # For each argument, create application nodes
-    # Connect function's output to application's left
-    # Connect argument to application's right
-    
-    # Simplified: assume function graph has an output port
-    # and we connect arguments via application nodes
-    
-    # This is a simplified version - full implementation would
-    # properly handle graph merging and beta reduction setup
-    
-    return result
+    return apply_church_function(func_graph, *arg_graphs)
 
 
 def run_arithmetic_example(name: str, operation_func, *args):
@@ -7,14 +7,16 @@ Run many simulations to evaluate high-order entropy with statistical significanc
 import sys
 import os
 import random
-import statistics
-from typing import List, Dict
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, List, Dict, Optional, Union
 from collections import defaultdict
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from chemlambda import Graph, NodeType, Simulator
+from chemlambda.stats import RunningStats
 
 # Import high_order_entropy functions
 import sys
@@ -29,17 +31,51 @@ from high_order_entropy import (
 )
 
 
+# Where each per-run value is summarized: (result section, key) -> (stats section, key)
+STAT_FIELDS = {
+    ('initial', 'node_entropy'): ('initial', 'node_entropy'),
+    ('initial', 'high_order_entropy'): ('initial', 'high_order_entropy'),
+    ('initial', 'synergistic'): ('initial', 'synergistic'),
+    ('final', 'node_entropy'): ('final', 'node_entropy'),
+    ('final', 'high_order_entropy'): ('final', 'high_order_entropy'),
+    ('final', 'synergistic'): ('final', 'synergistic'),
+    ('evolution', 'node_entropy_mean'): ('evolution', 'node_entropy'),
+    ('evolution', 'high_order_mean'): ('evolution', 'high_order_entropy'),
+    ('evolution', 'synergistic_mean'): ('evolution', 'synergistic'),
+    ('evolution', 'max_node_entropy'): ('maxima', 'node_entropy'),
+    ('evolution', 'max_high_order'): ('maxima', 'high_order_entropy'),
+    ('evolution', 'max_synergistic'): ('maxima', 'synergistic'),
+    (None, 'steps'): ('simulation', 'steps'),
+    (None, 'final_nodes'): ('simulation', 'final_nodes'),
+    (None, 'rounds'): ('simulation', 'rounds'),
+    (None, 'rewrites_per_round'): ('simulation', 'rewrites_per_round'),
+    (None, 'wall_time'): ('simulation', 'wall_time'),
+}
+
+# Metrics whose confidence intervals decide when an adaptive batch has converged
+CONVERGENCE_FIELDS = [target for target in STAT_FIELDS.values()
+                      if target[0] in ('initial', 'final', 'evolution', 'maxima')]
+
+
 class BatchEntropyAnalyzer:
-    """Run batch simulations to evaluate entropy with statistical significance"""
+    """
+    Run batch simulations to evaluate entropy with statistical significance
+    
+    Results are folded into running statistics as they arrive instead of
+    being kept, so memory stays constant however many runs a batch has,
+    and `summary` holds the statistics of the runs finished so far.
+    """
     
-    def __init__(self, num_runs: int = 100):
+    def __init__(self, num_runs: int = 100, max_workers: Optional[int] = None):
         self.num_runs = num_runs
-        self.results = []
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.summary: Dict[tuple, RunningStats] = {}  # (section, key) -> statistics
+        self.completed = 0  # Runs folded into summary
+        self.converged = False  # Whether the last adaptive batch met its target width
     
     def create_random_graph(self, num_pairs: int = 10, seed: int = None) -> Graph:
         """Create a random graph with multiple interaction sites"""
-        if seed is not None:
-            random.seed(seed)
+        rng = random.Random(seed) if seed is not None else random
         
         graph = Graph()
         pairs = []
@@ -57,8 +93,8 @@ class BatchEntropyAnalyzer:
             graph.connect(l_node.ports["left"], a_node.ports["middle"])
             
             # Randomly connect pairs to create high-order interactions
-            if i > 0 and random.random() < 0.3:  # 30% chance of connection
-                prev_a = graph.nodes[pairs[random.randint(0, i-1)][1]]
+            if i > 0 and rng.random() < 0.3:  # 30% chance of connection
+                prev_a = graph.nodes[pairs[rng.randint(0, i-1)][1]]
                 fo_id = graph.add_node(NodeType.FO)
                 fo = graph.nodes[fo_id]
                 graph.connect(prev_a.ports["middle"], fo.ports["middle"])
@@ -66,23 +102,34 @@ class BatchEntropyAnalyzer:
         
         return graph
     
-    def run_single_simulation(self, graph: Graph, max_steps: int = 50) -> Dict:
-        """Run a single simulation and collect entropy statistics"""
-        simulator = Simulator(graph.clone())
+    def run_single_simulation(self, graph: Graph, max_steps: int = 50,
+                              seed: Optional[int] = None, parallel: bool = False) -> Dict:
+        """
+        Run a single simulation and collect entropy statistics
+        
+        With parallel=True every step is a synchronous round of
+        non-conflicting rewrites (Simulator.parallel_step), and max_steps
+        bounds the number of rounds. wall_time covers the reduction and
+        its entropy tracking, not the initial and final analyses.
+        """
+        simulator = Simulator(graph.clone(), record_history=False, seed=seed)
         
         # Initial analysis
         initial_analysis = analyze_parallel_interactions(simulator.graph)
         
         # Track evolution
-        history = track_entropy_evolution(simulator, max_steps=max_steps)
+        start = time.perf_counter()
+        history = track_entropy_evolution(simulator, max_steps=max_steps, parallel=parallel)
+        wall_time = time.perf_counter() - start
+        rounds = len(history) - 1
         
         # Final analysis
         final_analysis = analyze_parallel_interactions(simulator.graph)
         
         # Collect statistics
-        node_entropies = [h['node_entropy'] for h in history]
-        high_order_entropies = [h['high_order_entropy'] for h in history]
-        synergistic_infos = [h['synergistic'] for h in history]
+        node_entropies = RunningStats(h['node_entropy'] for h in history)
+        high_order_entropies = RunningStats(h['high_order_entropy'] for h in history)
+        synergistic_infos = RunningStats(h['synergistic'] for h in history)
         
         return {
             'initial': {
@@ -98,109 +145,156 @@ class BatchEntropyAnalyzer:
                 'parallel_matches': final_analysis['parallel_matches'],
             },
             'evolution': {
-                'node_entropy_mean': statistics.mean(node_entropies) if node_entropies else 0,
-                'node_entropy_std': statistics.stdev(node_entropies) if len(node_entropies) > 1 else 0,
-                'high_order_mean': statistics.mean(high_order_entropies) if high_order_entropies else 0,
-                'high_order_std': statistics.stdev(high_order_entropies) if len(high_order_entropies) > 1 else 0,
-                'synergistic_mean': statistics.mean(synergistic_infos) if synergistic_infos else 0,
-                'synergistic_std': statistics.stdev(synergistic_infos) if len(synergistic_infos) > 1 else 0,
-                'max_node_entropy': max(node_entropies) if node_entropies else 0,
-                'max_high_order': max(high_order_entropies) if high_order_entropies else 0,
-                'max_synergistic': max(synergistic_infos) if synergistic_infos else 0,
+                'node_entropy_mean': node_entropies.mean,
+                'node_entropy_std': node_entropies.std,
+                'high_order_mean': high_order_entropies.mean,
+                'high_order_std': high_order_entropies.std,
+                'synergistic_mean': synergistic_infos.mean,
+                'synergistic_std': synergistic_infos.std,
+                'max_node_entropy': node_entropies.max,
+                'max_high_order': high_order_entropies.max,
+                'max_synergistic': synergistic_infos.max,
             },
-            'steps': len(history) - 1,
+            'steps': simulator.step_count,
+            'rounds': rounds,
+            'rewrites_per_round': simulator.step_count / rounds if rounds else 0.0,
+            'wall_time': wall_time,
             'final_nodes': len(simulator.graph.nodes),
         }
     
-    def run_batch(self, graph_template_func, num_runs: int = None, max_steps: int = 50) -> Dict:
-        """Run batch of simulations"""
-        if num_runs is None:
-            num_runs = self.num_runs
+    def add_result(self, result: Dict):
+        """Fold one run's result into the running statistics"""
+        for (section, key), target in STAT_FIELDS.items():
+            value = result[key] if section is None else result[section][key]
+            self.summary.setdefault(target, RunningStats()).add(value)
+        self.completed += 1
+    
+    def statistics(self) -> Dict:
+        """Statistics of the runs folded in so far, in the layout of aggregate_statistics()"""
+        stats = {'num_runs': self.completed, 'converged': self.converged}
+        for target in STAT_FIELDS.values():
+            section, key = target
+            running = self.summary.get(target, RunningStats())
+            stats.setdefault(section, {})[key] = running.as_dict()
+        return stats
+    
+    def reset(self):
+        """Forget the results folded in so far"""
+        self.summary = {}
+        self.completed = 0
+        self.converged = False
+    
+    def has_converged(self, target_width: Union[float, Dict[tuple, float]],
+                      confidence: float = 0.95) -> bool:
+        """
+        Whether every tracked metric's confidence interval is narrow enough
         
-        print(f"Running {num_runs} simulations...")
-        results = []
+        Args:
+            target_width: Maximum full width of the confidence interval of
+                the mean, either one width for all CONVERGENCE_FIELDS or a
+                width per (section, key) for the metrics to track
+            confidence: Confidence level of the intervals
+        """
+        if not isinstance(target_width, dict):
+            target_width = {target: target_width for target in CONVERGENCE_FIELDS}
+        for target, width in target_width.items():
+            running = self.summary.get(target)
+            if running is None or 2 * running.half_width(confidence) > width:
+                return False
+        return True
+    
+    def run_batch(self, graph_template_func, num_runs: int = None, max_steps: int = 50,
+                  processes: bool = True, parallel: bool = False,
+                  progress: Optional[Callable[[Dict], None]] = None,
+                  target_width: Optional[Union[float, Dict[tuple, float]]] = None,
+                  confidence: float = 0.95, min_runs: int = 30) -> Dict:
+        """
+        Run batch of simulations
         
-        for i in range(num_runs):
-            if (i + 1) % 10 == 0:
-                print(f"  Completed {i + 1}/{num_runs} simulations...")
-            
-            # Create graph (with different seed for each run)
-            graph = graph_template_func(seed=i)
-            
-            # Run simulation
-            result = self.run_single_simulation(graph, max_steps=max_steps)
-            results.append(result)
+        Graphs are built here and simulated in a process pool with at most
+        two runs per worker in flight, so neither graphs nor results pile
+        up. Run i uses seed i for both its graph and its rewrite order.
         
-        return self.aggregate_statistics(results)
-    
-    def aggregate_statistics(self, results: List[Dict]) -> Dict:
-        """Aggregate statistics across all runs"""
-        if not results:
-            return {}
+        With a target_width the batch is adaptive: it stops submitting runs
+        as soon as, after at least min_runs, every tracked metric's
+        confidence interval is narrower than the target (see
+        has_converged()). num_runs is then only the budget, and the
+        'converged' entry of the result says whether the target was met.
         
-        # Extract all values
-        initial_node_entropies = [r['initial']['node_entropy'] for r in results]
-        initial_high_order = [r['initial']['high_order_entropy'] for r in results]
-        initial_synergistic = [r['initial']['synergistic'] for r in results]
+        Args:
+            graph_template_func: Called as graph_template_func(seed=i)
+            num_runs: Number of runs, or the budget if adaptive
+                (defaults to self.num_runs)
+            max_steps: Maximum steps (rounds, if parallel) per run
+            parallel: Reduce with synchronous parallel rounds
+            processes: Use a process pool (False runs everything here)
+            progress: Called with the partial statistics every 10 runs
+            target_width: Confidence interval width to stop at
+            confidence: Confidence level of the intervals
+            min_runs: Runs before convergence is first checked, as the
+                intervals use a normal approximation
         
-        final_node_entropies = [r['final']['node_entropy'] for r in results]
-        final_high_order = [r['final']['high_order_entropy'] for r in results]
-        final_synergistic = [r['final']['synergistic'] for r in results]
+        Returns:
+            Aggregated statistics of the batch
+        """
+        if num_runs is None:
+            num_runs = self.num_runs
         
-        evolution_node_mean = [r['evolution']['node_entropy_mean'] for r in results]
-        evolution_high_order_mean = [r['evolution']['high_order_mean'] for r in results]
-        evolution_synergistic_mean = [r['evolution']['synergistic_mean'] for r in results]
+        print(f"Running {num_runs} simulations...")
+        self.reset()
         
-        max_node_entropies = [r['evolution']['max_node_entropy'] for r in results]
-        max_high_order = [r['evolution']['max_high_order'] for r in results]
-        max_synergistic = [r['evolution']['max_synergistic'] for r in results]
+        def finished(result, done):
+            self.add_result(result)
+            if done % 10 == 0:
+                print(f"  Completed {done}/{num_runs} simulations...")
+                if progress is not None:
+                    progress(self.statistics())
+            if target_width is not None and done >= min_runs and not self.converged:
+                self.converged = self.has_converged(target_width, confidence)
+                if self.converged:
+                    print(f"  Converged after {done} simulations")
         
-        steps = [r['steps'] for r in results]
-        final_nodes = [r['final_nodes'] for r in results]
+        if not processes or self.max_workers == 1:
+            for i in range(num_runs):
+                if self.converged:
+                    break
+                # Create graph (with different seed for each run)
+                graph = graph_template_func(seed=i)
+                finished(self.run_single_simulation(graph, max_steps, i, parallel), i + 1)
+            return self.statistics()
         
-        def stats(values):
-            if not values:
-                return {'mean': 0, 'std': 0, 'min': 0, 'max': 0, 'median': 0}
-            return {
-                'mean': statistics.mean(values),
-                'std': statistics.stdev(values) if len(values) > 1 else 0,
-                'min': min(values),
-                'max': max(values),
-                'median': statistics.median(values),
-            }
+        done = 0
+        with ProcessPoolExecutor(self.max_workers) as executor:
+            pending = set()
+            for i in range(num_runs):
+                if len(pending) >= 2 * self.max_workers:
+                    completed, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in completed:
+                        done += 1
+                        finished(future.result(), done)
+                if self.converged:
+                    # Runs already in flight are still folded in below
+                    break
+                pending.add(executor.submit(self.run_single_simulation,
+                                            graph_template_func(seed=i), max_steps, i, parallel))
+            for future in pending:
+                done += 1
+                finished(future.result(), done)
         
-        return {
-            'num_runs': len(results),
-            'initial': {
-                'node_entropy': stats(initial_node_entropies),
-                'high_order_entropy': stats(initial_high_order),
-                'synergistic': stats(initial_synergistic),
-            },
-            'final': {
-                'node_entropy': stats(final_node_entropies),
-                'high_order_entropy': stats(final_high_order),
-                'synergistic': stats(final_synergistic),
-            },
-            'evolution': {
-                'node_entropy': stats(evolution_node_mean),
-                'high_order_entropy': stats(evolution_high_order_mean),
-                'synergistic': stats(evolution_synergistic_mean),
-            },
-            'maxima': {
-                'node_entropy': stats(max_node_entropies),
-                'high_order_entropy': stats(max_high_order),
-                'synergistic': stats(max_synergistic),
-            },
-            'simulation': {
-                'steps': stats(steps),
-                'final_nodes': stats(final_nodes),
-            },
-        }
+        return self.statistics()
+    
+    def aggregate_statistics(self, results: List[Dict]) -> Dict:
+        """Aggregate statistics across a list of results"""
+        self.reset()
+        for result in results:
+            self.add_result(result)
+        return self.statistics()
     
     def print_statistics(self, stats: Dict):
         """Print aggregated statistics"""
         print("\n" + "=" * 70)
-        print(f"Batch Analysis Results ({stats['num_runs']} runs)")
+        print(f"Batch Analysis Results ({stats['num_runs']} runs"
+              f"{', converged' if stats.get('converged') else ''})")
         print("=" * 70)
         
         print("\nInitial State:")
@@ -224,7 +318,10 @@ class BatchEntropyAnalyzer:
         print(f"  Synergistic Info:   {stats['maxima']['synergistic']['mean']:.4f} ± {stats['maxima']['synergistic']['std']:.4f}")
         
         print("\nSimulation Statistics:")
-        print(f"  Steps:             {stats['simulation']['steps']['mean']:.1f} ± {stats['simulation']['steps']['std']:.1f}")
+        print(f"  Steps (rewrites):  {stats['simulation']['steps']['mean']:.1f} ± {stats['simulation']['steps']['std']:.1f}")
+        print(f"  Rounds:            {stats['simulation']['rounds']['mean']:.1f} ± {stats['simulation']['rounds']['std']:.1f}")
+        print(f"  Rewrites/Round:    {stats['simulation']['rewrites_per_round']['mean']:.2f} ± {stats['simulation']['rewrites_per_round']['std']:.2f}")
+        print(f"  Wall Time (ms):    {1000 * stats['simulation']['wall_time']['mean']:.2f} ± {1000 * stats['simulation']['wall_time']['std']:.2f}")
         print(f"  Final Nodes:       {stats['simulation']['final_nodes']['mean']:.1f} ± {stats['simulation']['final_nodes']['std']:.1f}")
         
         # Changes
@@ -275,9 +372,8 @@ def compare_sequential_vs_parallel_batch(num_runs: int = 50):
     seq_stats = analyzer.run_batch(create_graph, num_runs=num_runs, max_steps=30)
     
     print("\nRunning parallel simulations...")
-    # For parallel, we'd need to modify the simulation to use parallel rewrites
-    # For now, use same graph but note the difference
-    par_stats = analyzer.run_batch(create_graph, num_runs=num_runs, max_steps=30)
+    # Each step is a synchronous round of non-conflicting rewrites
+    par_stats = analyzer.run_batch(create_graph, num_runs=num_runs, max_steps=30, parallel=True)
     
     print("\n" + "=" * 70)
     print("Sequential Results:")
@@ -296,6 +392,11 @@ def compare_sequential_vs_parallel_batch(num_runs: int = 50):
           f"{par_stats['final']['high_order_entropy']['mean'] - seq_stats['final']['high_order_entropy']['mean']:+.4f}")
     print(f"Synergistic Info Difference: "
           f"{par_stats['final']['synergistic']['mean'] - seq_stats['final']['synergistic']['mean']:+.4f}")
+    seq_sim, par_sim = seq_stats['simulation'], par_stats['simulation']
+    print(f"Rounds: {seq_sim['rounds']['mean']:.1f} sequential vs {par_sim['rounds']['mean']:.1f} parallel "
+          f"({par_sim['rewrites_per_round']['mean']:.2f} rewrites per parallel round)")
+    print(f"Wall time per run: {1000 * seq_sim['wall_time']['mean']:.2f} ms sequential vs "
+          f"{1000 * par_sim['wall_time']['mean']:.2f} ms parallel")
 
 
 def main():
@@ -337,6 +438,9 @@ if __name__ == "__main__":
     parser.add_argument('--runs', type=int, default=100, help='Number of simulation runs')
     parser.add_argument('--steps', type=int, default=50, help='Max steps per simulation')
     parser.add_argument('--pairs', type=int, default=10, help='Number of lambda-application pairs')
+    parser.add_argument('--target-width', type=float, default=None,
+                        help='Stop once every entropy metric has a 95%% confidence interval '
+                             'narrower than this (--runs becomes the budget)')
     
     args = parser.parse_args()
     
@@ -346,6 +450,7 @@ if __name__ == "__main__":
         return analyzer.create_random_graph(num_pairs=args.pairs, seed=seed)
     
     print(f"Running {args.runs} simulations with {args.pairs} pairs, max {args.steps} steps each...")
-    stats = analyzer.run_batch(create_graph, num_runs=args.runs, max_steps=args.steps)
+    stats = analyzer.run_batch(create_graph, num_runs=args.runs, max_steps=args.steps,
+                               target_width=args.target_width)
     analyzer.print_statistics(stats)
 
@@ -15,7 +15,7 @@ from church_encodings import (
     church_numeral, church_boolean, church_add, church_multiply, church_successor
 )
 from result_extractor import extract_result, graph_structure_summary
-from lambda_compiler import compile_lambda_string, parse_lambda_term
+from lambda_compiler import compile_lambda_string, parse_lambda_term, graph_to_lambda, to_de_bruijn
 from arithmetic_examples import compute_addition, compute_multiplication, compute_successor
 
 
@@ -255,6 +255,8 @@ class ComputationExplorer:
         """Show computation result details"""
         print(f"\nOperation: {result.get('operation', 'N/A')}")
         print(f"Steps: {result.get('steps', 'N/A')}")
+        if result.get('cached'):
+            print("(normal form reused from the reduction cache)")
         
         stats = result.get('stats', {})
         print(f"\nStatistics:")
@@ -264,6 +266,11 @@ class ComputationExplorer:
         if stats.get('reaction_counts'):
             print(f"  Reaction counts: {stats['reaction_counts']}")
         
+        final_graph = result.get('final_graph')
+        term = graph_to_lambda(final_graph) if final_graph is not None else None
+        if term is not None:
+            print(f"\nNormal form: {to_de_bruijn(term)}")
+        
         result_type = result.get('result_type')
         result_value = result.get('result_value')
         if result_type:
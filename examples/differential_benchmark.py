@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Differential Benchmark
+Runs the Church arithmetic suite on chemlambda and on the reference evaluator
+"""
+
+import sys
+import os
+import time
+import tracemalloc
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from chemlambda import Simulator
+from lambda_compiler import compile_lambda_string, graph_to_lambda, to_de_bruijn
+from reference_evaluator import evaluate
+from result_extractor import church_numeral_value
+
+
+def numeral(n: int) -> str:
+    """Church numeral n as a lambda term string"""
+    if n == 0:
+        return "(λf.λx.x)"
+    return "(λf.λx." + "f (" * (n - 1) + "f x" + ")" * (n - 1) + ")"
+
+
+SUCC = "(λn.λf.λx.f (n f x))"
+ADD = "(λm.λn.λf.λx.m f (n f x))"
+MUL = "(λm.λn.λf.m (n f))"
+EXP = "(λm.λn.n m)"
+PRED = "(λn.λf.λx.n (λg.λh.h (g f)) (λu.x) (λu.u))"
+PAIR = "(λa.λb.λs.s a b)"
+FST = "(λp.p (λa.λb.a))"
+SND = "(λp.p (λa.λb.b))"
+
+# n! by iterating (k, k!) → (k + 1, (k + 1) * k!) n times from (0, 1)
+FACT = (f"(λn.{SND} (n (λq.{PAIR} ({SUCC} ({FST} q)) ({MUL} ({SUCC} ({FST} q)) ({SND} q)))"
+        f" ({PAIR} {numeral(0)} {numeral(1)})))")
+
+SUITE = [
+    ("add 2 3", f"{ADD} {numeral(2)} {numeral(3)}", 5),
+    ("add 5 7", f"{ADD} {numeral(5)} {numeral(7)}", 12),
+    ("mul 2 3", f"{MUL} {numeral(2)} {numeral(3)}", 6),
+    ("mul 4 5", f"{MUL} {numeral(4)} {numeral(5)}", 20),
+    ("exp 2 3", f"{EXP} {numeral(2)} {numeral(3)}", 8),
+    ("exp 3 2", f"{EXP} {numeral(3)} {numeral(2)}", 9),
+    ("pred 1", f"{PRED} {numeral(1)}", 0),
+    ("pred 4", f"{PRED} {numeral(4)}", 3),
+    ("fact 2", f"{FACT} {numeral(2)}", 2),
+    ("fact 3", f"{FACT} {numeral(3)}", 6),
+]
+
+# Workloads where chemlambda is known not to reach the reference result,
+# with the reason; they are reported as expected failures
+KNOWN_FAILURES = {
+    "fact 2": "ends in an FOE-FOE sharing loop that no move rewrites",
+    "fact 3": "ends in an FOE-FOE sharing loop that no move rewrites",
+}
+
+
+def run_chemlambda(term_str: str, max_steps: int) -> dict:
+    """Reduce a term with chemlambda and read the result back"""
+    start = time.perf_counter()
+    graph = compile_lambda_string(term_str)
+    simulator = Simulator(graph, record_history=False)
+    steps = simulator.run(max_steps=max_steps, random_order=False)
+    term = graph_to_lambda(simulator.graph)
+    elapsed = time.perf_counter() - start
+    return {
+        "steps": steps,
+        "time": elapsed,
+        "term": term,
+        "de_bruijn": to_de_bruijn(term) if term is not None else None,
+        "nodes": len(simulator.graph.nodes),
+    }
+
+
+def run_reference(term_str: str, max_steps: int) -> dict:
+    """Normalize a term with the reference evaluator"""
+    start = time.perf_counter()
+    result = evaluate(term_str, max_steps=max_steps)
+    result["time"] = time.perf_counter() - start
+    return result
+
+
+def peak_memory(func, *args) -> int:
+    """Peak traced allocation in bytes while running func(*args)"""
+    tracemalloc.start()
+    try:
+        func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def benchmark(max_steps: int = 20000, measure_memory: bool = True) -> list:
+    """
+    Run every workload on both engines.
+
+    Wall time and peak memory are measured in separate runs, since
+    tracemalloc slows allocation-heavy code down.
+
+    Args:
+        max_steps: Step limit for each engine
+        measure_memory: Also measure peak memory with tracemalloc
+
+    Returns:
+        List of result dictionaries, one per workload
+    """
+    rows = []
+    for name, term_str, expected in SUITE:
+        graph_run = run_chemlambda(term_str, max_steps)
+        reference_run = run_reference(term_str, max_steps)
+
+        row = {
+            "name": name,
+            "expected": expected,
+            "chemlambda_steps": graph_run["steps"],
+            "chemlambda_time": graph_run["time"],
+            "chemlambda_value": church_numeral_value(graph_run["term"]),
+            "reference_steps": reference_run["steps"],
+            "reference_time": reference_run["time"],
+            "reference_value": church_numeral_value(reference_run["term"]),
+            "agree": graph_run["de_bruijn"] == reference_run["de_bruijn"],
+            "known_failure": KNOWN_FAILURES.get(name),
+        }
+        if measure_memory:
+            row["chemlambda_peak"] = peak_memory(run_chemlambda, term_str, max_steps)
+            row["reference_peak"] = peak_memory(run_reference, term_str, max_steps)
+        rows.append(row)
+    return rows
+
+
+def main():
+    """Print the differential benchmark table"""
+    print("=" * 78)
+    print("Differential Benchmark: chemlambda vs reference evaluator")
+    print("=" * 78)
+    print()
+    print(f"{'Workload':<10} {'Value':>5} | {'Graph steps':>11} {'ms':>8} {'KiB':>7} | "
+          f"{'Beta steps':>10} {'ms':>8} {'KiB':>7} | Agree")
+    print("-" * 78)
+
+    rows = benchmark()
+    for row in rows:
+        value = row["chemlambda_value"]
+        passed = row["agree"] and value == row["expected"]
+        if row["known_failure"]:
+            verdict = "xpass" if passed else "xfail"
+        else:
+            verdict = "✓" if passed else "✗"
+        print(f"{row['name']:<10} {str(value):>5} | "
+              f"{row['chemlambda_steps']:>11} {row['chemlambda_time'] * 1000:>8.1f} "
+              f"{row['chemlambda_peak'] / 1024:>7.0f} | "
+              f"{row['reference_steps']:>10} {row['reference_time'] * 1000:>8.1f} "
+              f"{row['reference_peak'] / 1024:>7.0f} | "
+              f"{verdict}")
+
+    print()
+    print("Graph steps count every chemlambda rewrite except the COMB clean-up;")
+    print("beta steps are normal-order contractions. Results are compared by")
+    print("reading the chemlambda graph back to a de Bruijn term.")
+    known = [row for row in rows if row["known_failure"]]
+    if known:
+        print()
+        print("Expected failures (xfail):")
+        for row in known:
+            print(f"  {row['name']}: {row['known_failure']}")
+    print("=" * 78)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,7 +11,7 @@ synergistic effects among multiple components.
 import sys
 import os
 import math
-from typing import Dict, List, Set, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 from collections import defaultdict
 
 # Add src to path
@@ -23,6 +23,9 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 from alife.quine_detector import find_non_conflicting_matches
 from chemlambda.reactions import ALL_REACTIONS
+from chemlambda.entropy import EntropyTracker
+from chemlambda.trajectory import TrajectoryWriter
+from chemlambda.motifs import MotifCensus
 
 
 def compute_graph_entropy(graph: Graph) -> float:
@@ -58,20 +61,31 @@ def compute_graph_entropy(graph: Graph) -> float:
     return entropy
 
 
-def compute_interaction_entropy(graph: Graph, order: int = 2) -> float:
+def compute_interaction_entropy(graph: Graph, order: int = 2, method: str = "matches") -> float:
     """
     Compute high-order interaction entropy.
     
     For order=2: pairwise interactions (traditional)
     For order>2: multi-way interactions (high-order)
     
+    With method="matches" the interactions are the node sets of reaction
+    matches with at least `order` nodes; few moves involve three nodes, so
+    order 3 is usually empty. With method="motifs" they are all connected
+    subgraphs of exactly `order` nodes, classified by port-labelled motif
+    (see compute_motif_entropy).
+    
     Args:
         graph: The graph to analyze
         order: Order of interactions to consider (2=pairwise, 3=triplets, etc.)
+        method: "matches" or "motifs"
     
     Returns:
         High-order interaction entropy
     """
+    if method == "motifs":
+        return compute_motif_entropy(graph, sizes=(order,))[order]
+    if method != "matches":
+        raise ValueError(f"Unknown interaction entropy method: {method}")
     if len(graph.nodes) < order:
         return 0.0
     
@@ -86,7 +100,7 @@ def compute_interaction_entropy(graph: Graph, order: int = 2) -> float:
     
     # Find all possible reaction matches
     for reaction in ALL_REACTIONS:
-        matches = reaction.can_apply(graph)
+        matches = graph.matches(reaction)
         for match in matches:
             # Extract nodes involved in this match
             nodes_in_match = set()
@@ -119,6 +133,25 @@ def compute_interaction_entropy(graph: Graph, order: int = 2) -> float:
     return entropy
 
 
+def compute_motif_entropy(graph: Graph, sizes: Tuple[int, ...] = (2, 3, 4)) -> Dict[int, float]:
+    """
+    Compute the entropy of the motif distribution for each subgraph size.
+    
+    Every connected subgraph of a given size is an interaction among that
+    many nodes; its motif is its shape up to isomorphism (node types and
+    which ports are connected). All sizes come from one census.
+    
+    Args:
+        graph: The graph to analyze
+        sizes: Subgraph sizes (2=pairs, 3=triplets, 4=quadruplets)
+    
+    Returns:
+        Motif entropy for each size
+    """
+    census = MotifCensus(graph, max_size=max(sizes))
+    return {size: census.entropy(size) for size in sizes}
+
+
 def compute_synergistic_information(graph: Graph) -> float:
     """
     Compute synergistic information: information that emerges from
@@ -175,6 +208,7 @@ def analyze_parallel_interactions(graph: Graph) -> Dict:
     pairwise_entropy = compute_interaction_entropy(graph, order=2)
     high_order_entropy = compute_interaction_entropy(graph, order=3)
     synergistic_info = compute_synergistic_information(graph)
+    motif_entropy = compute_motif_entropy(graph)
     
     return {
         "parallel_matches": len(matches),
@@ -183,11 +217,14 @@ def analyze_parallel_interactions(graph: Graph) -> Dict:
         "pairwise_entropy": pairwise_entropy,
         "high_order_entropy": high_order_entropy,
         "synergistic_information": synergistic_info,
+        "motif_entropy": motif_entropy,
         "parallelism_ratio": len(matches) / len(graph.nodes) if len(graph.nodes) > 0 else 0.0,
     }
 
 
-def track_entropy_evolution(simulator: Simulator, max_steps: int = 50) -> List[Dict]:
+def track_entropy_evolution(simulator: Simulator, max_steps: int = 50,
+                            parallel: bool = False,
+                            writer: Optional[TrajectoryWriter] = None) -> List[Dict]:
     """
     Track how entropy evolves during graph reduction.
     
@@ -197,39 +234,47 @@ def track_entropy_evolution(simulator: Simulator, max_steps: int = 50) -> List[D
     Args:
         simulator: Simulator with graph
         max_steps: Maximum steps to track
+        parallel: Take synchronous rounds of non-conflicting rewrites
+            (Simulator.parallel_step) instead of single rewrites
+        writer: Stream each step to this TrajectoryWriter instead of
+            collecting it, for runs too long to keep as dicts
     
     Returns:
-        List of entropy measurements at each step
+        List of entropy measurements at each step (round, if parallel),
+        empty if a writer is given
     """
     history = []
     
-    initial_entropy = compute_graph_entropy(simulator.graph)
-    initial_high_order = compute_interaction_entropy(simulator.graph, order=3)
-    
-    history.append({
-        "step": 0,
-        "node_entropy": initial_entropy,
-        "high_order_entropy": initial_high_order,
-        "synergistic": compute_synergistic_information(simulator.graph),
-        "nodes": len(simulator.graph.nodes),
-    })
+    # Histograms updated from the nodes each step touched, instead of
+    # re-running every reaction's can_apply() three times per step
+    tracker = EntropyTracker(simulator.graph, ALL_REACTIONS)
+    
+    def record(step):
+        if writer is not None:
+            reaction = simulator.reaction_history[-1][1] if step else ""
+            writer.write(step, reaction, len(simulator.graph.nodes), len(simulator.graph.edges) // 2,
+                         tracker.node_entropy(), tracker.interaction_entropy(3),
+                         tracker.synergistic_information())
+            return
+        history.append({
+            "step": step,
+            "node_entropy": tracker.node_entropy(),
+            "high_order_entropy": tracker.interaction_entropy(3),
+            "synergistic": tracker.synergistic_information(),
+            "nodes": len(simulator.graph.nodes),
+        })
     
+    record(0)
     for step in range(max_steps):
-        applied = simulator.step(random_order=True)
+        if parallel:
+            applied = simulator.parallel_step(random_order=True)
+        else:
+            applied = simulator.step(random_order=True)
         if not applied:
             break
         
-        entropy = compute_graph_entropy(simulator.graph)
-        high_order = compute_interaction_entropy(simulator.graph, order=3)
-        synergistic = compute_synergistic_information(simulator.graph)
-        
-        history.append({
-            "step": step + 1,
-            "node_entropy": entropy,
-            "high_order_entropy": high_order,
-            "synergistic": synergistic,
-            "nodes": len(simulator.graph.nodes),
-        })
+        tracker.update(simulator.last_touched)
+        record(step + 1)
     
     return history
 
@@ -291,6 +336,8 @@ def demonstrate_high_order_entropy():
     print(f"  Pairwise interaction entropy: {analysis['pairwise_entropy']:.4f}")
     print(f"  High-order interaction entropy (order 3): {analysis['high_order_entropy']:.4f}")
     print(f"  Synergistic information: {analysis['synergistic_information']:.4f}")
+    print("  Motif entropy (connected subgraphs by shape): " +
+          ", ".join(f"{size} nodes {value:.4f}" for size, value in analysis['motif_entropy'].items()))
     
     # Track entropy evolution
     print("\n" + "-" * 70)
@@ -376,6 +423,11 @@ def compare_sequential_vs_parallel_entropy():
     print(f"  Before: High-order entropy = {seq_analysis_before['high_order_entropy']:.4f}")
     print(f"  After:  High-order entropy = {seq_analysis_after['high_order_entropy']:.4f}")
     
+    # The causal DAG shows how many of those steps could have run at once
+    profile = seq_sim.get_parallelism_profile()
+    print(f"  Work = {profile['work']} rewrites, span = {profile['span']} "
+          f"(parallelism {profile['parallelism']:.1f})")
+    
     # Parallel reduction (all at once)
     print("\nParallel Reduction:")
     par_graph = graph2.clone()
@@ -394,8 +446,8 @@ def compare_sequential_vs_parallel_entropy():
     
     print("\n" + "-" * 70)
     print("Comparison:")
-    print(f"  Sequential synergistic info: {seq_analysis_after['synergistic']:.4f}")
-    print(f"  Parallel synergistic info:   {par_analysis_after['synergistic']:.4f}")
+    print(f"  Sequential synergistic info: {seq_analysis_after['synergistic_information']:.4f}")
+    print(f"  Parallel synergistic info:   {par_analysis_after['synergistic_information']:.4f}")
     print("\nParallel systems show higher synergistic information due to")
     print("simultaneous multi-way interactions that create emergent effects.")
     print("-" * 70)
@@ -11,8 +11,8 @@ import re
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from chemlambda import Graph, NodeType
-from typing import Optional, Dict, List
+from chemlambda import Graph, NodeType, Port
+from typing import Optional, Dict, List, Tuple
 
 
 class LambdaTerm:
@@ -27,13 +27,53 @@ class LambdaTerm:
         self.arg = kwargs.get('arg')
     
     def __repr__(self):
-        if self.term_type == 'var':
-            return self.value
-        elif self.term_type == 'abs':
-            return f"λ{self.var}.{self.body}"
-        elif self.term_type == 'app':
-            return f"({self.func} {self.arg})"
-        return str(self.value)
+        # Iterative so that very deep terms can still be printed
+        parts = []
+        work = [self]
+        while work:
+            item = work.pop()
+            if isinstance(item, str):
+                parts.append(item)
+            elif item.term_type == 'var':
+                parts.append(item.value)
+            elif item.term_type == 'abs':
+                parts.append(f"λ{item.var}.")
+                work.append(item.body)
+            elif item.term_type == 'app':
+                if item.func.term_type == 'abs':
+                    # (λx.M N) would read as λx.(M N)
+                    work.extend([")", item.arg, " ", ")", item.func])
+                    parts.append("((")
+                else:
+                    work.extend([")", item.arg, " ", item.func])
+                    parts.append("(")
+            else:
+                parts.append(str(item.value))
+        return "".join(parts)
+
+
+_TOKEN_RE = re.compile(r"\s*(?:([λ\\])|([a-zA-Z_][a-zA-Z0-9_']*)|([.()])|(\S))")
+
+
+def tokenize_lambda_term(term: str) -> List[str]:
+    """
+    Split a lambda term into tokens: "λ" (or "\\"), identifiers, ".", "(" and ")".
+    
+    A single regular expression scan, so the cost is linear in the length
+    of the term.
+    """
+    tokens = []
+    for match in _TOKEN_RE.finditer(term):
+        lam, name, punct, bad = match.groups()
+        if bad is not None:
+            raise ValueError(f"Unexpected character {bad!r} at {match.start(4)} in lambda term")
+        if lam is not None:
+            tokens.append("λ")
+        elif name is not None:
+            tokens.append(name)
+        elif punct is not None:
+            tokens.append(punct)
+    return tokens
 
 
 def parse_lambda_term(term: str) -> LambdaTerm:
@@ -42,8 +82,13 @@ def parse_lambda_term(term: str) -> LambdaTerm:
     
     Supports:
     - Variables: x, y, z, etc.
-    - Abstractions: λx.M or \\x.M
-    - Applications: M N or (M N)
+    - Abstractions: λx.M or \\x.M (λx y.M is shorthand for λx.λy.M)
+    - Applications: M N or (M N), left associative
+    
+    The body of an abstraction extends as far right as possible. Parsing
+    is a single left-to-right pass over the tokens with an explicit stack
+    of open frames (parentheses and abstractions), so it runs in linear
+    time and nesting depth is not limited by Python recursion.
     
     Args:
         term: Lambda calculus term as string
@@ -51,69 +96,134 @@ def parse_lambda_term(term: str) -> LambdaTerm:
     Returns:
         Parsed LambdaTerm object
     """
-    term = term.strip()
-    
-    # Remove outer parentheses if present
-    while term.startswith('(') and term.endswith(')'):
-        # Check if parentheses are balanced
-        count = 0
-        balanced = True
-        for i, char in enumerate(term):
-            if char == '(':
-                count += 1
-            elif char == ')':
-                count -= 1
-                if count == 0 and i < len(term) - 1:
-                    balanced = False
-                    break
-        if balanced:
-            term = term[1:-1].strip()
+    tokens = tokenize_lambda_term(term)
+    
+    # A frame is [kind, bound variable, application built so far]
+    # with kind 'top', 'paren' or 'abs'
+    stack = [['top', None, None]]
+    
+    def close_frame() -> LambdaTerm:
+        kind, var, acc = stack.pop()
+        if acc is None:
+            raise ValueError(f"Could not parse lambda term: missing body in {term!r}")
+        if kind == 'abs':
+            return LambdaTerm('abs', var=var, body=acc)
+        return acc
+    
+    def push_operand(operand: LambdaTerm):
+        frame = stack[-1]
+        if frame[2] is None:
+            frame[2] = operand
+        else:
+            frame[2] = LambdaTerm('app', func=frame[2], arg=operand)
+    
+    i = 0
+    n = len(tokens)
+    while i < n:
+        token = tokens[i]
+        
+        if token == "λ":
+            # Read binders up to the dot
+            i += 1
+            binders = []
+            while i < n and tokens[i] not in ("λ", ".", "(", ")"):
+                binders.append(tokens[i])
+                i += 1
+            if not binders or i == n or tokens[i] != ".":
+                raise ValueError(f"Could not parse lambda term: bad abstraction in {term!r}")
+            for var in binders:
+                stack.append(['abs', var, None])
+        
+        elif token == "(":
+            stack.append(['paren', None, None])
+        
+        elif token == ")":
+            while stack[-1][0] == 'abs':
+                push_operand(close_frame())
+            if stack[-1][0] != 'paren':
+                raise ValueError(f"Could not parse lambda term: unbalanced ')' in {term!r}")
+            push_operand(close_frame())
+        
+        elif token == ".":
+            raise ValueError(f"Could not parse lambda term: unexpected '.' in {term!r}")
+        
+        else:
+            push_operand(LambdaTerm('var', value=token))
+        
+        i += 1
+    
+    while len(stack) > 1:
+        if stack[-1][0] == 'paren':
+            raise ValueError(f"Could not parse lambda term: unbalanced '(' in {term!r}")
+        push_operand(close_frame())
+    
+    return close_frame()
+
+
+def _count_variable_uses(term: LambdaTerm) -> Tuple[List[int], Dict[str, int]]:
+    """
+    Count how often each binder and each free variable is used.
+    
+    Binders are numbered in the order compile_to_graph meets them, so the
+    counts line up with the allocation pass without keying on term identity
+    (the same LambdaTerm object may occur several times in a tree).
+    
+    Returns:
+        (uses per binder index, uses per free variable name)
+    """
+    binder_uses: List[int] = []
+    free_uses: Dict[str, int] = {}
+    scope: Dict[str, List[int]] = {}
+    work = [term]
+    
+    while work:
+        item = work.pop()
+        if isinstance(item, tuple):
+            # Leaving the scope of an abstraction
+            scope[item[1]].pop()
+            continue
+        
+        if item.term_type == 'var':
+            bound = scope.get(item.value)
+            if bound:
+                binder_uses[bound[-1]] += 1
+            else:
+                free_uses[item.value] = free_uses.get(item.value, 0) + 1
+        elif item.term_type == 'abs':
+            scope.setdefault(item.var, []).append(len(binder_uses))
+            binder_uses.append(0)
+            work.append(('exit', item.var))
+            work.append(item.body)
+        elif item.term_type == 'app':
+            work.append(item.arg)
+            work.append(item.func)
         else:
-            break
-    
-    # Try to parse abstraction: λx.M or \x.M
-    # Use raw string and escape backslash properly
-    abs_match = re.match(r'[λ\\]([a-zA-Z_][a-zA-Z0-9_]*)\.(.+)', term)
-    if abs_match:
-        var = abs_match.group(1)
-        body_str = abs_match.group(2)
-        body = parse_lambda_term(body_str)
-        return LambdaTerm('abs', var=var, body=body)
-    
-    # Try to parse application: M N
-    # Find the rightmost space that's not inside parentheses
-    paren_count = 0
-    split_pos = -1
-    for i in range(len(term) - 1, -1, -1):
-        if term[i] == ')':
-            paren_count += 1
-        elif term[i] == '(':
-            paren_count -= 1
-        elif term[i] == ' ' and paren_count == 0:
-            split_pos = i
-            break
-    
-    if split_pos > 0:
-        func_str = term[:split_pos].strip()
-        arg_str = term[split_pos+1:].strip()
-        func = parse_lambda_term(func_str)
-        arg = parse_lambda_term(arg_str)
-        return LambdaTerm('app', func=func, arg=arg)
-    
-    # Otherwise, it's a variable
-    if term:
-        return LambdaTerm('var', value=term)
-    
-    raise ValueError(f"Could not parse lambda term: {term}")
+            raise ValueError(f"Unknown term type: {item.term_type}")
+    
+    return binder_uses, free_uses
 
 
 def compile_to_graph(term: LambdaTerm, var_map: Optional[Dict[str, int]] = None) -> Graph:
     """
     Compile a lambda term to a chemlambda graph.
     
+    The whole term is written into one shared graph. A first pass counts
+    variable uses; the second pass allocates every node exactly once,
+    handing each subterm the in port its value must flow into:
+    
+    - λx.M becomes L (middle.in = body, left.out = x, right.out = value)
+    - M N becomes A (left.in = M, right.in = N, middle.out = value)
+    - a variable used k > 1 times is shared through a balanced FO tree,
+      an unused bound variable is terminated with a T node
+    - free variables become FRIN nodes and the term's value feeds a FROUT;
+      they are registered as graph inputs (by variable name) and output "out"
+    
+    Both passes use explicit stacks, so terms with hundreds of thousands of
+    nodes compile in linear time without hitting the recursion limit.
+    
     Args:
         term: Parsed lambda term
-        var_map: Mapping of variable names to node IDs (for variable references)
+        var_map: Optional dict, filled with free variable name -> FRIN node id
     
     Returns:
         Chemlambda graph representing the term
@@ -121,96 +231,51 @@ def compile_to_graph(term: LambdaTerm, var_map: Optional[Dict[str, int]] = None)
     if var_map is None:
         var_map = {}
     
+    binder_uses, free_uses = _count_variable_uses(term)
+    
     graph = Graph()
+    nodes = graph.nodes
     
-    if term.term_type == 'var':
-        # Variable reference
-        # Look up in var_map to find the node it refers to
-        if term.value in var_map:
-            # Variable is bound - create connection to bound variable
-            # For now, create a placeholder node
-            node_id = graph.add_node(NodeType.ARROW)
-            # In full implementation, would connect to the bound variable
-            return graph
-        else:
-            # Free variable - create a node for it
-            node_id = graph.add_node(NodeType.FRIN)
-            return graph
-    
-    elif term.term_type == 'abs':
-        # Lambda abstraction: λx.M
-        # Create L node
-        l_id = graph.add_node(NodeType.L)
-        l_node = graph.nodes[l_id]
-        
-        # Compile body with x added to var_map
-        body_graph = compile_to_graph(term.body, {**var_map, term.var: l_id})
-        
-        # Merge body graph into main graph
-        body_start_id = graph.next_node_id
-        body_node_map = {}
-        for node_id, node in body_graph.nodes.items():
-            new_id = graph.add_node(node.node_type)
-            body_node_map[node_id] = new_id
-        
-        # Copy edges from body graph
-        for port1, port2 in body_graph.edges.items():
-            if port1.node_id in body_node_map and port2.node_id in body_node_map:
-                new_port1 = graph.nodes[body_node_map[port1.node_id]].ports[port1.port_type]
-                new_port2 = graph.nodes[body_node_map[port2.node_id]].ports[port2.port_type]
-                graph.connect(new_port1, new_port2)
-        
-        # Connect lambda body to compiled body
-        # The body's output should connect to lambda's left port
-        # Find output port of body (free output or application result)
-        # For now, connect lambda's left to body's entry point
-        
-        # Connect lambda's right port (bound variable) to body
-        # This is simplified - full implementation would properly handle variable binding
-        
-        return graph
+    free_ports: Dict[str, List[Port]] = {}
+    for name, count in free_uses.items():
+        frin_port = graph.add_input(name)
+        var_map[name] = frin_port.node_id
+        free_ports[name] = graph.fan_out(frin_port, count)
     
-    elif term.term_type == 'app':
-        # Application: M N
-        # Create A node
-        a_id = graph.add_node(NodeType.A)
-        a_node = graph.nodes[a_id]
-        
-        # Compile function and argument
-        func_graph = compile_to_graph(term.func, var_map)
-        arg_graph = compile_to_graph(term.arg, var_map)
-        
-        # Merge function graph
-        func_start_id = graph.next_node_id
-        func_node_map = {}
-        for node_id, node in func_graph.nodes.items():
-            new_id = graph.add_node(node.node_type)
-            func_node_map[node_id] = new_id
-        
-        for port1, port2 in func_graph.edges.items():
-            if port1.node_id in func_node_map and port2.node_id in func_node_map:
-                new_port1 = graph.nodes[func_node_map[port1.node_id]].ports[port1.port_type]
-                new_port2 = graph.nodes[func_node_map[port2.node_id]].ports[port2.port_type]
-                graph.connect(new_port1, new_port2)
+    frout_id = graph.add_node(NodeType.FROUT)
+    graph.outputs["out"] = frout_id
+    
+    # Work items are (term, in port receiving its value) or scope exits
+    scope: Dict[str, List[List[Port]]] = {}
+    next_binder = 0
+    work = [(term, nodes[frout_id].ports["middle"])]
+    
+    while work:
+        item, dest = work.pop()
         
-        # Merge argument graph
-        arg_start_id = graph.next_node_id
-        arg_node_map = {}
-        for node_id, node in arg_graph.nodes.items():
-            new_id = graph.add_node(node.node_type)
-            arg_node_map[node_id] = new_id
+        if item == 'exit':
+            scope[dest].pop()
+            continue
         
-        for port1, port2 in arg_graph.edges.items():
-            if port1.node_id in arg_node_map and port2.node_id in arg_node_map:
-                new_port1 = graph.nodes[arg_node_map[port1.node_id]].ports[port1.port_type]
-                new_port2 = graph.nodes[arg_node_map[port2.node_id]].ports[port2.port_type]
-                graph.connect(new_port1, new_port2)
+        if item.term_type == 'var':
+            bound = scope.get(item.value)
+            source = bound[-1].pop() if bound else free_ports[item.value].pop()
+            graph.connect(source, dest)
         
-        # Connect function output to application's left input
-        # Connect argument to application's right input
-        # This is simplified - full implementation would find proper output ports
+        elif item.term_type == 'abs':
+            l_node = nodes[graph.add_node(NodeType.L)]
+            graph.connect(l_node.ports["right"], dest)
+            uses = binder_uses[next_binder]
+            next_binder += 1
+            scope.setdefault(item.var, []).append(graph.fan_out(l_node.ports["left"], uses))
+            work.append(('exit', item.var))
+            work.append((item.body, l_node.ports["middle"]))
         
-        return graph
+        else:
+            a_node = nodes[graph.add_node(NodeType.A)]
+            graph.connect(a_node.ports["middle"], dest)
+            work.append((item.arg, a_node.ports["right"]))
+            work.append((item.func, a_node.ports["left"]))
     
     return graph
 
@@ -229,6 +294,151 @@ def compile_lambda_string(term_str: str) -> Graph:
     return compile_to_graph(term)
 
 
+def graph_to_lambda(graph: Graph, output: str = "out",
+                    var_map: Optional[Dict[str, int]] = None) -> Optional[LambdaTerm]:
+    """
+    Read the lambda term flowing into an output of the graph back.
+    
+    The walk starts at the FROUT node and visits every out port at most
+    once: results are memoized per port, so a subterm shared through an FO
+    tree is read once and appears as one shared LambdaTerm object. The
+    cost is linear in the size of the reachable graph. Arrows are skipped,
+    FO/FOE nodes are transparent, bound variables are named x0, x1, ...
+    (skipping free variable names) and FRIN nodes become free variables.
+    
+    Args:
+        graph: Chemlambda graph, e.g. the result of a simulation
+        output: Name of the output boundary (any FROUT if not registered)
+        var_map: Free variable name -> FRIN node id (defaults to graph.inputs)
+    
+    Returns:
+        The lambda term, or None if the graph below the output is not a term
+        (a cycle, a dangling port, or a node that has no lambda meaning)
+    """
+    frout_id = graph.outputs.get(output)
+    if frout_id is None:
+        frout_id = next((node_id for node_id, node in graph.nodes.items()
+                         if node.node_type == NodeType.FROUT), None)
+    if frout_id is None or frout_id not in graph.nodes:
+        return None
+    
+    free_names = {node_id: name for name, node_id in
+                  (graph.inputs if var_map is None else var_map).items()}
+    used_names = set(free_names.values())
+    binder_names: Dict[int, str] = {}
+    
+    def binder_name(node_id: int) -> str:
+        if node_id not in binder_names:
+            name = f"x{len(binder_names)}"
+            while name in used_names:
+                name += "'"
+            binder_names[node_id] = name
+        return binder_names[node_id]
+    
+    edges = graph.edges
+    nodes = graph.nodes
+    
+    def source_of(in_port: Port) -> Optional[Port]:
+        port = edges.get(in_port)
+        return port if port is not None and port.direction == "out" else None
+    
+    # Post-order walk over out ports: (port, None) schedules the ports a
+    # value depends on, (port, sources) combines their memoized terms
+    memo: Dict[Port, LambdaTerm] = {}
+    in_progress = set()
+    root = source_of(nodes[frout_id].ports["middle"])
+    if root is None:
+        return None
+    work: List[Tuple[Port, Optional[List[Port]]]] = [(root, None)]
+    
+    while work:
+        port, sources = work.pop()
+        
+        if sources is not None:
+            in_progress.discard(port)
+            node_type = nodes[port.node_id].node_type
+            if node_type == NodeType.A:
+                memo[port] = LambdaTerm('app', func=memo[sources[0]], arg=memo[sources[1]])
+            elif node_type == NodeType.L:
+                memo[port] = LambdaTerm('abs', var=binder_names[port.node_id],
+                                        body=memo[sources[0]])
+            else:
+                memo[port] = memo[sources[0]]
+            continue
+        
+        if port in memo:
+            continue
+        if port in in_progress:
+            return None
+        node = nodes.get(port.node_id)
+        if node is None:
+            return None
+        node_type = node.node_type
+        
+        if node_type == NodeType.FRIN:
+            memo[port] = LambdaTerm('var', value=free_names.get(node.node_id, f"v{node.node_id}"))
+            continue
+        if node_type == NodeType.L and port.port_type == "left":
+            memo[port] = LambdaTerm('var', value=binder_name(node.node_id))
+            continue
+        
+        if node_type == NodeType.A:
+            sources = [source_of(node.ports["left"]), source_of(node.ports["right"])]
+            if sources[0] is None or sources[1] is None:
+                return None
+        elif node_type in (NodeType.L, NodeType.FO, NodeType.FOE, NodeType.ARROW):
+            sources = [source_of(node.ports["middle"])]
+            if sources[0] is None:
+                return None
+            if node_type == NodeType.L:
+                # Name binders outside-in so names follow the term's nesting
+                binder_name(node.node_id)
+        else:
+            return None
+        
+        in_progress.add(port)
+        work.append((port, sources))
+        for source in reversed(sources):
+            work.append((source, None))
+    
+    return memo[root]
+
+
+def to_de_bruijn(term: LambdaTerm) -> str:
+    """
+    Print a lambda term with de Bruijn indices, e.g. λλ(1 (1 0)) for 2.
+    
+    Bound variables become the number of binders between the variable and
+    its λ (counting from 0); free variables keep their names. Shared
+    subterms are printed once per occurrence.
+    """
+    parts = []
+    scope: List[str] = []
+    work = [term]
+    while work:
+        item = work.pop()
+        if isinstance(item, str):
+            if item == 'exit':
+                scope.pop()
+            else:
+                parts.append(item)
+        elif item.term_type == 'var':
+            for depth in range(len(scope) - 1, -1, -1):
+                if scope[depth] == item.value:
+                    parts.append(str(len(scope) - 1 - depth))
+                    break
+            else:
+                parts.append(item.value)
+        elif item.term_type == 'abs':
+            parts.append("λ")
+            scope.append(item.var)
+            work.extend(['exit', item.body])
+        else:
+            work.extend([")", item.arg, " ", item.func])
+            parts.append("(")
+    return "".join(parts)
+
+
 def main():
     """Test lambda compiler"""
     print("=" * 60)
@@ -243,6 +453,7 @@ def main():
         "(λx.x) y",
         "λf.λx.f x",
         "λm.λn.m n",
+        "λf.λx.f (f (f x))",
     ]
     
     for term_str in test_terms:
@@ -260,6 +471,9 @@ def main():
                 node_type = node.node_type.value
                 node_types[node_type] = node_types.get(node_type, 0) + 1
             print(f"  Node types: {node_types}")
+            
+            readback = graph_to_lambda(graph)
+            print(f"  Readback: {readback} = {to_de_bruijn(readback)}")
         
         except Exception as e:
             print(f"  Error: {e}")
@@ -267,9 +481,9 @@ def main():
             traceback.print_exc()
     
     print("\n" + "=" * 60)
-    print("Note: This is a simplified compiler.")
-    print("Full implementation would properly handle variable binding")
-    print("and graph connections for beta reduction.")
+    print("Variables used more than once are shared through FO trees,")
+    print("unused bound variables end in T nodes, free variables are FRIN")
+    print("nodes and the value of the term flows into a FROUT node.")
     print("=" * 60)
 
 
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Reference Lambda Evaluator
+Normal-order de Bruijn substitution, used as a baseline for chemlambda
+"""
+
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from typing import Dict, List, Optional, Tuple
+from lambda_compiler import LambdaTerm, parse_lambda_term, to_de_bruijn
+
+
+# De Bruijn terms are nested tuples:
+#   ('v', k)       bound variable, k binders up
+#   ('f', name)    free variable
+#   ('l', body)    abstraction
+#   ('a', f, x)    application
+DBTerm = tuple
+
+
+def from_lambda_term(term: LambdaTerm) -> DBTerm:
+    """Convert a named LambdaTerm to de Bruijn form"""
+    out: List[DBTerm] = []
+    scope: List[str] = []
+    work = [(term, False)]
+    while work:
+        item, done = work.pop()
+        if item == 'exit':
+            scope.pop()
+        elif item.term_type == 'var':
+            for depth in range(len(scope) - 1, -1, -1):
+                if scope[depth] == item.value:
+                    out.append(('v', len(scope) - 1 - depth))
+                    break
+            else:
+                out.append(('f', item.value))
+        elif item.term_type == 'abs':
+            if done:
+                out.append(('l', out.pop()))
+            else:
+                scope.append(item.var)
+                work.append((item, True))
+                work.append(('exit', False))
+                work.append((item.body, False))
+        else:
+            if done:
+                arg = out.pop()
+                out.append(('a', out.pop(), arg))
+            else:
+                work.append((item, True))
+                work.append((item.arg, False))
+                work.append((item.func, False))
+    return out[0]
+
+
+def to_lambda_term(term: DBTerm) -> LambdaTerm:
+    """Convert a de Bruijn term back to a LambdaTerm with binders x0, x1, ..."""
+    out: List[LambdaTerm] = []
+    names: List[str] = []
+    work = [(term, False)]
+    while work:
+        item, done = work.pop()
+        tag = item[0]
+        if tag == 'v':
+            out.append(LambdaTerm('var', value=names[len(names) - 1 - item[1]]))
+        elif tag == 'f':
+            out.append(LambdaTerm('var', value=item[1]))
+        elif tag == 'l':
+            if done:
+                out.append(LambdaTerm('abs', var=names.pop(), body=out.pop()))
+            else:
+                names.append(f"x{len(names)}")
+                work.append((item, True))
+                work.append((item[1], False))
+        else:
+            if done:
+                arg = out.pop()
+                out.append(LambdaTerm('app', func=out.pop(), arg=arg))
+            else:
+                work.append((item, True))
+                work.append((item[2], False))
+                work.append((item[1], False))
+    return out[0]
+
+
+def _map_vars(term: DBTerm, replace) -> DBTerm:
+    """
+    Rebuild a term, replacing each bound variable ('v', k) found under
+    `depth` local binders with replace(k, depth).
+    """
+    out: List[DBTerm] = []
+    work = [(term, 0, False)]
+    while work:
+        item, depth, done = work.pop()
+        tag = item[0]
+        if tag == 'v':
+            out.append(replace(item[1], depth))
+        elif tag == 'f':
+            out.append(item)
+        elif tag == 'l':
+            if done:
+                out.append(('l', out.pop()))
+            else:
+                work.append((item, depth, True))
+                work.append((item[1], depth + 1, False))
+        else:
+            if done:
+                arg = out.pop()
+                out.append(('a', out.pop(), arg))
+            else:
+                work.append((item, depth, True))
+                work.append((item[2], depth, False))
+                work.append((item[1], depth, False))
+    return out[0]
+
+
+def _shift(term: DBTerm, amount: int) -> DBTerm:
+    """Add `amount` to the variables of `term` that are free in it"""
+    if amount == 0:
+        return term
+    return _map_vars(term, lambda k, depth: ('v', k + amount) if k >= depth else ('v', k))
+
+
+def _beta(body: DBTerm, arg: DBTerm) -> DBTerm:
+    """Contract (λ.body) arg: substitute arg for index 0 in body"""
+    shifted: Dict[int, DBTerm] = {}
+
+    def replace(k: int, depth: int) -> DBTerm:
+        if k < depth:
+            return ('v', k)
+        if k == depth:
+            if depth not in shifted:
+                shifted[depth] = _shift(arg, depth)
+            return shifted[depth]
+        return ('v', k - 1)
+
+    return _map_vars(body, replace)
+
+
+def _find_redex(term: DBTerm) -> Optional[List[Tuple[DBTerm, int]]]:
+    """
+    Path to the leftmost-outermost redex as (node, child index) pairs,
+    or None if the term is in normal form.
+    """
+    # Depth-first, function before argument, so the first redex seen is
+    # the leftmost-outermost one. Each entry remembers its parent entry.
+    visited: List[Tuple[DBTerm, int, int]] = []
+    work = [(term, -1, 0)]
+    while work:
+        item, parent, child = work.pop()
+        tag = item[0]
+        if tag == 'v' or tag == 'f':
+            continue
+        index = len(visited)
+        visited.append((item, parent, child))
+        if tag == 'a':
+            if item[1][0] == 'l':
+                break
+            work.append((item[2], index, 2))
+            work.append((item[1], index, 1))
+        else:
+            work.append((item[1], index, 1))
+    else:
+        return None
+
+    # Walk back up from the redex to the root
+    path = [(visited[-1][0], 0)]
+    item, parent, child = visited[-1]
+    while parent >= 0:
+        path.append((visited[parent][0], child))
+        _, parent, child = visited[parent]
+    path.reverse()
+    return path
+
+
+def _step(term: DBTerm) -> Optional[DBTerm]:
+    """One normal-order beta step, or None if the term is normal"""
+    path = _find_redex(term)
+    if path is None:
+        return None
+    redex = path[-1][0]
+    result = _beta(redex[1][1], redex[2])
+
+    # Rebuild the spine above the redex
+    for node, child in reversed(path[:-1]):
+        if node[0] == 'l':
+            result = ('l', result)
+        elif child == 1:
+            result = ('a', result, node[2])
+        else:
+            result = ('a', node[1], result)
+    return result
+
+
+def normalize(term: DBTerm, max_steps: int = 100000) -> Tuple[DBTerm, int, bool]:
+    """
+    Reduce a de Bruijn term to normal form, leftmost-outermost first.
+
+    Normal order finds the normal form whenever one exists. Each step
+    costs time linear in the size of the term.
+
+    Args:
+        term: De Bruijn term
+        max_steps: Maximum number of beta steps
+
+    Returns:
+        (term, beta steps, True if the term is in normal form)
+    """
+    steps = 0
+    while steps < max_steps:
+        reduced = _step(term)
+        if reduced is None:
+            return term, steps, True
+        term = reduced
+        steps += 1
+    return term, steps, _find_redex(term) is None
+
+
+def evaluate(term_str: str, max_steps: int = 100000) -> dict:
+    """
+    Parse and normalize a lambda term.
+
+    Args:
+        term_str: Lambda term as string, e.g. "(λx.x) y"
+        max_steps: Maximum number of beta steps
+
+    Returns:
+        Dictionary with the normal form (LambdaTerm and de Bruijn string),
+        beta steps and whether normalization finished
+    """
+    normal, steps, finished = normalize(from_lambda_term(parse_lambda_term(term_str)), max_steps)
+    result = to_lambda_term(normal)
+    return {
+        "term": result,
+        "de_bruijn": to_de_bruijn(result),
+        "steps": steps,
+        "normal": finished,
+    }
+
+
+def main():
+    """Normalize a few lambda terms"""
+    print("=" * 60)
+    print("Reference Evaluator (normal-order de Bruijn substitution)")
+    print("=" * 60)
+    print()
+
+    examples = [
+        "(λx.x) y",
+        "(λx.λy.x) a b",
+        "(λx.λy.y) ((λx.x x) (λx.x x)) z",
+        "(λm.λn.λf.λx.m f (n f x)) (λf.λx.f (f x)) (λf.λx.f x)",
+    ]
+
+    for term_str in examples:
+        result = evaluate(term_str)
+        print(f"{term_str}")
+        print(f"  → {result['term']}  [{result['de_bruijn']}] in {result['steps']} steps")
+
+    print()
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,171 +11,62 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from chemlambda import Graph, NodeType
+from lambda_compiler import LambdaTerm, graph_to_lambda
 from typing import Optional, List, Tuple
 
 
-def decode_church_numeral(graph: Graph) -> Optional[int]:
+def church_numeral_value(term: Optional[LambdaTerm]) -> Optional[int]:
     """
-    Decode a Church numeral from a graph.
-    
-    A Church numeral n has the structure: λf.λx.f^n(x)
-    We need to identify this pattern and count the number of f applications.
+    Return n if the term is the Church numeral λf.λx.f^n(x), else None.
     
-    Args:
-        graph: The graph to decode
-    
-    Returns:
-        The decoded number, or None if not a valid Church numeral
+    A single walk down the application chain, linear in n.
     """
-    # Look for pattern: L -> L -> ... (nested lambdas)
-    # Outer lambda should bind f, inner lambda should bind x
-    # Then count applications of f
-    
-    # Find all L nodes
-    l_nodes = [node_id for node_id, node in graph.nodes.items() 
-               if node.node_type == NodeType.L]
-    
-    if len(l_nodes) < 2:
-        # Need at least 2 lambdas (outer and inner)
+    if term is None or term.term_type != 'abs' or term.body.term_type != 'abs':
         return None
+    f, x = term.var, term.body.var
+    body = term.body.body
     
-    # Try to find the Church numeral pattern
-    # Look for: L (outer) -> L (inner) -> A (applications)
-    
-    # Find outer lambda (one that has another L connected to its left)
-    outer_l_id = None
-    inner_l_id = None
-    
-    for l_id in l_nodes:
-        l_node = graph.nodes[l_id]
-        left_port = l_node.ports.get("left")
-        if left_port:
-            connected = graph.get_connected(left_port)
-            if connected:
-                connected_node = graph.nodes.get(connected.node_id)
-                if connected_node and connected_node.node_type == NodeType.L:
-                    outer_l_id = connected.node_id
-                    inner_l_id = l_id
-                    break
-    
-    if outer_l_id is None or inner_l_id is None:
-        # Try reverse: maybe inner is first
-        for l_id in l_nodes:
-            l_node = graph.nodes[l_id]
-            middle_port = l_node.ports.get("middle")
-            if middle_port:
-                connected = graph.get_connected(middle_port)
-                if connected:
-                    connected_node = graph.nodes.get(connected.node_id)
-                    if connected_node and connected_node.node_type == NodeType.L:
-                        inner_l_id = connected.node_id
-                        outer_l_id = l_id
-                        break
-    
-    if outer_l_id is None or inner_l_id is None:
-        # Couldn't find nested lambda structure
-        # Maybe it's a simpler structure (like Church 0 or 1)
-        return _try_simple_church_decode(graph)
-    
-    # Found nested lambdas, now count applications
-    # Start from inner lambda's left port and trace applications
-    inner_l = graph.nodes[inner_l_id]
-    outer_l = graph.nodes[outer_l_id]
-    
-    # Check if this is Church 0: λf.λx.x (no applications)
-    inner_left = inner_l.ports.get("left")
-    inner_right = inner_l.ports.get("right")
-    
-    if inner_left and inner_right:
-        connected_left = graph.get_connected(inner_left)
-        connected_right = graph.get_connected(inner_right)
-        
-        # If left connects directly to right, it's Church 0
-        if connected_left == inner_right or connected_right == inner_left:
-            return 0
-    
-    # Count applications by traversing from inner lambda's left
-    count = _count_applications(graph, inner_l, outer_l)
+    count = 0
+    while (body.term_type == 'app' and body.func.term_type == 'var'
+           and body.func.value == f):
+        count += 1
+        body = body.arg
     
-    return count
+    if body.term_type == 'var' and body.value == x and (count == 0 or f != x):
+        return count
+    return None
 
 
-def _try_simple_church_decode(graph: Graph) -> Optional[int]:
-    """Try to decode simpler Church numeral structures"""
-    # Church 0: λf.λx.x - just returns x
-    # Look for L -> L where inner L's left connects to its right
-    
-    l_nodes = [node_id for node_id, node in graph.nodes.items() 
-               if node.node_type == NodeType.L]
-    
-    if len(l_nodes) == 2:
-        # Check if it's Church 0
-        for l_id in l_nodes:
-            l_node = graph.nodes[l_id]
-            left = l_node.ports.get("left")
-            right = l_node.ports.get("right")
-            if left and right:
-                connected_left = graph.get_connected(left)
-                if connected_left == right:
-                    return 0
-    
+def church_boolean_value(term: Optional[LambdaTerm]) -> Optional[bool]:
+    """Return True for λx.λy.x, False for λx.λy.y, else None"""
+    if term is None or term.term_type != 'abs' or term.body.term_type != 'abs':
+        return None
+    x, y = term.var, term.body.var
+    body = term.body.body
+    if body.term_type != 'var' or x == y:
+        return None
+    if body.value == x:
+        return True
+    if body.value == y:
+        return False
     return None
 
 
-def _count_applications(graph: Graph, inner_l, outer_l) -> int:
-    """
-    Count the number of applications in a Church numeral.
-    
-    Traverses from inner lambda's left port, counting A nodes
-    that form a chain.
+def decode_church_numeral(graph: Graph) -> Optional[int]:
     """
-    inner_left = inner_l.ports.get("left")
-    if not inner_left:
-        return 0
+    Decode a Church numeral from a graph.
     
-    # Start traversal from inner lambda's left
-    count = 0
-    visited = set()
-    current_port = inner_left
+    A Church numeral n has the structure: λf.λx.f^n(x)
+    The term at the graph's output is read back (linear time, see
+    lambda_compiler.graph_to_lambda) and the applications of f counted.
     
-    while current_port:
-        if current_port in visited:
-            break
-        visited.add(current_port)
-        
-        # Check if this port is connected to an application
-        connected = graph.get_connected(current_port)
-        if not connected:
-            break
-        
-        connected_node = graph.nodes.get(connected.node_id)
-        if not connected_node:
-            break
-        
-        if connected_node.node_type == NodeType.A:
-            count += 1
-            # Move to application's middle (output)
-            app_middle = connected_node.ports.get("middle")
-            if app_middle:
-                current_port = app_middle
-            else:
-                break
-        elif connected_node.node_type == NodeType.ARROW:
-            # Arrow node, continue traversal
-            arrow_out = connected_node.ports.get("middle_out")
-            if arrow_out:
-                current_port = arrow_out
-            else:
-                break
-        else:
-            # Not an application, stop counting
-            break
-        
-        # Limit to prevent infinite loops
-        if count > 100:
-            break
+    Args:
+        graph: The graph to decode
     
-    return count
+    Returns:
+        The decoded number, or None if not a valid Church numeral
+    """
+    return church_numeral_value(graph_to_lambda(graph))
 
 
 def decode_church_boolean(graph: Graph) -> Optional[bool]:
@@ -191,61 +82,15 @@ def decode_church_boolean(graph: Graph) -> Optional[bool]:
     Returns:
         The decoded boolean, or None if not a valid Church boolean
     """
-    # Find nested lambdas: L -> L
-    l_nodes = [node_id for node_id, node in graph.nodes.items() 
-               if node.node_type == NodeType.L]
-    
-    if len(l_nodes) < 2:
-        return None
-    
-    # Find outer and inner lambdas
-    outer_l_id = None
-    inner_l_id = None
-    
-    for l_id in l_nodes:
-        l_node = graph.nodes[l_id]
-        left_port = l_node.ports.get("left")
-        if left_port:
-            connected = graph.get_connected(left_port)
-            if connected:
-                connected_node = graph.nodes.get(connected.node_id)
-                if connected_node and connected_node.node_type == NodeType.L:
-                    outer_l_id = connected.node_id
-                    inner_l_id = l_id
-                    break
-    
-    if outer_l_id is None or inner_l_id is None:
-        return None
-    
-    outer_l = graph.nodes[outer_l_id]
-    inner_l = graph.nodes[inner_l_id]
-    
-    # Check inner lambda's left port
-    # If it connects to outer_l's right (x), it's true
-    # If it connects to inner_l's right (y), it's false
-    
-    inner_left = inner_l.ports.get("left")
-    outer_right = outer_l.ports.get("right")
-    inner_right = inner_l.ports.get("right")
-    
-    if not (inner_left and outer_right and inner_right):
-        return None
-    
-    connected_to_inner_left = graph.get_connected(inner_left)
-    
-    if connected_to_inner_left == outer_right:
-        return True  # true = λx.λy.x
-    elif connected_to_inner_left == inner_right:
-        return False  # false = λx.λy.y
-    
-    return None
+    return church_boolean_value(graph_to_lambda(graph))
 
 
 def extract_result(graph: Graph) -> Tuple[Optional[str], Optional[any]]:
     """
     Try to extract a result from a graph.
     
-    Attempts to decode as Church numeral first, then Church boolean.
+    Attempts to decode as Church numeral first, then Church boolean
+    (Church 0 and false are the same term, so it decodes as 0).
     
     Args:
         graph: The graph to extract result from
@@ -253,13 +98,14 @@ def extract_result(graph: Graph) -> Tuple[Optional[str], Optional[any]]:
     Returns:
         Tuple of (type, value) where type is "number", "boolean", or None
     """
-    # Try Church numeral first
-    num = decode_church_numeral(graph)
+    # Read the term back once and try each decoding on it
+    term = graph_to_lambda(graph)
+    
+    num = church_numeral_value(term)
     if num is not None:
         return ("number", num)
     
-    # Try Church boolean
-    bool_val = decode_church_boolean(graph)
+    bool_val = church_boolean_value(term)
     if bool_val is not None:
         return ("boolean", bool_val)
     
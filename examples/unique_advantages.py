@@ -18,6 +18,7 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 from alife.quine_detector import find_non_conflicting_matches, apply_parallel_rewrites
 from chemlambda.reactions import ALL_REACTIONS
+from chemlambda.components import ComponentSimulator
 
 
 def demonstrate_parallel_reduction():
@@ -71,6 +72,17 @@ def demonstrate_parallel_reduction():
         print(f"  Result nodes: {len(result.nodes)}")
         print(f"  Applied {len(matches)} reductions in ONE STEP")
     
+    # Measure the parallelism instead of assuming it: reduce sequentially
+    # and look at the causal dependencies between the rewrites
+    simulator = Simulator(graph.clone())
+    simulator.run(max_steps=100, random_order=False)
+    profile = simulator.get_parallelism_profile()
+    print(f"\nCausal profile of a sequential run:")
+    print(f"  Work (rewrites): {profile['work']}")
+    print(f"  Span (critical path): {profile['span']}")
+    print(f"  Available parallelism: {profile['parallelism']:.1f}")
+    print(f"  Rewrites per round: {profile['rounds']}")
+    
     print("\n" + "-" * 70)
     print("KEY INSIGHT: No coordination needed - each reduction is LOCAL")
     print("This enables massive parallelism impossible in sequential systems")
@@ -123,7 +135,7 @@ def demonstrate_local_operations():
     # Find all possible reductions
     all_matches = []
     for reaction in ALL_REACTIONS:
-        matches = reaction.can_apply(simulator.graph)
+        matches = simulator.graph.matches(reaction)
         for match in matches:
             all_matches.append((reaction, match))
     
@@ -218,35 +230,27 @@ def demonstrate_distributed_computation():
     print()
     
     # Simulate distributed computation
-    # Create multiple independent computation sites
-    sites = []
+    # Create multiple independent computation sites in one soup
+    soup = Graph()
     for i in range(3):
-        graph = Graph()
+        l_id = soup.add_node(NodeType.L)
+        a_id = soup.add_node(NodeType.A)
         
-        # Each site has its own computation
-        l_id = graph.add_node(NodeType.L)
-        a_id = graph.add_node(NodeType.A)
-        
-        l_node = graph.nodes[l_id]
-        a_node = graph.nodes[a_id]
-        
-        graph.connect(l_node.ports["right"], a_node.ports["left"])
-        graph.connect(l_node.ports["left"], a_node.ports["middle"])
+        l_node = soup.nodes[l_id]
+        a_node = soup.nodes[a_id]
         
-        sites.append({
-            "id": i,
-            "graph": graph,
-            "simulator": Simulator(graph)
-        })
+        soup.connect(l_node.ports["right"], a_node.ports["left"])
+        soup.connect(l_node.ports["left"], a_node.ports["middle"])
     
-    print(f"Created {len(sites)} independent computation sites")
+    # Each disconnected molecule goes to its own worker process
+    simulator = ComponentSimulator(soup)
+    print(f"Created {len(simulator.active)} independent computation sites")
     print("\nEach site can compute INDEPENDENTLY:")
     
-    # Simulate parallel computation at each site
-    for site in sites:
-        simulator = site["simulator"]
-        steps = simulator.run(max_steps=10, random_order=True)
-        print(f"  Site {site['id']}: {steps} steps, {len(simulator.graph.nodes)} nodes")
+    steps = simulator.run(max_steps=10, random_order=True)
+    stats = simulator.get_stats()
+    print(f"  {steps} steps over {stats['components']} sites, "
+          f"{len(simulator.get_graph().nodes)} nodes in total")
     
     print("\n" + "-" * 70)
     print("KEY INSIGHT: No coordination needed between sites")
@@ -9,6 +9,7 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from chemlambda import Graph, NodeType, Simulator
+from chemlambda.layout import force_layout
 from chemlambda.examples import (
     create_loop_example,
     create_ouroboros_like,
@@ -46,19 +47,8 @@ def create_svg_visualization(graph, filename, width=800, height=600):
         NodeType.FROUT: '#9cdcfe',  # Light blue
     }
     
-    # Layout nodes in a circle
-    nodes = list(graph.nodes.values())
-    n = len(nodes)
-    center_x = width / 2
-    center_y = height / 2
-    radius = min(width, height) / 3 if n > 1 else 0
-    
-    node_positions = {}
-    for i, node in enumerate(nodes):
-        angle = 2 * 3.14159 * i / n if n > 0 else 0
-        x = center_x + radius * (0.8 if n > 1 else 0) * (1 if n == 1 else (angle / 3.14159))
-        y = center_y + radius * (0.8 if n > 1 else 0) * (1 if n == 1 else (angle / 3.14159))
-        node_positions[node.node_id] = (x, y)
+    # Force-directed layout (Barnes-Hut), fitted to the drawing area
+    node_positions = force_layout(graph, width, height)
     
     # Draw edges
     drawn_edges = set()
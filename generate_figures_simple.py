@@ -6,10 +6,10 @@ Generates SVG files without external dependencies
 
 import sys
 import os
-import math
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from chemlambda import Graph, NodeType, Simulator
+from chemlambda.layout import force_layout
 from chemlambda.examples import (
     create_loop_example,
     create_ouroboros_like,
@@ -29,20 +29,8 @@ def create_svg(graph, filename, width=600, height=400):
         'Arrow': '#c586c0', 'FRIN': '#9cdcfe', 'FROUT': '#9cdcfe'
     }
     
-    # Layout
-    center_x = width / 2
-    center_y = height / 2
-    radius = min(width, height) / 3 if n > 1 else 0
-    
-    node_positions = {}
-    for i, node in enumerate(nodes):
-        if n == 1:
-            x, y = center_x, center_y
-        else:
-            angle = 2 * math.pi * i / n
-            x = center_x + radius * math.cos(angle)
-            y = center_y + radius * math.sin(angle)
-        node_positions[node.node_id] = (x, y)
+    # Force-directed layout (Barnes-Hut), fitted to the drawing area
+    node_positions = force_layout(graph, width, height)
     
     # Generate SVG
     svg_lines = [
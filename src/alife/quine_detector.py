@@ -15,6 +15,7 @@ if parent_dir not in sys.path:
 from src.chemlambda.graph import Graph
 from src.chemlambda.simulator import Simulator
 from src.chemlambda.reactions import Reaction
+from src.chemlambda.components import split_components
 
 
 def find_non_conflicting_matches(graph: Graph, reactions: List[Reaction]) -> List[Tuple]:
@@ -25,7 +26,7 @@ def find_non_conflicting_matches(graph: Graph, reactions: List[Reaction]) -> Lis
     all_matches = []
     
     for reaction in reactions:
-        matches = reaction.can_apply(graph)
+        matches = graph.matches(reaction)
         for match in matches:
             all_matches.append((reaction, match))
     
@@ -212,9 +213,7 @@ def find_connected_components(graph: Graph) -> List[Graph]:
     Find all connected components in a graph.
     Returns list of subgraphs, each a connected component.
     """
-    # Simplified implementation
-    # Proper implementation would use graph traversal
-    return [graph]  # Placeholder
+    return split_components(graph)
 
 
 class QuineAnalyzer:
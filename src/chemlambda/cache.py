@@ -0,0 +1,144 @@
+"""
+Reduction Cache
+Memoizes normal forms of molecules by their canonical hash
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+from .graph import Graph
+from .canonical import canonical_hash
+from .reactions import Reaction, ALL_REACTIONS
+from .simulator import Simulator
+
+
+class ReductionCache:
+    """
+    Two-tier cache: canonical hash of an input molecule -> reduced molecule and stats.
+
+    The in-memory tier is an LRU of at most `max_entries` results. If a
+    `directory` is given, results are also pickled there and survive across
+    processes and runs. Only deterministic reductions (random_order=False)
+    are cached, since random runs are not repeatable. Isomorphic inputs
+    with the same boundary names share an entry, so the returned graph is
+    an isomorphic copy of the normal form whose node ids need not match
+    the caller's input.
+    """
+
+    def __init__(self, max_entries: int = 256, directory: Optional[str] = None):
+        self.max_entries = max_entries
+        self.directory = directory
+        self._memory: "OrderedDict[str, Tuple[Graph, dict]]" = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def key_for(self, graph: Graph, max_steps: int,
+                reactions: Optional[List[Reaction]] = None) -> str:
+        """
+        Cache key for reducing `graph` with the given reactions and step limit.
+
+        Reactions are identified by their classes (module and qualified
+        name, in order), not by get_name(): different rules may share a
+        name, and the key must stay the same across processes for the
+        disk tier.
+        """
+        classes = ",".join(f"{type(r).__module__}.{type(r).__qualname__}"
+                           for r in (reactions or ALL_REACTIONS))
+        settings = f"{canonical_hash(graph)}|{classes}|{max_steps}"
+        return hashlib.sha256(settings.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[Graph, dict]]:
+        """Look up a result, trying memory first and then disk"""
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            graph, stats = self._memory[key]
+            return graph.clone(), dict(stats)
+
+        if self.directory is not None:
+            path = self._path(key)
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    graph, stats = pickle.load(f)
+                self._remember(key, graph, stats)
+                self.disk_hits += 1
+                return graph.clone(), dict(stats)
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, graph: Graph, stats: dict):
+        """Store a result in memory and, if configured, on disk"""
+        graph = graph.clone()
+        stats = dict(stats)
+        self._remember(key, graph, stats)
+
+        if self.directory is not None:
+            # Write to a temporary file first so readers never see partial pickles
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump((graph, stats), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+
+    def reduce(self, graph: Graph, max_steps: int = 1000,
+               reactions: Optional[List[Reaction]] = None) -> Tuple[Graph, dict]:
+        """
+        Reduce a molecule deterministically, reusing a cached normal form if available.
+
+        Args:
+            graph: Input molecule (not modified)
+            max_steps: Maximum reduction steps
+            reactions: Reactions to use (defaults to ALL_REACTIONS)
+
+        Returns:
+            (reduced graph, stats) where stats is Simulator.get_stats() plus
+            "steps" (steps taken) and "cached" (whether this was a lookup)
+        """
+        key = self.key_for(graph, max_steps, reactions)
+        cached = self.get(key)
+        if cached is not None:
+            result, stats = cached
+            stats["cached"] = True
+            return result, stats
+
+        simulator = Simulator(graph.clone(), reactions, record_history=False)
+        steps = simulator.run(max_steps=max_steps, random_order=False)
+        stats = simulator.get_stats()
+        stats["steps"] = steps
+        self.put(key, simulator.graph, stats)
+
+        stats["cached"] = False
+        return simulator.graph, stats
+
+    def clear(self, disk: bool = False):
+        """Drop the in-memory tier (and the on-disk tier if disk=True)"""
+        self._memory.clear()
+        if disk and self.directory is not None:
+            for name in os.listdir(self.directory):
+                if name.endswith(".pickle"):
+                    os.remove(os.path.join(self.directory, name))
+
+    def get_stats(self) -> dict:
+        """Get hit/miss statistics"""
+        return {
+            "entries": len(self._memory),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+        }
+
+    def _remember(self, key: str, graph: Graph, stats: dict):
+        self._memory[key] = (graph, stats)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pickle")
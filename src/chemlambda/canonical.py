@@ -0,0 +1,145 @@
+"""
+Canonical Graph Forms
+Isomorphism-invariant encodings and hashes of chemlambda molecules
+"""
+
+import hashlib
+from typing import Dict, List, Tuple
+from .graph import Graph, connected_components
+
+
+def _neighbors(graph: Graph) -> Dict[int, List[Tuple[str, int, str]]]:
+    """For every node, list (port name, neighbor id, neighbor port name) in port order"""
+    port_names = {}
+    for node_id, node in graph.nodes.items():
+        for name, port in node.ports.items():
+            port_names[port] = name
+
+    adjacency = {}
+    for node_id, node in graph.nodes.items():
+        entries = []
+        for name, port in node.ports.items():
+            other = graph.edges.get(port)
+            if other is None or other not in port_names:
+                entries.append((name, -1, ""))
+            else:
+                entries.append((name, other.node_id, port_names[other]))
+        adjacency[node_id] = entries
+    return adjacency
+
+
+def _labels(graph: Graph) -> Dict[int, str]:
+    """Label of every node: its type, plus its name for a named FRIN/FROUT"""
+    labels = {node_id: node.node_type.value for node_id, node in graph.nodes.items()}
+    for boundaries in (graph.inputs, graph.outputs):
+        for name, node_id in boundaries.items():
+            if node_id in labels:
+                labels[node_id] += repr(name)
+    return labels
+
+
+def _refine_colors(labels: Dict[int, str], adjacency: Dict[int, List[Tuple[str, int, str]]],
+                   max_rounds: int = 10) -> Dict[int, int]:
+    """
+    Weisfeiler-Lehman style color refinement with port labels.
+
+    Colors are derived only from node labels and port-labelled
+    neighborhoods, so they are the same for isomorphic graphs.
+    """
+    colors = dict(labels)
+    palette = {c: i for i, c in enumerate(sorted(set(colors.values())))}
+    colors = {node_id: palette[c] for node_id, c in colors.items()}
+    num_classes = len(palette)
+
+    for _ in range(max_rounds):
+        signatures = {}
+        for node_id, entries in adjacency.items():
+            signatures[node_id] = (colors[node_id], tuple(
+                (name, colors[other] if other >= 0 else -1, other_port)
+                for name, other, other_port in entries
+            ))
+        palette = {sig: i for i, sig in enumerate(sorted(set(signatures.values())))}
+        colors = {node_id: palette[sig] for node_id, sig in signatures.items()}
+        if len(palette) == num_classes:
+            break
+        num_classes = len(palette)
+
+    return colors
+
+
+def _encode_from(labels: Dict[int, str], adjacency: Dict[int, List[Tuple[str, int, str]]],
+                 root: int) -> str:
+    """
+    Encode a component by breadth-first search from a root.
+
+    Ports are visited in their fixed order and each port has at most one
+    edge, so the discovery order (and thus the encoding) depends only on
+    the root: two components are isomorphic exactly when some pair of
+    roots gives the same encoding.
+    """
+    index = {root: 0}
+    order = [root]
+    parts = []
+    position = 0
+    while position < len(order):
+        node_id = order[position]
+        position += 1
+        links = []
+        for name, other, other_port in adjacency[node_id]:
+            if other < 0:
+                links.append(f"{name}>-")
+                continue
+            if other not in index:
+                index[other] = len(order)
+                order.append(other)
+            links.append(f"{name}>{index[other]}.{other_port}")
+        parts.append(f"{labels[node_id]}[{','.join(links)}]")
+    return ";".join(parts)
+
+
+def canonical_form(graph: Graph) -> str:
+    """
+    Compute a canonical string for a graph.
+
+    Two graphs get the same canonical form exactly when they are
+    isomorphic as port-labelled graphs (node ids are ignored) with the
+    same names on their inputs and outputs, so terms that differ only in
+    their free variables are told apart. Each
+    connected component is encoded from every root in its rarest color
+    class and the smallest encoding is kept; components are then sorted.
+    For molecules with a unique node (e.g. a single FROUT) this is linear.
+
+    Args:
+        graph: The graph to encode
+
+    Returns:
+        Canonical encoding as string
+    """
+    adjacency = _neighbors(graph)
+    labels = _labels(graph)
+    colors = _refine_colors(labels, adjacency)
+
+    encodings = []
+    for component in connected_components(graph):
+        class_sizes: Dict[int, int] = {}
+        for node_id in component:
+            class_sizes[colors[node_id]] = class_sizes.get(colors[node_id], 0) + 1
+        root_color = min(class_sizes, key=lambda c: (class_sizes[c], c))
+        roots = [node_id for node_id in component if colors[node_id] == root_color]
+        encodings.append(min(_encode_from(labels, adjacency, root) for root in roots))
+
+    encodings.sort()
+    return "\n".join(encodings)
+
+
+def canonical_hash(graph: Graph) -> str:
+    """
+    Compute a hash of the canonical form of a graph.
+
+    Args:
+        graph: The graph to hash
+
+    Returns:
+        Hex digest, equal for isomorphic graphs
+    """
+    return hashlib.sha256(canonical_form(graph).encode("utf-8")).hexdigest()
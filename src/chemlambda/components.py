@@ -0,0 +1,154 @@
+"""
+Component Simulation
+Reduces the disconnected molecules of a soup independently in a worker pool
+"""
+
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from .graph import Graph, Node, _port_name, connected_components
+from .reactions import Reaction, ALL_REACTIONS
+from .simulator import Simulator
+
+
+def extract_subgraph(graph: Graph, node_ids: List[int]) -> Graph:
+    """
+    Copy a set of nodes, the edges among them and their named boundaries.
+
+    Node ids are kept, so the copy can be matched against the original.
+    """
+    subgraph = Graph()
+    subgraph.next_node_id = graph.next_node_id
+    nodes = subgraph.nodes
+    for node_id in node_ids:
+        nodes[node_id] = Node(node_id, graph.nodes[node_id].node_type)
+
+    for node_id in node_ids:
+        node = graph.nodes[node_id]
+        for port in node.ports.values():
+            other = graph.edges.get(port)
+            if other is None or other.node_id not in nodes:
+                continue
+            other_node = graph.nodes[other.node_id]
+            subgraph.edges[nodes[node_id].ports[_port_name(node, port)]] = \
+                nodes[other.node_id].ports[_port_name(other_node, other)]
+
+    subgraph.inputs = {name: node_id for name, node_id in graph.inputs.items() if node_id in nodes}
+    subgraph.outputs = {name: node_id for name, node_id in graph.outputs.items() if node_id in nodes}
+    return subgraph
+
+
+def split_components(graph: Graph) -> List[Graph]:
+    """Split a graph into one graph per connected component"""
+    return [extract_subgraph(graph, component) for component in connected_components(graph)]
+
+
+def _reduce_component(graph: Graph, reactions: List[Reaction], max_steps: int,
+                      random_order: bool, seed: Optional[int]) -> Tuple[Graph, int, Dict[str, int]]:
+    """Worker task: reduce one component, returns (graph, steps, reaction counts)"""
+    simulator = Simulator(graph, reactions, record_history=False, seed=seed)
+    steps = simulator.run(max_steps=max_steps, random_order=random_order)
+    return graph, steps, simulator.get_stats()["reaction_counts"]
+
+
+class ComponentSimulator:
+    """
+    Simulates a soup of molecules that never interact.
+
+    Rewrites are local, so disconnected molecules evolve independently and
+    each can be reduced by a different worker process. The run proceeds in
+    rounds of at most `steps_per_round` rewrites per component. After each
+    round the results are split again, so a molecule that fragmented is
+    spread over the workers as separate components, and components with
+    no redex left are retired.
+    """
+
+    def __init__(self, graph: Graph, reactions: Optional[List[Reaction]] = None,
+                 max_workers: Optional[int] = None, processes: bool = True):
+        """
+        Args:
+            graph: Soup to reduce (not modified)
+            reactions: Reactions to use (defaults to ALL_REACTIONS)
+            max_workers: Worker processes (defaults to the CPU count)
+            processes: Use a process pool; if False, components are
+                reduced in this process one after the other
+        """
+        self.reactions = reactions or ALL_REACTIONS
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.processes = processes
+        self.active: List[Tuple[Graph, int]] = [(component, 0) for component in split_components(graph)]
+        self.finished: List[Graph] = []
+        self.rounds = 0
+        self.step_count = 0
+        self.reaction_counts: Dict[str, int] = {}
+
+    def run(self, max_steps: int = 1000, steps_per_round: int = 100,
+            random_order: bool = True, seed: Optional[int] = None) -> int:
+        """
+        Reduce every component until it has no redex or reaches max_steps.
+
+        Args:
+            max_steps: Maximum rewrites for each component (fragments share
+                the budget of the molecule they came from)
+            steps_per_round: Rewrites per component between re-splits
+            random_order: Pick rewrites at random within each component
+            seed: Seed for reproducible random runs
+
+        Returns:
+            Number of rewrites performed, over all components
+        """
+        rng = random.Random(seed)
+        executor = ProcessPoolExecutor(self.max_workers) if self.processes else None
+        total = 0
+        try:
+            while self.active:
+                self.rounds += 1
+                # Largest components first, so no worker is left with a big one at the end
+                self.active.sort(key=lambda item: len(item[0].nodes), reverse=True)
+                budgets = [min(steps_per_round, max_steps - done) for _, done in self.active]
+                args = ([graph for graph, _ in self.active],
+                        [self.reactions] * len(self.active),
+                        budgets,
+                        [random_order] * len(self.active),
+                        [rng.randrange(2 ** 32) if seed is not None else None for _ in self.active])
+                if executor is None:
+                    results = map(_reduce_component, *args)
+                else:
+                    chunksize = max(1, len(self.active) // (4 * self.max_workers))
+                    results = executor.map(_reduce_component, *args, chunksize=chunksize)
+
+                still_active = []
+                for (_, done), budget, (graph, steps, counts) in zip(self.active, budgets, results):
+                    total += steps
+                    for name, count in counts.items():
+                        self.reaction_counts[name] = self.reaction_counts.get(name, 0) + count
+                    done += steps
+                    parts = split_components(graph)
+                    if steps < budget or done >= max_steps:
+                        self.finished.extend(parts)
+                    else:
+                        still_active.extend((part, done) for part in parts)
+                self.active = still_active
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        self.step_count += total
+        return total
+
+    def get_graph(self) -> Graph:
+        """Merge all components back into one graph (node ids are renumbered)"""
+        graph = Graph()
+        for component in self.finished + [component for component, _ in self.active]:
+            graph.merge(component)
+        return graph
+
+    def get_stats(self) -> dict:
+        """Get statistics about the simulation"""
+        return {
+            "total_steps": self.step_count,
+            "rounds": self.rounds,
+            "components": len(self.finished) + len(self.active),
+            "reaction_counts": dict(self.reaction_counts),
+        }
@@ -0,0 +1,119 @@
+"""
+Entropy Tracking
+Node-type and interaction-pattern entropy kept up to date from rewrite deltas
+"""
+
+import math
+from typing import Dict, Hashable, Iterable, List, Optional
+from .graph import Graph, MatchIndex
+from .reactions import Reaction, ALL_REACTIONS
+
+
+def _xlog2(count: int) -> float:
+    return count * math.log2(count) if count > 0 else 0.0
+
+
+class Histogram:
+    """
+    Counts of hashable keys with their Shannon entropy.
+
+    Keeps the running sum of c*log2(c) over all counts, so that
+    H = log2(N) - sum/N is available in O(1) after each change.
+    """
+
+    def __init__(self):
+        self.counts: Dict[Hashable, int] = {}
+        self.total = 0
+        self._sum = 0.0
+
+    def add(self, key: Hashable, delta: int = 1):
+        """Change the count of a key by delta"""
+        old = self.counts.get(key, 0)
+        new = old + delta
+        if new < 0:
+            raise ValueError(f"Count of {key!r} would become negative")
+        if new:
+            self.counts[key] = new
+        else:
+            self.counts.pop(key, None)
+        self.total += delta
+        self._sum += _xlog2(new) - _xlog2(old)
+
+    def entropy(self) -> float:
+        """Shannon entropy of the distribution, in bits"""
+        if self.total <= 0:
+            return 0.0
+        return max(0.0, math.log2(self.total) - self._sum / self.total)
+
+
+class EntropyTracker:
+    """
+    Entropy measures of a molecule, updated incrementally as it is rewritten.
+
+    Node-type counts and interaction patterns (the node sets of reaction
+    matches) are kept as histograms. After a rewrite, update() is given
+    the ids of the nodes it changed (Simulator.last_touched): only the
+    matches that used those nodes are dropped, and only the region around
+    them is searched for new ones, so the cost of a step depends on the
+    size of the rewrite rather than of the graph.
+
+    An interaction pattern of order k is the set of nodes of a match with
+    at least k nodes; a pattern counts once for every match that has it.
+    """
+
+    def __init__(self, graph: Graph, reactions: Optional[List[Reaction]] = None,
+                 orders: Iterable[int] = (2, 3)):
+        """
+        Args:
+            graph: Molecule to track (read only, the caller rewrites it)
+            reactions: Reactions whose matches are interaction patterns
+                (defaults to ALL_REACTIONS)
+            orders: Interaction orders to keep histograms for
+        """
+        self.graph = graph
+        self.reactions = reactions or ALL_REACTIONS
+        self.types = Histogram()
+        self.patterns: Dict[int, Histogram] = {order: Histogram() for order in orders}
+
+        self._index = MatchIndex(graph, self.reactions, on_add=self._pattern_added,
+                                 on_remove=self._pattern_removed, on_type=self.types.add)
+
+    def _pattern_added(self, key: tuple, pattern: frozenset):
+        for order, histogram in self.patterns.items():
+            if len(pattern) >= order:
+                histogram.add(pattern)
+
+    def _pattern_removed(self, key: tuple, pattern: frozenset):
+        for order, histogram in self.patterns.items():
+            if len(pattern) >= order:
+                histogram.add(pattern, -1)
+
+    def update(self, touched: Iterable[int]):
+        """Account for a rewrite that created, removed or rewired the `touched` nodes"""
+        self._index.update(set(touched))
+
+    def node_entropy(self) -> float:
+        """Shannon entropy of the node type distribution"""
+        return self.types.entropy()
+
+    def interaction_entropy(self, order: int = 2) -> float:
+        """Entropy of the interaction patterns with at least `order` nodes"""
+        if order not in self.patterns:
+            raise ValueError(f"Order {order} is not tracked (tracked: {sorted(self.patterns)})")
+        if self.types.total < order:
+            return 0.0
+        return self.patterns[order].entropy()
+
+    def synergistic_information(self) -> float:
+        """High-order (3) interaction entropy in excess of the pairwise (2) one"""
+        return max(0.0, self.interaction_entropy(3) - self.interaction_entropy(2))
+
+    def measure(self) -> dict:
+        """All entropy measures at once"""
+        return {
+            "node_entropy": self.node_entropy(),
+            "pairwise_entropy": self.interaction_entropy(2),
+            "high_order_entropy": self.interaction_entropy(3),
+            "synergistic_information": self.synergistic_information(),
+            "nodes": self.types.total,
+        }
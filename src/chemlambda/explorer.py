@@ -0,0 +1,209 @@
+"""
+State-Space Explorer
+Enumerates every rewrite order of a molecule to check confluence and termination
+"""
+
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Manager
+from typing import Dict, List, Optional, Tuple
+from .graph import Graph
+from .reactions import Reaction, ALL_REACTIONS
+from .simulator import Simulator
+from .canonical import canonical_hash
+
+
+_claim_tokens = itertools.count()
+
+
+def _claim(visited, state_hash: str) -> bool:
+    """Mark a state as visited, returns True if this call was the first"""
+    if isinstance(visited, set):
+        if state_hash in visited:
+            return False
+        visited.add(state_hash)
+        return True
+    # A shared dict: setdefault is atomic in the manager process
+    token = (os.getpid(), next(_claim_tokens))
+    return visited.setdefault(state_hash, token) == token
+
+
+def _expand(graph: Graph, reactions: List[Reaction], visited) -> List[Tuple[str, str, Optional[Graph]]]:
+    """
+    All successors of a state, one per match of every reaction.
+
+    Returns (reaction name, successor hash, successor graph) triples; the
+    graph is None when the successor had already been visited, so known
+    states are not sent back to the coordinator.
+    """
+    successors = []
+    for reaction in reactions:
+        for match in graph.matches(reaction):
+            simulator = Simulator(graph.clone(), reactions, record_history=False)
+            if not simulator.apply_match(reaction, match):
+                continue
+            state_hash = canonical_hash(simulator.graph)
+            new = _claim(visited, state_hash)
+            successors.append((reaction.get_name(), state_hash, simulator.graph if new else None))
+    return successors
+
+
+def explore(graph: Graph, reactions: Optional[List[Reaction]] = None,
+            max_states: int = 10000, max_depth: int = 100,
+            processes: Optional[int] = None) -> dict:
+    """
+    Breadth-first search over every choice of redex.
+
+    States are compared by canonical hash, so isomorphic molecules reached
+    along different paths are explored once. Only the current frontier and
+    the normal forms are kept as graphs; other states are kept as hashes.
+    Each step applies one match and then the COMB clean-up, as
+    Simulator.step() does.
+
+    Args:
+        graph: Initial molecule (not modified)
+        reactions: Reactions to use (defaults to ALL_REACTIONS)
+        max_states: Stop as soon as this many distinct states are known
+        max_depth: Do not expand states deeper than this many steps
+        processes: Expand each level with this many worker processes, which
+            share the visited set through a multiprocessing manager
+
+    Returns:
+        Dictionary with:
+        - states, transitions, depth: size of the explored state graph
+        - complete: False if a bound cut the search short
+        - normal_forms: {hash: {"graph", "depth", "path"}} for every
+          state without redexes, with the shortest rewrite path to it
+        - confluent: whether all rewrite orders reach one normal form
+          (None if the search was incomplete and found at most one)
+        - terminating: whether every rewrite order terminates (False
+          once a cycle of states is found, None if incomplete)
+        - divergent: states where choosing a different redex changes the
+          set of reachable normal forms, shallowest first
+    """
+    reactions = reactions or ALL_REACTIONS
+    root = canonical_hash(graph)
+    parents: Dict[str, Tuple[Optional[str], str]] = {root: (None, "")}
+    depths: Dict[str, int] = {root: 0}
+    successors: Dict[str, List[str]] = {}
+    normal_forms: Dict[str, dict] = {}
+    complete = True
+    transitions = 0
+
+    manager = Manager() if processes else None
+    visited = manager.dict() if manager else set()
+    _claim(visited, root)
+    executor = ProcessPoolExecutor(processes) if processes else None
+
+    try:
+        frontier = [(root, graph.clone())]
+        depth = 0
+        while frontier:
+            if depth >= max_depth or len(depths) >= max_states:
+                complete = False
+                break
+
+            states = [state for _, state in frontier]
+            if executor is None:
+                # Lazily, so that states past the bound are not expanded
+                expanded = (_expand(state, reactions, visited) for state in states)
+            else:
+                expanded = list(executor.map(_expand, states, [reactions] * len(states),
+                                             [visited] * len(states)))
+
+            next_frontier = []
+            for (state_hash, state), children in zip(frontier, expanded):
+                successors[state_hash] = [child_hash for _, child_hash, _ in children]
+                transitions += len(children)
+                if not children:
+                    normal_forms[state_hash] = {"graph": state, "depth": depth}
+                for name, child_hash, child in children:
+                    if child is not None and child_hash not in depths:
+                        if len(depths) >= max_states:
+                            complete = False
+                            break
+                        parents[child_hash] = (state_hash, name)
+                        depths[child_hash] = depth + 1
+                        next_frontier.append((child_hash, child))
+                if not complete:
+                    break
+            if not complete:
+                break
+            frontier = next_frontier
+            depth += 1
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        if manager is not None:
+            manager.shutdown()
+
+    def path_to(state_hash: str) -> List[str]:
+        path = []
+        while parents[state_hash][0] is not None:
+            state_hash, name = parents[state_hash][0], parents[state_hash][1]
+            path.append(name)
+        return path[::-1]
+
+    for state_hash, info in normal_forms.items():
+        info["path"] = path_to(state_hash)
+
+    # Normal forms reachable from each expanded state, deepest states first
+    reach = {state_hash: {state_hash} for state_hash in normal_forms}
+    order = sorted(successors, key=lambda state_hash: depths[state_hash], reverse=True)
+    changed = True
+    while changed:
+        changed = False
+        for state_hash in order:
+            found = reach.setdefault(state_hash, set())
+            size = len(found)
+            for child_hash in successors[state_hash]:
+                found |= reach.get(child_hash, set())
+            changed = changed or len(found) != size
+
+    divergent = []
+    for state_hash in sorted(successors, key=lambda state_hash: depths[state_hash]):
+        outcomes = {frozenset(reach.get(child_hash, ())) for child_hash in successors[state_hash]}
+        if len(outcomes) > 1:
+            divergent.append({
+                "depth": depths[state_hash],
+                "path": path_to(state_hash),
+                "normal_forms": len(reach[state_hash]),
+            })
+
+    if len(normal_forms) > 1:
+        confluent = False
+    else:
+        confluent = True if complete else None
+
+    return {
+        "states": len(depths),
+        "transitions": transitions,
+        "depth": max(depths.values()),
+        "complete": complete,
+        "normal_forms": normal_forms,
+        "confluent": confluent,
+        "terminating": _terminating(successors, root, complete),
+        "divergent": divergent,
+    }
+
+
+def _terminating(successors: Dict[str, List[str]], root: str, complete: bool) -> Optional[bool]:
+    """False if the state graph has a cycle reachable from root, True if complete and acyclic"""
+    # Iterative DFS with colors: 1 = on the stack, 2 = finished
+    color = {root: 1}
+    stack = [(root, iter(successors.get(root, ())))]
+    while stack:
+        state_hash, children = stack[-1]
+        for child_hash in children:
+            state = color.get(child_hash)
+            if state == 1:
+                return False
+            if state is None:
+                color[child_hash] = 1
+                stack.append((child_hash, iter(successors.get(child_hash, ()))))
+                break
+        else:
+            color[state_hash] = 2
+            stack.pop()
+    return True if complete else None
@@ -3,7 +3,7 @@ Chemlambda Graph Structure
 Implements the graph representation for chemlambda molecules
 """
 
-from typing import Dict, List, Set, Tuple, Optional
+from typing import Dict, List, NamedTuple, Set, Tuple, Optional
 from enum import Enum
 from dataclasses import dataclass
 
@@ -19,27 +19,60 @@ class NodeType(Enum):
     ARROW = "Arrow"  # Arrow connector
     FRIN = "FRIN"    # Free input
     FROUT = "FROUT"  # Free output
+    S = "S"      # chemSKI substitution combinator
+    K = "K"      # chemSKI constant combinator
+    I = "I"      # chemSKI identity combinator
 
 
-@dataclass
-class Port:
-    """Represents a port on a node"""
+class Port(NamedTuple):
+    """
+    Represents a port on a node
+    
+    A named tuple, so ports are cheap to create, hash and compare; this
+    matters because Graph.edges is keyed by ports and large molecules
+    have millions of them.
+    
+    Note that this differs from the earlier dataclass: ports are
+    immutable, compare equal to the plain tuple (node_id, port_type,
+    direction), and are ordered like tuples (visualizer_svg.iter_edges
+    relies on this to keep one entry per edge). Code that mutated a port
+    must build a new Port instead.
+    """
     node_id: int
     port_type: str  # "middle", "left", "right"
     direction: str  # "in" or "out"
-    
-    def __hash__(self):
-        return hash((self.node_id, self.port_type, self.direction))
-    
-    def __eq__(self, other):
-        return (self.node_id == other.node_id and 
-                self.port_type == other.port_type and
-                self.direction == other.direction)
+
+
+# Builds a Port from a tuple without going through Port.__new__
+_new_port = tuple.__new__
+
+# Ports of each node type as (key in Node.ports, port_type, direction)
+_PORT_LAYOUT = {
+    NodeType.L: (("middle", "middle", "in"), ("left", "left", "out"), ("right", "right", "out")),
+    NodeType.A: (("left", "left", "in"), ("right", "right", "in"), ("middle", "middle", "out")),
+    NodeType.FI: (("left", "left", "in"), ("right", "right", "in"), ("middle", "middle", "out")),
+    NodeType.FO: (("middle", "middle", "in"), ("left", "left", "out"), ("right", "right", "out")),
+    NodeType.FOE: (("middle", "middle", "in"), ("left", "left", "out"), ("right", "right", "out")),
+    NodeType.T: (("middle", "middle", "in"),),
+    NodeType.ARROW: (("middle", "middle", "in"), ("middle_out", "middle", "out")),
+    NodeType.FRIN: (("middle", "middle", "out"),),
+    NodeType.FROUT: (("middle", "middle", "in"),),
+    NodeType.S: (("middle", "middle", "out"),),
+    NodeType.K: (("middle", "middle", "out"),),
+    NodeType.I: (("middle", "middle", "out"),),
+}
 
 
 @dataclass
 class Node:
-    """Represents a node in the graph"""
+    """
+    Represents a node in the graph
+    
+    Nodes use __slots__ (one node per graph element adds up), so no
+    attributes beyond node_id, node_type and ports can be set on them.
+    """
+    __slots__ = ("node_id", "node_type", "ports")
+    
     node_id: int
     node_type: NodeType
     ports: Dict[str, Port]  # port_type -> Port
@@ -47,61 +80,72 @@ class Node:
     def __init__(self, node_id: int, node_type: NodeType):
         self.node_id = node_id
         self.node_type = node_type
-        self.ports = {}
         self._init_ports()
     
     def _init_ports(self):
         """Initialize ports based on node type"""
-        if self.node_type == NodeType.L:
-            self.ports["middle"] = Port(self.node_id, "middle", "in")
-            self.ports["left"] = Port(self.node_id, "left", "out")
-            self.ports["right"] = Port(self.node_id, "right", "out")
-        elif self.node_type == NodeType.A:
-            self.ports["left"] = Port(self.node_id, "left", "in")
-            self.ports["right"] = Port(self.node_id, "right", "in")
-            self.ports["middle"] = Port(self.node_id, "middle", "out")
-        elif self.node_type == NodeType.FI:
-            self.ports["left"] = Port(self.node_id, "left", "in")
-            self.ports["right"] = Port(self.node_id, "right", "in")
-            self.ports["middle"] = Port(self.node_id, "middle", "out")
-        elif self.node_type == NodeType.FO:
-            self.ports["middle"] = Port(self.node_id, "middle", "in")
-            self.ports["left"] = Port(self.node_id, "left", "out")
-            self.ports["right"] = Port(self.node_id, "right", "out")
-        elif self.node_type == NodeType.FOE:
-            self.ports["middle"] = Port(self.node_id, "middle", "in")
-            self.ports["left"] = Port(self.node_id, "left", "out")
-            self.ports["right"] = Port(self.node_id, "right", "out")
-        elif self.node_type == NodeType.T:
-            self.ports["middle"] = Port(self.node_id, "middle", "in")
-        elif self.node_type == NodeType.ARROW:
-            self.ports["middle"] = Port(self.node_id, "middle", "in")
-            self.ports["middle_out"] = Port(self.node_id, "middle", "out")
-        elif self.node_type == NodeType.FRIN:
-            self.ports["middle"] = Port(self.node_id, "middle", "out")
-        elif self.node_type == NodeType.FROUT:
-            self.ports["middle"] = Port(self.node_id, "middle", "in")
+        node_id = self.node_id
+        self.ports = {
+            name: _new_port(Port, (node_id, port_type, direction))
+            for name, port_type, direction in _PORT_LAYOUT[self.node_type]
+        }
+
+
+def _port_name(node: Node, port: Port) -> str:
+    """Key of `port` in node.ports (the Arrow out port is stored as "middle_out")"""
+    if node.node_type == NodeType.ARROW and port.direction == "out":
+        return "middle_out"
+    return port.port_type
 
 
 class Graph:
-    """Represents a chemlambda graph"""
+    """
+    Represents a chemlambda graph
+    
+    FRIN and FROUT nodes can be registered under a name in `inputs` and
+    `outputs`. Named boundaries survive merge() (optionally prefixed), so a
+    program can be assembled from precompiled modules by merging them and
+    linking one module's output to another module's input.
+    
+    While `touched` is a set, add_node, remove_node, connect and disconnect
+    record the ids of the nodes they change in it. The simulator uses this
+    to see which nodes a rewrite consumed and rewired.
+    
+    `epoch` counts modifications: every change made through add_node,
+    remove_node, connect, disconnect or merge increments it. matches()
+    caches reaction matches per epoch, so analyses that look at the same
+    graph state share one enumeration. Code that edits `nodes` or `edges`
+    directly must call mark_modified().
+    """
     
     def __init__(self):
         self.nodes: Dict[int, Node] = {}
         self.edges: Dict[Port, Port] = {}  # Maps port -> connected port
         self.next_node_id = 0
+        self.inputs: Dict[str, int] = {}   # Boundary name -> FRIN node id
+        self.outputs: Dict[str, int] = {}  # Boundary name -> FROUT node id
+        self.touched: Optional[Set[int]] = None  # Changed node ids, if recording
+        self.epoch = 0  # Incremented by every modification
+        self._match_cache: Dict[tuple, list] = {}  # (epoch, reaction) -> matches
     
     def add_node(self, node_type: NodeType) -> int:
         """Add a node to the graph, returns node_id"""
         node_id = self.next_node_id
         self.next_node_id += 1
         self.nodes[node_id] = Node(node_id, node_type)
+        self.epoch += 1
+        if self.touched is not None:
+            self.touched.add(node_id)
         return node_id
     
     def connect(self, port1: Port, port2: Port):
         """Connect two ports"""
         self.edges[port1] = port2
         self.edges[port2] = port1
+        self.epoch += 1
+        if self.touched is not None:
+            self.touched.add(port1.node_id)
+            self.touched.add(port2.node_id)
     
     def disconnect(self, port: Port):
         """Disconnect a port"""
@@ -110,6 +154,10 @@ class Graph:
             del self.edges[port]
             if other in self.edges:
                 del self.edges[other]
+            self.epoch += 1
+            if self.touched is not None:
+                self.touched.add(port.node_id)
+                self.touched.add(other.node_id)
     
     def get_connected(self, port: Port) -> Optional[Port]:
         """Get the port connected to this port"""
@@ -125,27 +173,198 @@ class Graph:
         for port in node.ports.values():
             self.disconnect(port)
         
+        # Forget boundary names pointing at this node
+        if node.node_type in (NodeType.FRIN, NodeType.FROUT):
+            boundaries = self.inputs if node.node_type == NodeType.FRIN else self.outputs
+            for name in [name for name, boundary_id in boundaries.items() if boundary_id == node_id]:
+                del boundaries[name]
+        
         del self.nodes[node_id]
+        self.epoch += 1
+        if self.touched is not None:
+            self.touched.add(node_id)
+    
+    def mark_modified(self):
+        """Record a change made without the methods above, invalidating cached matches"""
+        self.epoch += 1
+    
+    def matches(self, reaction) -> List[tuple]:
+        """
+        Matches of a reaction in the current state of the graph.
+        
+        The result of reaction.can_apply() is cached until the graph is
+        next modified, so repeated queries on an unchanged graph (entropy
+        measures, quine detection, the simulator's next step) enumerate
+        the matches once. Returns a new list each time.
+        """
+        key = (self.epoch, reaction)
+        cached = self._match_cache.get(key)
+        if cached is None:
+            if self._match_cache and next(iter(self._match_cache))[0] != self.epoch:
+                self._match_cache.clear()
+            cached = self._match_cache[key] = reaction.can_apply(self)
+        return list(cached)
+    
+    def __getstate__(self):
+        # Cached matches are cheap to recompute and not worth pickling
+        state = self.__dict__.copy()
+        state["_match_cache"] = {}
+        return state
     
     def clone(self) -> 'Graph':
-        """Create a deep copy of the graph"""
+        """Create a deep copy of the graph (node ids are preserved)"""
         new_graph = Graph()
-        new_graph.next_node_id = self.next_node_id
+        new_graph.merge(self)
+        return new_graph
+    
+    def merge(self, other: 'Graph', prefix: str = "") -> int:
+        """
+        Copy all nodes, edges and named boundaries of another graph into this one.
         
-        # Copy nodes
-        for node_id, node in self.nodes.items():
-            new_graph.nodes[node_id] = Node(node_id, node.node_type)
+        Node ids of `other` are shifted by a single offset (this graph's
+        next_node_id), so no per-node add_node calls or id maps are needed
+        and the cost is linear in the size of `other`.
         
-        # Copy edges
-        for port1, port2 in self.edges.items():
-            if port1.node_id in new_graph.nodes and port2.node_id in new_graph.nodes:
-                node1 = new_graph.nodes[port1.node_id]
-                node2 = new_graph.nodes[port2.node_id]
-                port1_new = node1.ports[port1.port_type]
-                port2_new = node2.ports[port2.port_type]
-                new_graph.connect(port1_new, port2_new)
+        Args:
+            other: Graph to copy (not modified)
+            prefix: Prepended to the names of other's inputs and outputs
         
-        return new_graph
+        Returns:
+            The id offset: node k of `other` is node k + offset here
+        """
+        offset = self.next_node_id
+        
+        inputs = {prefix + name: node_id + offset for name, node_id in other.inputs.items()}
+        outputs = {prefix + name: node_id + offset for name, node_id in other.outputs.items()}
+        clashes = (inputs.keys() & self.inputs.keys()) | (outputs.keys() & self.outputs.keys())
+        if clashes:
+            raise ValueError(f"Boundary names already in use: {sorted(clashes)}")
+        
+        nodes = self.nodes
+        for node_id, node in other.nodes.items():
+            new_id = node_id + offset
+            nodes[new_id] = Node(new_id, node.node_type)
+        
+        edges = self.edges
+        other_nodes = other.nodes
+        for port1, port2 in other.edges.items():
+            node1 = other_nodes.get(port1.node_id)
+            node2 = other_nodes.get(port2.node_id)
+            if node1 is None or node2 is None:
+                continue
+            new_port1 = nodes[port1.node_id + offset].ports[_port_name(node1, port1)]
+            new_port2 = nodes[port2.node_id + offset].ports[_port_name(node2, port2)]
+            edges[new_port1] = new_port2
+        
+        self.inputs.update(inputs)
+        self.outputs.update(outputs)
+        self.next_node_id = offset + other.next_node_id
+        self.epoch += 1
+        return offset
+    
+    def link(self, out_port: Port, in_port: Port):
+        """
+        Connect an out port to an in port, checking both are free.
+        
+        Unlike connect(), this refuses to overwrite existing edges, which
+        would otherwise leave a half-connected port behind.
+        """
+        if out_port.direction != "out" or in_port.direction != "in":
+            raise ValueError(f"Cannot link {out_port} to {in_port}: expected an out port and an in port")
+        for port in (out_port, in_port):
+            if port in self.edges:
+                raise ValueError(f"Port {port} is already connected")
+        self.connect(out_port, in_port)
+    
+    def add_input(self, name: str) -> Port:
+        """Add a named FRIN boundary, returns its out port"""
+        if name in self.inputs:
+            raise ValueError(f"Input {name!r} already exists")
+        frin_id = self.add_node(NodeType.FRIN)
+        self.inputs[name] = frin_id
+        return self.nodes[frin_id].ports["middle"]
+    
+    def add_output(self, name: str, source: Port) -> int:
+        """Add a named FROUT boundary fed by `source`, returns its node id"""
+        if name in self.outputs:
+            raise ValueError(f"Output {name!r} already exists")
+        frout_id = self.add_node(NodeType.FROUT)
+        self.outputs[name] = frout_id
+        self.link(source, self.nodes[frout_id].ports["middle"])
+        return frout_id
+    
+    def take_input(self, name: str) -> Optional[Port]:
+        """
+        Remove a named FRIN boundary.
+        
+        Returns:
+            The in port the input was feeding (now free), or None
+        """
+        frin_id = self.inputs[name]
+        port = self.get_connected(self.nodes[frin_id].ports["middle"])
+        self.remove_node(frin_id)
+        return port
+    
+    def take_output(self, name: str) -> Optional[Port]:
+        """
+        Remove a named FROUT boundary.
+        
+        Returns:
+            The out port that was feeding the output (now free), or None
+        """
+        frout_id = self.outputs[name]
+        port = self.get_connected(self.nodes[frout_id].ports["middle"])
+        self.remove_node(frout_id)
+        return port
+    
+    def link_boundary(self, output_name: str, input_name: str):
+        """
+        Plug a named output into a named input, removing both boundary nodes.
+        
+        Typically used after merge() to feed one module's result into
+        another module's free variable.
+        """
+        source = self.get_connected(self.nodes[self.outputs[output_name]].ports["middle"])
+        frin_port = self.nodes[self.inputs[input_name]].ports["middle"]
+        dest = self.get_connected(frin_port)
+        if source is None or dest is None:
+            raise ValueError(f"Cannot link unconnected boundary {output_name!r} -> {input_name!r}")
+        if source == frin_port:
+            raise ValueError(f"Output {output_name!r} is fed directly by input {input_name!r}")
+        self.take_output(output_name)
+        self.take_input(input_name)
+        self.link(source, dest)
+    
+    def fan_out(self, source: Port, count: int) -> List[Port]:
+        """
+        Share the value produced at an out port between `count` consumers.
+        
+        Builds a balanced tree of FO nodes (depth O(log count)) and returns
+        the `count` out ports to connect consumers to. With count == 1 the
+        source itself is returned; with count == 0 the value is terminated
+        with a T node and no ports are returned.
+        """
+        if count == 0:
+            t_id = self.add_node(NodeType.T)
+            self.connect(source, self.nodes[t_id].ports["middle"])
+            return []
+        
+        leaves = [source]
+        while len(leaves) < count:
+            # Split leaves breadth first so the tree stays balanced
+            next_leaves = []
+            for i, port in enumerate(leaves):
+                if len(leaves) + len(next_leaves) - i >= count:
+                    next_leaves.extend(leaves[i:])
+                    break
+                fo_id = self.add_node(NodeType.FO)
+                fo = self.nodes[fo_id]
+                self.connect(port, fo.ports["middle"])
+                next_leaves.append(fo.ports["left"])
+                next_leaves.append(fo.ports["right"])
+            leaves = next_leaves
+        
+        return leaves
     
     def to_mol_format(self) -> str:
         """Convert graph to .mol file format"""
@@ -166,6 +385,8 @@ class Graph:
                 ports = ["middle.in"]
             elif node.node_type == NodeType.ARROW:
                 ports = ["middle.in", "middle.out"]
+            elif node.node_type in (NodeType.S, NodeType.K, NodeType.I):
+                ports = ["middle.out"]
             
             # Find connections
             port_vars = {}
@@ -194,6 +415,8 @@ class Graph:
                 line = f"T {port_vars.get('middle.in', '?')}"
             elif node.node_type == NodeType.ARROW:
                 line = f"Arrow {port_vars.get('middle.in', '?')} {port_vars.get('middle.out', '?')}"
+            elif node.node_type in (NodeType.S, NodeType.K, NodeType.I):
+                line = f"{node.node_type.value} {port_vars.get('middle.out', '?')}"
             else:
                 continue
             
@@ -204,3 +427,129 @@ class Graph:
     def __repr__(self):
         return f"Graph({len(self.nodes)} nodes, {len(self.edges)//2} edges)"
 
+
+def connected_components(graph: Graph) -> List[List[int]]:
+    """
+    Find the connected components of a graph.
+    
+    Each component lists its node ids in depth-first order, so runs of
+    consecutive ids tend to be connected regions (partition_graph relies
+    on this to cut few edges).
+    
+    Returns:
+        List of components, each a list of node ids
+    """
+    nodes = graph.nodes
+    edges = graph.edges
+    seen = set()
+    components = []
+    for start in nodes:
+        if start in seen:
+            continue
+        seen.add(start)
+        component = []
+        frontier = [start]
+        while frontier:
+            node_id = frontier.pop()
+            component.append(node_id)
+            for port in nodes[node_id].ports.values():
+                other = edges.get(port)
+                if other is not None and other.node_id not in seen and other.node_id in nodes:
+                    seen.add(other.node_id)
+                    frontier.append(other.node_id)
+        components.append(component)
+    return components
+
+
+class MatchIndex:
+    """
+    The matches of a list of reactions in a graph, kept up to date by node.
+    
+    Matches are keyed by (reaction index, match) and indexed by the nodes
+    they use. After a rewrite, update() is given the ids of the nodes it
+    created, removed or rewired (Graph.touched): the matches using those
+    nodes are dropped and only the region around them is searched again
+    (Reaction.match_at), so the cost follows the size of the rewrite, not
+    of the graph. The node types of the graph are tracked the same way.
+    
+    Users keep their own views through callbacks: on_add(key, nodes) and
+    on_remove(key, nodes) for matches, on_type(node_type, delta) for node
+    type counts. accept(key) can veto a match before it is indexed.
+    """
+    
+    def __init__(self, graph: Graph, reactions: list, on_add=None, on_remove=None,
+                 on_type=None, accept=None):
+        """
+        Args:
+            graph: Graph to index (read only, the caller rewrites it)
+            reactions: Reactions whose matches are indexed
+            on_add, on_remove, on_type, accept: Optional callbacks, see above
+        """
+        self.graph = graph
+        self.reactions = reactions
+        self.matches: Dict[tuple, frozenset] = {}  # (reaction index, match) -> node ids
+        self.types: Dict[int, str] = {}            # Node id -> node type value
+        self._by_node: Dict[int, Set[tuple]] = {}  # Node id -> keys of matches using it
+        self._on_add = on_add
+        self._on_remove = on_remove
+        self._on_type = on_type
+        self._accept = accept
+        
+        for node_id, node in graph.nodes.items():
+            self.types[node_id] = node.node_type.value
+            if on_type is not None:
+                on_type(node.node_type.value, 1)
+        for index, reaction in enumerate(reactions):
+            for match in graph.matches(reaction):
+                self.add(index, match)
+    
+    def add(self, index: int, match: tuple):
+        """Index a match of reactions[index] (no-op if known or not accepted)"""
+        key = (index, match)
+        if key in self.matches or (self._accept is not None and not self._accept(key)):
+            return
+        nodes = frozenset(node_id for node_id in self.reactions[index].match_nodes(match)
+                          if node_id in self.graph.nodes)
+        self.matches[key] = nodes
+        for node_id in nodes:
+            self._by_node.setdefault(node_id, set()).add(key)
+        if self._on_add is not None:
+            self._on_add(key, nodes)
+    
+    def remove(self, key: tuple):
+        """Drop a match (no-op if not indexed)"""
+        nodes = self.matches.pop(key, None)
+        if nodes is None:
+            return
+        for node_id in nodes:
+            users = self._by_node.get(node_id)
+            if users is not None:
+                users.discard(key)
+                if not users:
+                    del self._by_node[node_id]
+        if self._on_remove is not None:
+            self._on_remove(key, nodes)
+    
+    def update(self, touched):
+        """Account for a rewrite that created, removed or rewired the `touched` nodes"""
+        nodes = self.graph.nodes
+        for node_id in touched:
+            for key in list(self._by_node.get(node_id, ())):
+                self.remove(key)
+            
+            node_type = self.types.get(node_id)
+            node = nodes.get(node_id)
+            if node is None and node_type is not None:
+                del self.types[node_id]
+                if self._on_type is not None:
+                    self._on_type(node_type, -1)
+            elif node is not None and node_type is None:
+                node_type = self.types[node_id] = node.node_type.value
+                if self._on_type is not None:
+                    self._on_type(node_type, 1)
+        
+        alive = [node_id for node_id in touched if node_id in nodes]
+        if alive:
+            for index, reaction in enumerate(self.reactions):
+                for match in reaction.match_at(self.graph, alive):
+                    self.add(index, match)
@@ -0,0 +1,179 @@
+"""
+Stochastic Kinetics
+Continuous-time (Gillespie) simulation of chemlambda with per-move rate constants
+"""
+
+import math
+import random
+from typing import Dict, List, Optional, Tuple
+from .graph import Graph, MatchIndex
+from .reactions import Reaction, ALL_REACTIONS
+
+
+class GillespieSimulator:
+    """
+    Simulates a molecule as a well-mixed chemical system.
+
+    Every match of a move is a reaction channel instance. A move fires
+    with a rate constant taken from `rates`, looked up by its channel name:
+    the reaction name, followed by ":" and the variant tag for moves with
+    variants (e.g. "DIST:L_FO", "PRUNING:L_T"). A channel without its own
+    entry uses the rate of its reaction name and then `default_rate`. A
+    rate of math.inf makes a move instantaneous, which is how COMB
+    usually behaves.
+
+    Waiting times are exponential in the total propensity, as in
+    Gillespie's direct method. Matches are kept per channel and updated
+    after each event from the nodes the event changed, so an event costs
+    time proportional to the size of the rewritten region, not the graph.
+    """
+
+    def __init__(self, graph: Graph, reactions: Optional[List[Reaction]] = None,
+                 rates: Optional[Dict[str, float]] = None, default_rate: float = 1.0,
+                 seed: Optional[int] = None):
+        """
+        Args:
+            graph: Molecule to simulate (modified in place)
+            reactions: Reactions to use (defaults to ALL_REACTIONS)
+            rates: Rate constants by channel or reaction name
+            default_rate: Rate of moves not listed in `rates`
+            seed: Seed for the random number generator
+        """
+        self.graph = graph
+        self.reactions = reactions or ALL_REACTIONS
+        self.rates = dict(rates or {})
+        self.default_rate = default_rate
+        self.rng = random.Random(seed)
+        self.time = 0.0
+        self.step_count = 0
+
+        self._channels: Dict[str, List[tuple]] = {}      # Channel -> matches (reaction index, match)
+        self._positions: Dict[tuple, int] = {}            # Match -> index in its channel list
+        self._match_channel: Dict[tuple, str] = {}        # Match -> channel
+        self._rate_cache: Dict[str, float] = {}
+        self.species: Dict[str, int] = {}
+
+        self._index = MatchIndex(graph, self.reactions, on_add=self._add, on_remove=self._remove,
+                                 on_type=self._count_species, accept=self._has_rate)
+
+        # (time, channel, species counts) after every event
+        self.trajectory: List[Tuple[float, str, Dict[str, int]]] = [(0.0, "", dict(self.species))]
+
+    def channel_of(self, reaction: Reaction, match: Tuple) -> str:
+        """Channel name of a match: the reaction name plus its variant tag, if any"""
+        if match and isinstance(match[0], str):
+            return f"{reaction.get_name()}:{match[0]}"
+        return reaction.get_name()
+
+    def rate_of(self, channel: str) -> float:
+        """Rate constant of a channel"""
+        if channel not in self._rate_cache:
+            if channel in self.rates:
+                rate = self.rates[channel]
+            else:
+                rate = self.rates.get(channel.split(":", 1)[0], self.default_rate)
+            self._rate_cache[channel] = rate
+        return self._rate_cache[channel]
+
+    def propensities(self) -> Dict[str, float]:
+        """Current propensity (rate x number of matches) of every non-empty channel"""
+        return {channel: self.rate_of(channel) * len(matches)
+                for channel, matches in self._channels.items() if matches}
+
+    def _has_rate(self, key: tuple) -> bool:
+        return self.rate_of(self.channel_of(self.reactions[key[0]], key[1])) > 0
+
+    def _add(self, key: tuple, nodes: frozenset):
+        channel = self.channel_of(self.reactions[key[0]], key[1])
+        matches = self._channels.setdefault(channel, [])
+        self._positions[key] = len(matches)
+        self._match_channel[key] = channel
+        matches.append(key)
+
+    def _remove(self, key: tuple, nodes: frozenset):
+        position = self._positions.pop(key)
+        matches = self._channels[self._match_channel.pop(key)]
+        # Swap with the last match so removal is O(1)
+        last = matches.pop()
+        if last != key:
+            matches[position] = last
+            self._positions[last] = position
+
+    def _count_species(self, node_type: str, delta: int):
+        self.species[node_type] = self.species.get(node_type, 0) + delta
+
+    def _choose(self) -> Optional[Tuple[str, tuple, float]]:
+        """Pick the next event: (channel, match, waiting time), or None"""
+        total = 0.0
+        weighted = []
+        for channel, matches in self._channels.items():
+            if not matches:
+                continue
+            rate = self.rate_of(channel)
+            if rate == math.inf:
+                return channel, matches[self.rng.randrange(len(matches))], 0.0
+            weighted.append((channel, rate * len(matches)))
+            total += rate * len(matches)
+        if total <= 0:
+            return None
+
+        target = self.rng.random() * total
+        for channel, propensity in weighted:
+            target -= propensity
+            if target < 0:
+                break
+        matches = self._channels[channel]
+        return channel, matches[self.rng.randrange(len(matches))], self.rng.expovariate(total)
+
+    def step(self) -> bool:
+        """
+        Fire one event and advance the clock.
+        Returns True if an event fired, False if no move is possible
+        """
+        while True:
+            choice = self._choose()
+            if choice is None:
+                return False
+            channel, key, waiting_time = choice
+
+            touched = self.graph.touched = set()
+            try:
+                success = self.reactions[key[0]].apply(self.graph, key[1])
+            finally:
+                self.graph.touched = None
+            if success:
+                break
+            # A stale match: drop it and pick again
+            self._index.remove(key)
+            self._index.update(touched)
+
+        self.time += waiting_time
+        self.step_count += 1
+        self._index.update(touched)
+        self.trajectory.append((self.time, channel, dict(self.species)))
+        return True
+
+    def run(self, max_steps: int = 1000, max_time: float = math.inf) -> int:
+        """
+        Simulate until no move is possible, max_steps events or max_time.
+        Returns number of events
+        """
+        steps = 0
+        while steps < max_steps and self.time < max_time:
+            if not self.step():
+                break
+            steps += 1
+        return steps
+
+    def get_stats(self) -> dict:
+        """Get statistics about the simulation"""
+        channel_counts: Dict[str, int] = {}
+        for _, channel, _ in self.trajectory[1:]:
+            channel_counts[channel] = channel_counts.get(channel, 0) + 1
+        return {
+            "total_steps": self.step_count,
+            "time": self.time,
+            "channel_counts": channel_counts,
+            "species": dict(self.species),
+            "final_nodes": len(self.graph.nodes),
+        }
@@ -0,0 +1,430 @@
+"""
+Force-Directed Layout
+Spring-electrical node placement with Barnes-Hut repulsion for drawing molecules
+"""
+
+import math
+import random
+from typing import Dict, List, Optional, Set, Tuple
+from .graph import Graph
+
+
+Position = Tuple[float, float]
+
+MAX_DEPTH = 24  # Quadtree depth beyond which coincident points share a leaf
+EDGE_LENGTH = 1.0  # Natural spring length in layout coordinates (before fitting)
+MAX_ITERATIONS = 100  # Default iterations for small molecules
+MIN_ITERATIONS = 20  # Default iterations however large the molecule
+ITERATION_BUDGET = 20000  # Default iterations times node count, between the two bounds
+
+
+def _build_tree(xs: List[float], ys: List[float], indices: List[int],
+                cx: float, cy: float, half: float, depth: int, tree: list) -> int:
+    """
+    Add the quadtree cell holding `indices` to `tree`, returns its index.
+
+    A cell is [size, mass, center of mass x, y, children, point], where
+    children is a list of cell indices (empty for a leaf) and point is
+    the single point of a one-point leaf (-1 otherwise).
+    """
+    mass = len(indices)
+    mx = sum(xs[i] for i in indices) / mass
+    my = sum(ys[i] for i in indices) / mass
+    cell = len(tree)
+    tree.append([2 * half, mass, mx, my, [], indices[0] if mass == 1 else -1])
+    if mass == 1 or depth >= MAX_DEPTH:
+        return cell
+
+    quadrants: List[List[int]] = [[], [], [], []]
+    for i in indices:
+        quadrants[(xs[i] >= cx) + 2 * (ys[i] >= cy)].append(i)
+    half /= 2
+    children = tree[cell][4]
+    for quadrant, members in enumerate(quadrants):
+        if members:
+            children.append(_build_tree(xs, ys, members,
+                                        cx + (half if quadrant & 1 else -half),
+                                        cy + (half if quadrant & 2 else -half),
+                                        half, depth + 1, tree))
+    return cell
+
+
+def _repulsion(xs: List[float], ys: List[float], tree: list, i: int,
+               strength: float, theta: float) -> Position:
+    """Barnes-Hut approximation of the repulsive force on point i"""
+    x, y = xs[i], ys[i]
+    fx = fy = 0.0
+    stack = [0]
+    while stack:
+        size, mass, mx, my, children, point = tree[stack.pop()]
+        if point == i:
+            continue
+        dx, dy = x - mx, y - my
+        distance_sq = dx * dx + dy * dy
+        if children and size * size >= theta * theta * distance_sq:
+            stack.extend(children)
+            continue
+        if distance_sq < 1e-9:
+            # Coincident points: push apart in a fixed but point-specific direction
+            angle = i * 2.399963
+            dx, dy, distance_sq = math.cos(angle) * 1e-3, math.sin(angle) * 1e-3, 1e-6
+        # Magnitude strength * mass / distance, along (dx, dy)
+        factor = strength * mass / distance_sq
+        fx += dx * factor
+        fy += dy * factor
+    return fx, fy
+
+
+def default_iterations(node_count: int) -> int:
+    """
+    Iterations of a layout of node_count nodes when none are given.
+
+    Small molecules get MAX_ITERATIONS. Larger ones get fewer, so the
+    default layout costs about the same however big the molecule is,
+    down to MIN_ITERATIONS.
+    """
+    return max(MIN_ITERATIONS, min(MAX_ITERATIONS, ITERATION_BUDGET // max(node_count, 1)))
+
+
+def force_layout(graph: Graph, width: float = 800, height: float = 600,
+                 iterations: Optional[int] = None, initial: Optional[Dict[int, Position]] = None,
+                 theta: float = 0.8, margin: float = 30, seed: Optional[int] = 0) -> Dict[int, Position]:
+    """
+    Place nodes with a Fruchterman-Reingold style force simulation.
+
+    Edges of the graph are springs, and every pair of nodes repels. The
+    repulsion is approximated with a Barnes-Hut quadtree: a far-away cell
+    (size / distance < theta) acts as a single body at its center of mass,
+    so an iteration costs O(n log n) instead of O(n^2).
+
+    Args:
+        graph: Molecule to lay out
+        width, height: Drawing area; the result is scaled to fit inside it
+        iterations: Number of simulation steps (default_iterations() of
+            the node count if None)
+        initial: Warm start. Nodes listed here start at these positions
+            (e.g. the layout before a rewrite) and the simulation starts
+            cooler, so they move little; other nodes start next to a placed
+            neighbor
+        theta: Barnes-Hut accuracy (0 computes every pair exactly)
+        margin: Free border around the drawing
+        seed: Seed for the random initial placement
+
+    Returns:
+        Position of every node id
+    """
+    return _fit(_simulate(graph, iterations, initial, theta, seed), width, height, margin)
+
+
+def _simulate(graph: Graph, iterations: Optional[int], initial: Optional[Dict[int, Position]],
+              theta: float, seed: Optional[int]) -> Dict[int, Position]:
+    """The simulation of force_layout(), in layout coordinates"""
+    node_ids = list(graph.nodes)
+    n = len(node_ids)
+    if n == 0:
+        return {}
+    if iterations is None:
+        iterations = default_iterations(n)
+    index = {node_id: i for i, node_id in enumerate(node_ids)}
+    rng = random.Random(seed)
+
+    springs = set()
+    for port1, port2 in graph.edges.items():
+        i, j = index.get(port1.node_id), index.get(port2.node_id)
+        if i is not None and j is not None and i != j:
+            springs.add((min(i, j), max(i, j)))
+    springs = list(springs)
+
+    # Work in a square of area n * k^2, where k is the natural edge length
+    k = EDGE_LENGTH
+    side = k * math.sqrt(n)
+    xs = [0.0] * n
+    ys = [0.0] * n
+    placed = [False] * n
+    initial = initial or {}
+    for node_id, (x, y) in initial.items():
+        i = index.get(node_id)
+        if i is not None:
+            xs[i], ys[i] = x, y
+            placed[i] = True
+
+    warm = any(placed)
+    if warm:
+        # Rescale the given positions so that springs between them have
+        # their natural length k on average
+        lengths = [math.hypot(xs[i] - xs[j], ys[i] - ys[j]) for i, j in springs
+                   if placed[i] and placed[j]]
+        scale = k * len(lengths) / sum(lengths) if lengths and sum(lengths) > 0 else 1.0
+        for i in range(n):
+            if placed[i]:
+                xs[i] *= scale
+                ys[i] *= scale
+        neighbors: Dict[int, List[int]] = {}
+        for i, j in springs:
+            neighbors.setdefault(i, []).append(j)
+            neighbors.setdefault(j, []).append(i)
+        # New nodes go next to a placed neighbor, spreading out from the old layout
+        pending = [i for i in range(n) if not placed[i]]
+        while pending:
+            remaining = []
+            for i in pending:
+                anchor = next((j for j in neighbors.get(i, ()) if placed[j]), None)
+                if anchor is None:
+                    remaining.append(i)
+                    continue
+                xs[i] = xs[anchor] + rng.uniform(-k, k)
+                ys[i] = ys[anchor] + rng.uniform(-k, k)
+                placed[i] = True
+            if len(remaining) == len(pending):
+                # Not connected to the old layout: anywhere in its bounding box
+                known = [i for i in range(n) if placed[i]]
+                min_x, max_x = min(xs[i] for i in known), max(xs[i] for i in known)
+                min_y, max_y = min(ys[i] for i in known), max(ys[i] for i in known)
+                for i in remaining:
+                    xs[i], ys[i] = rng.uniform(min_x, max_x + k), rng.uniform(min_y, max_y + k)
+                break
+            pending = remaining
+    else:
+        for i in range(n):
+            xs[i], ys[i] = rng.uniform(0, side), rng.uniform(0, side)
+
+    # Cap on the distance a node moves per step, cooling linearly
+    temperature = side / (50 if warm else 5)
+    cooling = temperature / (iterations + 1)
+    k_sq = k * k
+    for _ in range(iterations):
+        min_x, max_x, min_y, max_y = min(xs), max(xs), min(ys), max(ys)
+        half = max(max_x - min_x, max_y - min_y, 1e-6) / 2 + 1e-9
+        tree: list = []
+        _build_tree(xs, ys, list(range(n)), (min_x + max_x) / 2, (min_y + max_y) / 2, half, 0, tree)
+
+        forces = [_repulsion(xs, ys, tree, i, k_sq, theta) for i in range(n)]
+        fx = [force[0] for force in forces]
+        fy = [force[1] for force in forces]
+        for i, j in springs:
+            dx, dy = xs[i] - xs[j], ys[i] - ys[j]
+            # Magnitude distance^2 / k, along (dx, dy)
+            factor = math.sqrt(dx * dx + dy * dy) / k
+            fx[i] -= dx * factor
+            fy[i] -= dy * factor
+            fx[j] += dx * factor
+            fy[j] += dy * factor
+
+        for i in range(n):
+            length = math.sqrt(fx[i] * fx[i] + fy[i] * fy[i])
+            if length > 0:
+                step = min(length, temperature) / length
+                xs[i] += fx[i] * step
+                ys[i] += fy[i] * step
+        temperature -= cooling
+
+    return {node_id: (xs[i], ys[i]) for node_id, i in index.items()}
+
+
+def _fit(coordinates: Dict[int, Position], width: float, height: float, margin: float,
+         bounds: Optional[Tuple[float, float, float, float]] = None) -> Dict[int, Position]:
+    """
+    Scale and center layout coordinates into the drawing area, keeping the aspect ratio.
+
+    `bounds` (min x, min y, max x, max y) is the region mapped to the
+    drawing area; it defaults to the bounding box of the coordinates.
+    """
+    if not coordinates:
+        return {}
+    if bounds is None:
+        xs = [x for x, _ in coordinates.values()]
+        ys = [y for _, y in coordinates.values()]
+        bounds = (min(xs), min(ys), max(xs), max(ys))
+    min_x, min_y, max_x, max_y = bounds
+    span_x, span_y = max_x - min_x, max_y - min_y
+    scale = min((width - 2 * margin) / span_x if span_x else math.inf,
+                (height - 2 * margin) / span_y if span_y else math.inf)
+    if scale == math.inf:
+        scale = 0.0
+    offset_x = (width - scale * span_x) / 2
+    offset_y = (height - scale * span_y) / 2
+    return {node_id: (offset_x + (x - min_x) * scale, offset_y + (y - min_y) * scale)
+            for node_id, (x, y) in coordinates.items()}
+
+
+class LayoutSession:
+    """
+    Keeps a layout across the steps of a run, for drawing animation frames.
+
+    The molecule is laid out once with force_layout's simulation; after
+    that, update() is called with the node ids a step touched (e.g.
+    Simulator.last_touched). Nodes the step created start at the centroid
+    of the nodes it removed, and only the region within `radius` hops of
+    the touched nodes is relaxed, for `frame_iterations` iterations. The
+    rest of the layout stays put, and repulsion is taken from nearby nodes
+    only, found through a uniform grid that is updated as nodes move. The
+    cost of a frame therefore depends on the size of the rewrite, not of
+    the molecule.
+
+    Positions are kept in layout coordinates. positions() maps them to a
+    drawing area through a viewport that only grows, so nodes that did
+    not move stay at the same place from frame to frame.
+    """
+
+    def __init__(self, graph: Graph, iterations: Optional[int] = None, frame_iterations: int = 5,
+                 radius: int = 1, theta: float = 0.8, seed: Optional[int] = 0):
+        """
+        Args:
+            graph: Molecule being simulated (read, never modified)
+            iterations: Iterations of the initial full layout (see
+                default_iterations() for None)
+            frame_iterations: Relaxation iterations per update()
+            radius: Hops around the touched nodes that may move per update()
+            theta: Barnes-Hut accuracy of the initial layout
+            seed: Seed for the initial layout and the placement jitter
+        """
+        self.graph = graph
+        self.frame_iterations = frame_iterations
+        self.radius = radius
+        self._rng = random.Random(seed)
+        self._cell = 2 * EDGE_LENGTH  # Grid cell size; repulsion reaches the 3x3 cells around a node
+        self._grid: Dict[Tuple[int, int], set] = {}
+        self.coordinates: Dict[int, Position] = {}
+        for node_id, (x, y) in _simulate(graph, iterations, None, theta, seed).items():
+            self._place(node_id, x, y)
+        self.bounds: Optional[Tuple[float, float, float, float]] = None
+        self._grow(self.coordinates)
+
+    def _key(self, x: float, y: float) -> Tuple[int, int]:
+        return math.floor(x / self._cell), math.floor(y / self._cell)
+
+    def _place(self, node_id: int, x: float, y: float):
+        """Set a node's position, keeping the grid in sync"""
+        old = self.coordinates.get(node_id)
+        key = self._key(x, y)
+        if old is not None:
+            old_key = self._key(*old)
+            if old_key == key:
+                self.coordinates[node_id] = (x, y)
+                return
+            self._unplace(node_id)
+        self.coordinates[node_id] = (x, y)
+        self._grid.setdefault(key, set()).add(node_id)
+
+    def _unplace(self, node_id: int):
+        key = self._key(*self.coordinates.pop(node_id))
+        cell = self._grid[key]
+        cell.discard(node_id)
+        if not cell:
+            del self._grid[key]
+
+    def _grow(self, node_ids):
+        """Extend the viewport to cover the given nodes"""
+        for node_id in node_ids:
+            x, y = self.coordinates[node_id]
+            if self.bounds is None:
+                self.bounds = (x, y, x, y)
+            else:
+                min_x, min_y, max_x, max_y = self.bounds
+                self.bounds = (min(min_x, x), min(min_y, y), max(max_x, x), max(max_y, y))
+
+    def _neighbors(self, node_id: int) -> List[int]:
+        edges = self.graph.edges
+        neighbors = []
+        for port in self.graph.nodes[node_id].ports.values():
+            other = edges.get(port)
+            if other is not None and other.node_id != node_id:
+                neighbors.append(other.node_id)
+        return neighbors
+
+    def update(self, touched: Optional[Set[int]] = None) -> int:
+        """
+        Follow the graph after a step.
+
+        Args:
+            touched: Node ids the step created, removed or rewired. With
+                None the whole graph is compared with the layout, which
+                costs O(n)
+
+        Returns:
+            Number of nodes relaxed
+        """
+        nodes = self.graph.nodes
+        if touched is None:
+            touched = (self.coordinates.keys() - nodes.keys()) | (nodes.keys() - self.coordinates.keys())
+        removed = [node_id for node_id in touched if node_id in self.coordinates and node_id not in nodes]
+        created = [node_id for node_id in touched if node_id in nodes and node_id not in self.coordinates]
+
+        # New nodes start where the nodes they replace were (or, for a
+        # pure addition, among the rewired nodes), with a little jitter so
+        # that they do not coincide
+        anchors = removed or [node_id for node_id in touched if node_id in self.coordinates]
+        if anchors:
+            cx = sum(self.coordinates[node_id][0] for node_id in anchors) / len(anchors)
+            cy = sum(self.coordinates[node_id][1] for node_id in anchors) / len(anchors)
+        elif self.bounds is not None:
+            cx, cy = (self.bounds[0] + self.bounds[2]) / 2, (self.bounds[1] + self.bounds[3]) / 2
+        else:
+            cx = cy = 0.0
+        for node_id in removed:
+            self._unplace(node_id)
+        jitter = EDGE_LENGTH / 2
+        for node_id in created:
+            self._place(node_id, cx + self._rng.uniform(-jitter, jitter), cy + self._rng.uniform(-jitter, jitter))
+
+        region = {node_id for node_id in touched if node_id in nodes}
+        frontier = list(region)
+        for _ in range(self.radius):
+            frontier = [other for node_id in frontier for other in self._neighbors(node_id)
+                        if other not in region]
+            region.update(frontier)
+        self._relax(region)
+        self._grow(region)
+        return len(region)
+
+    def _relax(self, region: Set[int]):
+        """Run frame_iterations force iterations moving only the nodes in `region`"""
+        if not region:
+            return
+        k = EDGE_LENGTH
+        k_sq = k * k
+        cutoff_sq = self._cell * self._cell
+        coordinates = self.coordinates
+        grid = self._grid
+        springs = {node_id: self._neighbors(node_id) for node_id in region}
+        temperature = k / 2
+        cooling = temperature / (self.frame_iterations + 1)
+        for _ in range(self.frame_iterations):
+            moves = []
+            for node_id in region:
+                x, y = coordinates[node_id]
+                fx = fy = 0.0
+                gx, gy = self._key(x, y)
+                for cell_x in (gx - 1, gx, gx + 1):
+                    for cell_y in (gy - 1, gy, gy + 1):
+                        for other in grid.get((cell_x, cell_y), ()):
+                            if other == node_id:
+                                continue
+                            ox, oy = coordinates[other]
+                            dx, dy = x - ox, y - oy
+                            distance_sq = dx * dx + dy * dy
+                            if distance_sq > cutoff_sq:
+                                continue
+                            if distance_sq < 1e-9:
+                                angle = node_id * 2.399963
+                                dx, dy, distance_sq = math.cos(angle) * 1e-3, math.sin(angle) * 1e-3, 1e-6
+                            factor = k_sq / distance_sq
+                            fx += dx * factor
+                            fy += dy * factor
+                for other in springs[node_id]:
+                    ox, oy = coordinates[other]
+                    dx, dy = x - ox, y - oy
+                    factor = math.sqrt(dx * dx + dy * dy) / k
+                    fx -= dx * factor
+                    fy -= dy * factor
+                length = math.sqrt(fx * fx + fy * fy)
+                if length > 0:
+                    step = min(length, temperature) / length
+                    moves.append((node_id, x + fx * step, y + fy * step))
+            for node_id, x, y in moves:
+                self._place(node_id, x, y)
+            temperature -= cooling
+
+    def positions(self, width: float = 800, height: float = 600, margin: float = 30) -> Dict[int, Position]:
+        """Current positions scaled into a drawing area through the session's viewport"""
+        return _fit(self.coordinates, width, height, margin, self.bounds)
@@ -0,0 +1,160 @@
+"""
+Motif Census
+Counts connected port-labelled subgraphs (graphlets) of a molecule by canonical motif
+"""
+
+import itertools
+import math
+from array import array
+from typing import Dict, List, Tuple
+from .graph import Graph
+from .canonical import _neighbors
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+
+# A motif: node types in canonical order, then its port-labelled edges as
+# (i, port name, j, port name) with i, j positions in that order
+Motif = Tuple[Tuple[str, ...], Tuple[Tuple[int, str, int, str], ...]]
+
+
+def canonical_motif(types: Tuple[str, ...], edges: List[Tuple[int, str, int, str]]) -> Motif:
+    """
+    Canonical form of a small port-labelled graph.
+
+    Nodes are ordered by type and every order of nodes of equal type is
+    tried, keeping the smallest edge list, so isomorphic graphs (same
+    types and port-to-port connections) get the same form.
+
+    Args:
+        types: Node type of each node
+        edges: Edges as (node, port name, node, port name) by position
+    """
+    order = sorted(range(len(types)), key=lambda i: types[i])
+    groups = [list(group) for _, group in itertools.groupby(order, key=lambda i: types[i])]
+    best = None
+    for arrangement in itertools.product(*(itertools.permutations(group) for group in groups)):
+        position = {}
+        for block in arrangement:
+            for node in block:
+                position[node] = len(position)
+        relabelled = []
+        for i, port_i, j, port_j in edges:
+            a, b = (position[i], port_i), (position[j], port_j)
+            if b < a:
+                a, b = b, a
+            relabelled.append(a + b)
+        relabelled = tuple(sorted(relabelled))
+        if best is None or relabelled < best:
+            best = relabelled
+    return tuple(types[i] for i in order), best
+
+
+class MotifCensus:
+    """
+    Number of occurrences of every connected motif of 1 to max_size nodes.
+
+    Subgraphs are enumerated with ESU (Wernicke, 2006): every connected
+    induced subgraph is reached exactly once, growing from its smallest
+    node id through the exclusive neighborhoods of the nodes added so
+    far, so all sizes up to max_size come out of one pass. Each
+    subgraph's edges are read in the order it was grown and the
+    canonical form of that raw encoding is cached, so canonicalization
+    runs once per distinct raw shape rather than once per subgraph.
+
+    Motifs get integer ids in order of discovery; `counts` is a typed
+    array indexed by motif id (as_arrays() gives NumPy arrays when NumPy
+    is installed).
+    """
+
+    def __init__(self, graph: Graph, max_size: int = 4):
+        """
+        Args:
+            graph: Molecule to census (not modified)
+            max_size: Largest subgraph size to count
+        """
+        self.max_size = max_size
+        self.motifs: List[Motif] = []          # Motif id -> canonical form
+        self.sizes = array("b")                # Motif id -> number of nodes
+        self.counts = array("q")               # Motif id -> occurrences
+        self._ids: Dict[Motif, int] = {}
+        self._raw: Dict[tuple, int] = {}       # Raw encoding -> motif id
+        self._census(graph)
+
+    def _motif_id(self, raw: tuple) -> int:
+        motif_id = self._raw.get(raw)
+        if motif_id is None:
+            types, edges = raw
+            motif = canonical_motif(types, list(edges))
+            motif_id = self._ids.get(motif)
+            if motif_id is None:
+                motif_id = self._ids[motif] = len(self.motifs)
+                self.motifs.append(motif)
+                self.sizes.append(len(types))
+                self.counts.append(0)
+            self._raw[raw] = motif_id
+        return motif_id
+
+    def _census(self, graph: Graph):
+        adjacency = _neighbors(graph)
+        types = {node_id: node.node_type.value for node_id, node in graph.nodes.items()}
+        neighbors = {node_id: {other for _, other, _ in entries if other >= 0 and other != node_id}
+                     for node_id, entries in adjacency.items()}
+        max_size = self.max_size
+        counts = self.counts
+        motif_id = self._motif_id
+
+        def emit(subgraph: List[int]):
+            index = {node_id: i for i, node_id in enumerate(subgraph)}
+            edges = []
+            for i, node_id in enumerate(subgraph):
+                for port, other, other_port in adjacency[node_id]:
+                    j = index.get(other)
+                    # Each edge once, from its smaller (position, port) end
+                    if j is not None and (i, port) <= (j, other_port):
+                        edges.append((i, port, j, other_port))
+            counts[motif_id((tuple(types[node_id] for node_id in subgraph), tuple(edges)))] += 1
+
+        def extend(subgraph: List[int], covered: set, extension: List[int], root: int):
+            emit(subgraph)
+            if len(subgraph) == max_size:
+                return
+            extension = list(extension)
+            while extension:
+                node_id = extension.pop()
+                exclusive = [other for other in neighbors[node_id]
+                             if other > root and other not in covered]
+                subgraph.append(node_id)
+                extend(subgraph, covered.union(exclusive), extension + exclusive, root)
+                subgraph.pop()
+
+        for root in graph.nodes:
+            extension = [other for other in neighbors[root] if other > root]
+            extend([root], {root, *neighbors[root]}, extension, root)
+
+    def counts_by_size(self, size: int) -> Dict[Motif, int]:
+        """Occurrences of each motif with `size` nodes"""
+        return {self.motifs[i]: self.counts[i] for i in range(len(self.motifs))
+                if self.sizes[i] == size and self.counts[i]}
+
+    def total(self, size: int) -> int:
+        """Number of connected subgraphs with `size` nodes"""
+        return sum(count for i, count in enumerate(self.counts) if self.sizes[i] == size)
+
+    def entropy(self, size: int) -> float:
+        """Shannon entropy of the motif distribution among subgraphs of `size` nodes"""
+        counts = [count for i, count in enumerate(self.counts) if self.sizes[i] == size and count]
+        total = sum(counts)
+        if total == 0:
+            return 0.0
+        return -sum(count / total * math.log2(count / total) for count in counts)
+
+    def as_arrays(self):
+        """(sizes, counts) as NumPy arrays, or as typed arrays without NumPy"""
+        if HAS_NUMPY:
+            return np.frombuffer(self.sizes, dtype=np.int8), np.frombuffer(self.counts, dtype=np.int64)
+        return self.sizes, self.counts
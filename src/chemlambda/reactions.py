@@ -3,17 +3,141 @@ Chemlambda Reaction Implementations
 Implements all the graph rewriting reactions (moves)
 """
 
-from typing import List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
 from .graph import Graph, Node, NodeType, Port
 
 
+def rewire(graph: Graph, old_ids: List[int], external: Dict[str, Port],
+           new_nodes: List[Tuple[NodeType, Dict[str, str]]]) -> List[int]:
+    """
+    Replace a matched pattern with new nodes, mol-file style.
+    
+    `external` names the ports of the old nodes that leave the pattern
+    (e.g. {"1": l.ports["middle"], ...}). `new_nodes` lists the
+    replacement nodes as (node_type, {port_name: variable}). A variable
+    from `external` is wired to whatever the old port was connected to; a
+    variable used by two new ports is an internal edge between them. Old
+    ports that were connected to each other (loops through the pattern)
+    are handled by wiring their new ports together.
+    
+    Returns the ids of the created nodes.
+    """
+    port_var = {port: var for var, port in external.items()}
+    outside = {var: graph.get_connected(port) for var, port in external.items()}
+    
+    for node_id in old_ids:
+        graph.remove_node(node_id)
+    
+    created = []
+    endpoints: Dict[str, List[Port]] = {}
+    for node_type, port_vars in new_nodes:
+        node_id = graph.add_node(node_type)
+        created.append(node_id)
+        node = graph.nodes[node_id]
+        for port_name, var in port_vars.items():
+            endpoints.setdefault(var, []).append(node.ports[port_name])
+    
+    done = set()
+    for var, ports in endpoints.items():
+        if var in done:
+            continue
+        done.add(var)
+        if var not in external:
+            if len(ports) == 2:
+                graph.connect(ports[0], ports[1])
+            continue
+        target = outside[var]
+        if target is None:
+            continue
+        if target in port_var:
+            # The old port looped back into the pattern
+            other = port_var[target]
+            done.add(other)
+            if other in endpoints:
+                graph.connect(ports[0], endpoints[other][0])
+        else:
+            graph.connect(ports[0], target)
+    
+    return created
+
+
+class _RegionNodes:
+    """Node mapping that looks up any node but only iterates over a region"""
+    
+    def __init__(self, nodes: Dict[int, Node], region: List[int]):
+        self._nodes = nodes
+        self._region = region
+    
+    def __getitem__(self, node_id: int) -> Node:
+        return self._nodes[node_id]
+    
+    def __contains__(self, node_id: int) -> bool:
+        return node_id in self._nodes
+    
+    def __iter__(self):
+        return iter(self._region)
+    
+    def __len__(self) -> int:
+        return len(self._region)
+    
+    def get(self, node_id: int, default=None):
+        return self._nodes.get(node_id, default)
+    
+    def items(self):
+        return ((node_id, self._nodes[node_id]) for node_id in self._region)
+    
+    def values(self):
+        return (self._nodes[node_id] for node_id in self._region)
+
+
+class _RegionView:
+    """Read-only stand-in for a Graph whose node iteration is limited to a region"""
+    
+    def __init__(self, graph: Graph, region: List[int]):
+        self.nodes = _RegionNodes(graph.nodes, region)
+        self.edges = graph.edges
+        self.get_connected = graph.get_connected
+
+
 class Reaction:
     """Base class for reactions"""
     
+    # Longest path (in edges) from the node can_apply() finds a match
+    # from to any other node of the match
+    pattern_radius = 1
+    
     def can_apply(self, graph: Graph) -> List[Tuple]:
         """Check if reaction can be applied, returns list of matches"""
         raise NotImplementedError
     
+    def match_nodes(self, match: Tuple) -> Tuple[int, ...]:
+        """Ids of the nodes in a match (the integers in the match tuple)"""
+        return tuple(item for item in match if isinstance(item, int))
+    
+    def match_at(self, graph: Graph, node_ids: List[int]) -> List[Tuple]:
+        """
+        Find the matches that involve at least one of `node_ids`.
+        
+        Runs can_apply() on the nodes within pattern_radius of node_ids
+        only, so the cost depends on the size of that region rather than
+        of the graph.
+        """
+        region = set(node_id for node_id in node_ids if node_id in graph.nodes)
+        frontier = list(region)
+        for _ in range(self.pattern_radius):
+            next_frontier = []
+            for node_id in frontier:
+                for port in graph.nodes[node_id].ports.values():
+                    other = graph.edges.get(port)
+                    if other is not None and other.node_id not in region and other.node_id in graph.nodes:
+                        region.add(other.node_id)
+                        next_frontier.append(other.node_id)
+            frontier = next_frontier
+        
+        wanted = set(node_ids)
+        return [match for match in self.can_apply(_RegionView(graph, sorted(region)))
+                if wanted.intersection(self.match_nodes(match))]
+    
     def apply(self, graph: Graph, match: Tuple) -> bool:
         """Apply the reaction given a match, returns True if successful"""
         raise NotImplementedError
@@ -70,59 +194,16 @@ class BetaReaction(Reaction):
         if l_node.node_type != NodeType.L or a_node.node_type != NodeType.A:
             return False
         
-        # Get ports
-        l_middle_in = l_node.ports.get("middle")
-        l_left_out = l_node.ports.get("left")
-        l_right_out = l_node.ports.get("right")
-        
-        a_left_in = a_node.ports.get("left")
-        a_right_in = a_node.ports.get("right")
-        a_middle_out = a_node.ports.get("middle")
-        
-        if not all([l_middle_in, l_left_out, l_right_out, a_left_in, a_right_in, a_middle_out]):
-            return False
-        
         # Check connection
-        if graph.get_connected(l_right_out) != a_left_in:
+        if graph.get_connected(l_node.ports["right"]) != a_node.ports["left"]:
             return False
         
-        # Disconnect L-A connection
-        graph.disconnect(l_right_out)
-        
-        # Create Arrow nodes
-        arrow1_id = graph.add_node(NodeType.ARROW)
-        arrow2_id = graph.add_node(NodeType.ARROW)
-        
-        arrow1 = graph.nodes[arrow1_id]
-        arrow2 = graph.nodes[arrow2_id]
-        
-        # Connect Arrow 1: l_middle_in -> a_middle_out
-        arrow1_in = arrow1.ports.get("middle")
-        arrow1_out = arrow1.ports.get("middle_out")
-        
-        l_middle_connected = graph.get_connected(l_middle_in)
-        a_middle_connected = graph.get_connected(a_middle_out)
-        
-        if l_middle_connected:
-            graph.disconnect(l_middle_in)
-            graph.connect(l_middle_connected, arrow1_in)
-        graph.connect(arrow1_out, a_middle_connected if a_middle_connected else a_middle_out)
-        
-        # Connect Arrow 2: a_right_in -> l_left_out
-        arrow2_in = arrow2.ports.get("middle")
-        arrow2_out = arrow2.ports.get("middle_out")
-        
-        a_right_connected = graph.get_connected(a_right_in)
-        l_left_connected = graph.get_connected(l_left_out)
-        
-        if a_right_connected:
-            graph.disconnect(a_right_in)
-            graph.connect(a_right_connected, arrow2_in)
-        graph.connect(arrow2_out, l_left_connected if l_left_connected else l_left_out)
-        
-        # Remove L and A nodes
-        graph.remove_node(l_id)
-        graph.remove_node(a_id)
+        # Body flows to the result, argument flows to the bound variable
+        rewire(graph, [l_id, a_id],
+               {"1": l_node.ports["middle"], "2": l_node.ports["left"],
+                "4": a_node.ports["right"], "3": a_node.ports["middle"]},
+               [(NodeType.ARROW, {"middle": "1", "middle_out": "3"}),
+                (NodeType.ARROW, {"middle": "4", "middle_out": "2"})])
         
         return True
 
@@ -182,8 +263,8 @@ class CombReaction(Reaction):
         if not connected_in or not connected_out:
             return False
         
-        # Don't create self-loops
-        if connected_in.node_id == connected_out.node_id:
+        # An Arrow closed on itself has nothing to merge
+        if connected_in.node_id == arrow_id or connected_out.node_id == arrow_id:
             return False
         
         # Connect the two ports directly
@@ -198,7 +279,12 @@ class CombReaction(Reaction):
 
 
 class PruningReaction(Reaction):
-    """PRUNING moves: Various pruning operations"""
+    """
+    PRUNING moves: garbage collect terms fed into a T node
+    - A 1 2 3, T 3 → T 1, T 2 (and the same for FI)
+    - L 1 2 3, T 3 → T 1, FRIN 2
+    - FO 1 2 3, T 2 → Arrow 1 3 (and symmetrically for T 3; also for FOE)
+    """
     
     def get_name(self):
         return "PRUNING"
@@ -207,172 +293,79 @@ class PruningReaction(Reaction):
         """Find all pruning opportunities"""
         matches = []
         
-        # A-T or FI-T pruning: A 1 2 3, T 3 → T 1, T 2
-        for node_id, node in graph.nodes.items():
-            if node.node_type in [NodeType.A, NodeType.FI]:
-                middle_out = node.ports.get("middle")
-                if middle_out:
-                    connected = graph.get_connected(middle_out)
-                    if connected:
-                        t_node = graph.nodes.get(connected.node_id)
-                        if t_node and t_node.node_type == NodeType.T:
-                            matches.append(("A_FI_T", node_id, connected.node_id))
-        
-        # L-T pruning: L 1 2 3, T 3 → T 1, T c, FRIN c
         for node_id, node in graph.nodes.items():
-            if node.node_type == NodeType.L:
-                right_out = node.ports.get("right")
-                if right_out:
-                    connected = graph.get_connected(right_out)
-                    if connected:
-                        t_node = graph.nodes.get(connected.node_id)
-                        if t_node and t_node.node_type == NodeType.T:
-                            matches.append(("L_T", node_id, connected.node_id))
-        
-        # FO-T pruning: FO 1 2 3, T 2 → Arrow 1 3
-        for node_id, node in graph.nodes.items():
-            if node.node_type in [NodeType.FO, NodeType.FOE]:
-                left_out = node.ports.get("left")
-                right_out = node.ports.get("right")
-                if left_out:
-                    connected = graph.get_connected(left_out)
-                    if connected:
-                        t_node = graph.nodes.get(connected.node_id)
-                        if t_node and t_node.node_type == NodeType.T:
-                            matches.append(("FO_T_left", node_id, connected.node_id))
-                if right_out:
-                    connected = graph.get_connected(right_out)
-                    if connected:
-                        t_node = graph.nodes.get(connected.node_id)
-                        if t_node and t_node.node_type == NodeType.T:
-                            matches.append(("FO_T_right", node_id, connected.node_id))
+            node_type = node.node_type
+            
+            # A-T or FI-T pruning: A 1 2 3, T 3 → T 1, T 2
+            if node_type in (NodeType.A, NodeType.FI):
+                t_id = _terminated(graph, node.ports["middle"])
+                if t_id is not None:
+                    matches.append(("A_FI_T", node_id, t_id))
+            
+            # L-T pruning: L 1 2 3, T 3 → T 1, FRIN 2
+            elif node_type == NodeType.L:
+                t_id = _terminated(graph, node.ports["right"])
+                if t_id is not None:
+                    matches.append(("L_T", node_id, t_id))
+            
+            # FO-T pruning: FO 1 2 3, T 2 → Arrow 1 3
+            elif node_type in (NodeType.FO, NodeType.FOE):
+                for side in ("left", "right"):
+                    t_id = _terminated(graph, node.ports[side])
+                    if t_id is not None:
+                        matches.append((f"FO_T_{side}", node_id, t_id))
         
         return matches
     
     def apply(self, graph: Graph, match: Tuple) -> bool:
         """Apply pruning move"""
-        prune_type = match[0]
-        node_id = match[1]
-        t_id = match[2]
+        prune_type, node_id, t_id = match
         
         if node_id not in graph.nodes or t_id not in graph.nodes:
             return False
         
         node = graph.nodes[node_id]
-        t_node = graph.nodes[t_id]
         
-        if prune_type == "A_FI_T":
-            # A 1 2 3, T 3 → T 1, T 2
-            left_in = node.ports.get("left")
-            right_in = node.ports.get("right")
-            middle_out = node.ports.get("middle")
-            
-            if not all([left_in, right_in, middle_out]):
+        if prune_type == "A_FI_T" and node.node_type in (NodeType.A, NodeType.FI):
+            if _terminated(graph, node.ports["middle"]) != t_id:
                 return False
-            
-            # Create two T nodes
-            t1_id = graph.add_node(NodeType.T)
-            t2_id = graph.add_node(NodeType.T)
-            
-            t1 = graph.nodes[t1_id]
-            t2 = graph.nodes[t2_id]
-            
-            # Connect T nodes to inputs
-            left_connected = graph.get_connected(left_in)
-            right_connected = graph.get_connected(right_in)
-            
-            if left_connected:
-                graph.disconnect(left_in)
-                graph.connect(left_connected, t1.ports["middle"])
-            if right_connected:
-                graph.disconnect(right_in)
-                graph.connect(right_connected, t2.ports["middle"])
-            
-            # Remove original nodes
-            graph.remove_node(node_id)
-            graph.remove_node(t_id)
-            
+            rewire(graph, [node_id, t_id],
+                   {"1": node.ports["left"], "2": node.ports["right"]},
+                   [(NodeType.T, {"middle": "1"}), (NodeType.T, {"middle": "2"})])
             return True
         
-        elif prune_type == "L_T":
-            # L 1 2 3, T 3 → T 1, T c, FRIN c
-            middle_in = node.ports.get("middle")
-            left_out = node.ports.get("left")
-            right_out = node.ports.get("right")
-            
-            if not all([middle_in, left_out, right_out]):
+        if prune_type == "L_T" and node.node_type == NodeType.L:
+            if _terminated(graph, node.ports["right"]) != t_id:
                 return False
-            
-            # Create T and FRIN nodes
-            t1_id = graph.add_node(NodeType.T)
-            t2_id = graph.add_node(NodeType.T)
-            frin_id = graph.add_node(NodeType.FRIN)
-            
-            t1 = graph.nodes[t1_id]
-            t2 = graph.nodes[t2_id]
-            frin = graph.nodes[frin_id]
-            
-            # Connect T to middle input
-            middle_connected = graph.get_connected(middle_in)
-            if middle_connected:
-                graph.disconnect(middle_in)
-                graph.connect(middle_connected, t1.ports["middle"])
-            
-            # Connect T and FRIN to left output (bound variable)
-            left_connected = graph.get_connected(left_out)
-            if left_connected:
-                graph.disconnect(left_out)
-                graph.connect(left_connected, t2.ports["middle"])
-                graph.connect(frin.ports["middle"], t2.ports["middle"])
-            
-            # Remove original nodes
-            graph.remove_node(node_id)
-            graph.remove_node(t_id)
-            
+            rewire(graph, [node_id, t_id],
+                   {"1": node.ports["middle"], "2": node.ports["left"]},
+                   [(NodeType.T, {"middle": "1"}), (NodeType.FRIN, {"middle": "2"})])
             return True
         
-        elif prune_type.startswith("FO_T"):
-            # FO 1 2 3, T 2 → Arrow 1 3
-            middle_in = node.ports.get("middle")
-            left_out = node.ports.get("left")
-            right_out = node.ports.get("right")
-            
-            if not all([middle_in, left_out, right_out]):
+        if prune_type.startswith("FO_T_") and node.node_type in (NodeType.FO, NodeType.FOE):
+            side = prune_type[len("FO_T_"):]
+            kept = "right" if side == "left" else "left"
+            if _terminated(graph, node.ports[side]) != t_id:
                 return False
-            
-            # Determine which output is terminated
-            if prune_type == "FO_T_left":
-                unused_out = left_out
-                used_out = right_out
-            else:
-                unused_out = right_out
-                used_out = left_out
-            
-            # Create Arrow node
-            arrow_id = graph.add_node(NodeType.ARROW)
-            arrow = graph.nodes[arrow_id]
-            
-            # Connect middle_in to used_out through Arrow
-            middle_connected = graph.get_connected(middle_in)
-            used_connected = graph.get_connected(used_out)
-            
-            graph.disconnect(middle_in)
-            graph.disconnect(used_out)
-            
-            if middle_connected:
-                graph.connect(middle_connected, arrow.ports["middle"])
-            if used_connected:
-                graph.connect(arrow.ports["middle_out"], used_connected)
-            
-            # Remove original nodes
-            graph.remove_node(node_id)
-            graph.remove_node(t_id)
-            
+            rewire(graph, [node_id, t_id],
+                   {"1": node.ports["middle"], "3": node.ports[kept]},
+                   [(NodeType.ARROW, {"middle": "1", "middle_out": "3"})])
             return True
         
         return False
 
 
+def _terminated(graph: Graph, out_port: Port) -> Optional[int]:
+    """Return the id of the T node fed by out_port, if any"""
+    connected = graph.get_connected(out_port)
+    if connected is None:
+        return None
+    node = graph.nodes.get(connected.node_id)
+    if node is None or node.node_type != NodeType.T:
+        return None
+    return node.node_id
+
+
 # Import additional reactions
 from .dist_reactions import DistReaction
 from .fan_in_reaction import FanInReaction
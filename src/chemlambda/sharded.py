@@ -0,0 +1,517 @@
+"""
+Sharded Simulation
+Partitions a molecule across worker processes and rewrites the shards in parallel
+
+Workers communicate over multiprocessing pipes only: each shard is
+pickled to its worker once, and afterwards boundary descriptions and
+migrating nodes are pickled per round. No shared memory is used. The
+boundary and port tables are small, short-lived Python objects, while
+multiprocessing.shared_memory only holds flat buffers, so the pickling
+cost of a round grows with the number of cut edges, not with shard size.
+"""
+
+import multiprocessing
+import os
+from typing import Dict, List, Optional, Tuple
+from .graph import Graph, Node, NodeType, Port, _port_name, connected_components
+from .reactions import Reaction, ALL_REACTIONS
+from .simulator import Simulator
+
+
+CUT_PREFIX = "_cut"  # Boundary names of edges cut between shards
+
+
+def _attach_stub(graph: Graph, name: str, port: Port) -> str:
+    """
+    Terminate `port` with a named boundary stub for a cut edge.
+
+    Returns "out" if the stub is a FROUT (the port is the source of the
+    edge) and "in" if it is a FRIN.
+    """
+    if port.direction == "out":
+        graph.add_output(name, port)
+        return "out"
+    graph.link(graph.add_input(name), port)
+    return "in"
+
+
+def partition_graph(graph: Graph, num_shards: int) -> Tuple[List[Graph], Dict[str, List[int]]]:
+    """
+    Split a molecule into shards of about equal size.
+
+    Nodes are taken in connected_components() order (depth-first), so
+    each shard is a mostly connected region and few edges are cut. Every
+    cut edge is replaced by a FROUT stub on its source side and a FRIN
+    stub on its target side, both registered under the same boundary
+    name. Node ids and named boundaries of the molecule are kept.
+
+    Args:
+        graph: Molecule to split (not modified)
+        num_shards: Number of shards
+
+    Returns:
+        (shards, cuts) where cuts maps each cut name to
+        [shard holding the FROUT stub, shard holding the FRIN stub]
+    """
+    order = [node_id for component in connected_components(graph) for node_id in component]
+
+    size = max(1, -(-len(order) // num_shards))
+    owner = {node_id: position // size for position, node_id in enumerate(order)}
+
+    shards = []
+    for _ in range(num_shards):
+        shard = Graph()
+        shard.next_node_id = graph.next_node_id
+        shards.append(shard)
+    for node_id, node in graph.nodes.items():
+        shards[owner[node_id]].nodes[node_id] = Node(node_id, node.node_type)
+    for name, node_id in graph.inputs.items():
+        shards[owner[node_id]].inputs[name] = node_id
+    for name, node_id in graph.outputs.items():
+        shards[owner[node_id]].outputs[name] = node_id
+
+    cuts: Dict[str, List[int]] = {}
+    for port1, port2 in graph.edges.items():
+        if port1 > port2 or port1.node_id not in owner or port2.node_id not in owner:
+            continue
+        shard1, shard2 = owner[port1.node_id], owner[port2.node_id]
+        node1 = shards[shard1].nodes[port1.node_id]
+        node2 = shards[shard2].nodes[port2.node_id]
+        local1 = node1.ports[_port_name(node1, port1)]
+        local2 = node2.ports[_port_name(node2, port2)]
+        if shard1 == shard2:
+            shards[shard1].connect(local1, local2)
+            continue
+        if port1.direction == port2.direction:
+            raise ValueError(f"Cannot cut edge {port1} - {port2}: expected an out port and an in port")
+        name = f"{CUT_PREFIX}{len(cuts)}"
+        cuts[name] = [0, 0]
+        for shard_index, port in ((shard1, local1), (shard2, local2)):
+            side = _attach_stub(shards[shard_index], name, port)
+            cuts[name][0 if side == "out" else 1] = shard_index
+
+    return shards, cuts
+
+
+class Shard:
+    """
+    One partition of a sharded molecule.
+
+    Cut edges end in FRIN/FROUT stubs named CUT_PREFIX + n. No reaction
+    matches a stub, so local rewriting never crosses a cut; redexes that
+    span two shards are resolved by moving one of their nodes with
+    export_node() and import_node().
+    """
+
+    def __init__(self, graph: Graph, reactions: Optional[List[Reaction]] = None):
+        self.graph = graph
+        self.reactions = reactions or ALL_REACTIONS
+
+    def reduce(self, max_steps: int, random_order: bool = False) -> Dict[str, int]:
+        """Rewrite local redexes, returns reaction counts"""
+        simulator = Simulator(self.graph, self.reactions, record_history=False)
+        simulator.run(max_steps=max_steps, random_order=random_order)
+        return simulator.get_stats()["reaction_counts"]
+
+    def _cut_stubs(self) -> Dict[int, str]:
+        """Stub node id -> cut name"""
+        stubs = {}
+        for boundaries in (self.graph.inputs, self.graph.outputs):
+            for name, node_id in boundaries.items():
+                if name.startswith(CUT_PREFIX):
+                    stubs[node_id] = name
+        return stubs
+
+    def boundary(self) -> Tuple[int, Dict[str, Optional[Tuple[int, NodeType, str]]], List[Tuple[str, str]]]:
+        """
+        Describe the cut edges of this shard.
+
+        Stubs that feed each other directly (a cut edge that only passes
+        through this shard) are removed first and reported, so the
+        coordinator can fuse the two cuts into one.
+
+        Returns:
+            (number of nodes, {cut name: (node id, node type, port name) of
+            the local end, or None}, [(FRIN cut, FROUT cut) pass-throughs])
+        """
+        graph = self.graph
+        cut_outputs = {node_id: name for name, node_id in graph.outputs.items()
+                       if name.startswith(CUT_PREFIX)}
+        passes = []
+        for name, frin_id in list(graph.inputs.items()):
+            if not name.startswith(CUT_PREFIX):
+                continue
+            target = graph.get_connected(graph.nodes[frin_id].ports["middle"])
+            if target is not None and target.node_id in cut_outputs:
+                passes.append((name, cut_outputs[target.node_id]))
+                graph.remove_node(frin_id)
+                graph.remove_node(target.node_id)
+
+        stubs = self._cut_stubs()
+        ends = {}
+        for stub_id, name in stubs.items():
+            other = graph.get_connected(graph.nodes[stub_id].ports["middle"])
+            if other is None or other.node_id in stubs:
+                ends[name] = None
+                continue
+            node = graph.nodes[other.node_id]
+            ends[name] = (node.node_id, node.node_type, _port_name(node, other))
+        return len(graph.nodes), ends, passes
+
+    def export_node(self, node_id: int, fresh_names: List[str]) -> Tuple[NodeType, Dict[str, tuple], Dict[str, str]]:
+        """
+        Remove a node so it can be imported into another shard.
+
+        Each port of the node is described as None (unconnected),
+        ("self", port name) for a loop on the node, or ("cut", name). Edges
+        to local nodes become new cuts named from `fresh_names`, with a stub
+        left behind at the local end.
+
+        Returns:
+            (node type, port descriptions, {new cut name: "out" or "in" stub left here})
+        """
+        graph = self.graph
+        node = graph.nodes[node_id]
+        stubs = self._cut_stubs()
+        fresh = iter(fresh_names)
+        ports: Dict[str, tuple] = {}
+        new_cuts: Dict[str, str] = {}
+
+        for key, port in node.ports.items():
+            other = graph.get_connected(port)
+            if other is None:
+                ports[key] = None
+            elif other.node_id == node_id:
+                ports[key] = ("self", _port_name(node, other))
+            elif other.node_id in stubs:
+                name = stubs[other.node_id]
+                graph.remove_node(other.node_id)
+                ports[key] = ("cut", name)
+            else:
+                name = next(fresh)
+                graph.disconnect(port)
+                new_cuts[name] = _attach_stub(graph, name, other)
+                ports[key] = ("cut", name)
+
+        graph.remove_node(node_id)
+        return node.node_type, ports, new_cuts
+
+    def import_node(self, node_type: NodeType, ports: Dict[str, tuple]) -> Dict[str, Optional[str]]:
+        """
+        Add a node exported from another shard.
+
+        A cut whose other end is in this shard is dissolved into a local
+        edge; any other cut gets a stub here.
+
+        Returns:
+            {cut name: "out" or "in" for the stub added here, or None if dissolved}
+        """
+        graph = self.graph
+        node = graph.nodes[graph.add_node(node_type)]
+        result: Dict[str, Optional[str]] = {}
+
+        for key, description in ports.items():
+            if description is None:
+                continue
+            kind, value = description
+            port = node.ports[key]
+            if kind == "self":
+                if port not in graph.edges:
+                    graph.connect(port, node.ports[value])
+            elif value in graph.outputs:
+                graph.connect(graph.take_output(value), port)
+                result[value] = None
+            elif value in graph.inputs:
+                graph.connect(port, graph.take_input(value))
+                result[value] = None
+            else:
+                result[value] = _attach_stub(graph, value, port)
+        return result
+
+    def rename_input(self, old_name: str, new_name: str):
+        """Rename a FRIN cut stub (after two cuts were fused)"""
+        self.graph.inputs[new_name] = self.graph.inputs.pop(old_name)
+
+    def join(self, output_name: str, input_name: str):
+        """Replace a FROUT stub and a FRIN stub of this shard by a direct edge"""
+        source = self.graph.take_output(output_name)
+        dest = self.graph.take_input(input_name)
+        if source is not None and dest is not None:
+            self.graph.connect(source, dest)
+
+    def collect(self) -> Graph:
+        """Return the shard graph"""
+        return self.graph
+
+
+def _shard_worker(conn, graph: Graph, reactions: List[Reaction]):
+    """Worker process loop: owns one Shard and runs the methods it is sent"""
+    shard = Shard(graph, reactions)
+    while True:
+        method, args = conn.recv()
+        if method is None:
+            break
+        try:
+            conn.send((True, getattr(shard, method)(*args)))
+        except Exception as e:
+            conn.send((False, e))
+    conn.close()
+
+
+class _LocalHandle:
+    """Runs a Shard in this process, with the same interface as _ProcessHandle"""
+
+    def __init__(self, graph: Graph, reactions: List[Reaction]):
+        self.shard = Shard(graph, reactions)
+        self._result = None
+
+    def submit(self, method: str, *args):
+        self._result = getattr(self.shard, method)(*args)
+
+    def result(self):
+        return self._result
+
+    def close(self):
+        pass
+
+
+class _ProcessHandle:
+    """Runs a Shard in a worker process; submit() returns at once"""
+
+    def __init__(self, graph: Graph, reactions: List[Reaction]):
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_shard_worker,
+                                               args=(child_conn, graph, reactions),
+                                               daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def submit(self, method: str, *args):
+        self.conn.send((method, args))
+
+    def result(self):
+        ok, value = self.conn.recv()
+        if not ok:
+            raise value
+        return value
+
+    def close(self):
+        if self.process.is_alive():
+            self.conn.send((None, ()))
+            self.process.join()
+        self.conn.close()
+
+
+class ShardedSimulator:
+    """
+    Reduces a molecule split across several shards.
+
+    Each shard is owned by a worker process that keeps it in memory for
+    the whole run, so only boundary descriptions and migrating nodes are
+    sent between processes. A run proceeds in rounds:
+
+    1. every worker rewrites the redexes inside its shard, in parallel;
+    2. the coordinator collects the cut edges and, for each cut that
+       joins the two halves of a redex, moves one node of the redex into
+       the other (smaller) shard, so it becomes local for the next round.
+
+    The run ends when a round neither rewrites nor moves anything.
+    Use as a context manager (or call close()) to stop the workers.
+
+    Cut edges are checked against two-node patterns, which covers every
+    chemlambda move. Reactions with larger patterns (the chemSKI spines)
+    only fire once the whole pattern happens to lie in one shard.
+    """
+
+    def __init__(self, graph: Graph, num_shards: Optional[int] = None,
+                 reactions: Optional[List[Reaction]] = None, processes: bool = True):
+        """
+        Args:
+            graph: Molecule to reduce (not modified)
+            num_shards: Number of shards (defaults to the CPU count)
+            reactions: Reactions to use (defaults to ALL_REACTIONS)
+            processes: Run shards in worker processes; if False they run
+                in this process, one after the other
+        """
+        self.reactions = reactions or ALL_REACTIONS
+        self.num_shards = num_shards or os.cpu_count() or 1
+        shards, self.cuts = partition_graph(graph, self.num_shards)
+        self._next_cut = len(self.cuts)
+        handle_type = _ProcessHandle if processes else _LocalHandle
+        self.handles = [handle_type(shard, self.reactions) for shard in shards]
+        self._redex_pairs: Dict[tuple, bool] = {}
+        self.rounds = 0
+        self.migrations = 0
+        self.reaction_counts: Dict[str, int] = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Stop the worker processes"""
+        for handle in self.handles:
+            handle.close()
+        self.handles = []
+
+    def _call(self, shard: int, method: str, *args):
+        self.handles[shard].submit(method, *args)
+        return self.handles[shard].result()
+
+    def _call_all(self, method: str, *args) -> list:
+        for handle in self.handles:
+            handle.submit(method, *args)
+        return [handle.result() for handle in self.handles]
+
+    def _spans_redex(self, out_end: Tuple[NodeType, str], in_end: Tuple[NodeType, str]) -> bool:
+        """
+        Whether an edge from port out_end to port in_end can be part of a redex.
+
+        Checked once per pair of (node type, port) on a small probe
+        molecule: the pair is a redex if the reactions find more matches
+        with the edge than with both ends cut off by stubs.
+        """
+        key = (out_end, in_end)
+        if key not in self._redex_pairs:
+            counts = []
+            for joined in (True, False):
+                probe = Graph()
+                ports = []
+                for node_type, port_name in (out_end, in_end):
+                    node = probe.nodes[probe.add_node(node_type)]
+                    ports.append(node.ports[port_name])
+                if joined:
+                    probe.connect(ports[0], ports[1])
+                for name, node in enumerate(list(probe.nodes.values())):
+                    for key_name, port in node.ports.items():
+                        if port not in probe.edges:
+                            _attach_stub(probe, f"{name}.{key_name}", port)
+                counts.append(sum(len(probe.matches(r)) for r in self.reactions))
+            self._redex_pairs[key] = counts[0] > counts[1]
+        return self._redex_pairs[key]
+
+    def _fuse(self, passes: List[Tuple[str, str]]):
+        """
+        Fuse cuts joined by removed pass-throughs.
+
+        A pass (x, y) means cut x continued as cut y. Each chain of passes
+        becomes a single cut from the source of its first cut to the
+        target of its last one; chains that close on themselves are pure
+        wire loops and disappear.
+        """
+        following = dict(passes)
+        heads = set(following) - set(following.values())
+        for head in heads:
+            tail = head
+            while tail in following:
+                next_cut = following.pop(tail)
+                if tail != head:
+                    del self.cuts[tail]
+                tail = next_cut
+            out_shard = self.cuts[head][0]
+            in_shard = self.cuts.pop(tail)[1]
+            if out_shard == in_shard:
+                del self.cuts[head]
+                self._call(out_shard, "join", head, tail)
+            else:
+                self._call(in_shard, "rename_input", tail, head)
+                self.cuts[head] = [out_shard, in_shard]
+        for name in following:
+            del self.cuts[name]
+
+    def _migrate(self, node_id: int, source: int, target: int):
+        """Move a node from shard `source` to shard `target`"""
+        fresh = [f"{CUT_PREFIX}{self._next_cut + i}" for i in range(3)]
+        node_type, ports, new_cuts = self._call(source, "export_node", node_id, fresh)
+        self._next_cut += len(fresh)
+        for name, side in new_cuts.items():
+            self.cuts[name] = [source, target] if side == "out" else [target, source]
+
+        for name, side in self._call(target, "import_node", node_type, ports).items():
+            if side is None:
+                del self.cuts[name]
+            else:
+                self.cuts[name][0 if side == "out" else 1] = target
+        self.migrations += 1
+
+    def _exchange(self) -> int:
+        """Resolve redexes spanning two shards, returns the number of moves"""
+        reports = self._call_all("boundary")
+        self._fuse([item for _, _, passes in reports for item in passes])
+
+        sizes = [size for size, _, _ in reports]
+        moved = set()
+        moves = 0
+        for name, (out_shard, in_shard) in list(self.cuts.items()):
+            out_end = reports[out_shard][1].get(name)
+            in_end = reports[in_shard][1].get(name)
+            if out_end is None or in_end is None or name not in self.cuts:
+                continue
+            if (out_shard, out_end[0]) in moved or (in_shard, in_end[0]) in moved:
+                continue
+            if not self._spans_redex(out_end[1:], in_end[1:]):
+                continue
+
+            # Move the node from the bigger shard to keep shards balanced
+            if sizes[out_shard] >= sizes[in_shard]:
+                node_id, source, target = out_end[0], out_shard, in_shard
+            else:
+                node_id, source, target = in_end[0], in_shard, out_shard
+            self._migrate(node_id, source, target)
+            moved.add((source, node_id))
+            sizes[source] -= 1
+            sizes[target] += 1
+            moves += 1
+        return moves
+
+    def run(self, max_rounds: int = 1000, steps_per_round: int = 1000,
+            random_order: bool = False) -> int:
+        """
+        Reduce until no shard can rewrite and no cut joins a redex.
+
+        Args:
+            max_rounds: Maximum number of rounds
+            steps_per_round: Maximum rewrites per shard per round
+            random_order: Pick local rewrites at random
+
+        Returns:
+            Number of rewrites performed
+        """
+        total = 0
+        for _ in range(max_rounds):
+            self.rounds += 1
+            rewrites = 0
+            for counts in self._call_all("reduce", steps_per_round, random_order):
+                for name, count in counts.items():
+                    self.reaction_counts[name] = self.reaction_counts.get(name, 0) + count
+                    rewrites += count
+            total += rewrites
+            if self._exchange() == 0 and rewrites == 0:
+                break
+        return total
+
+    def collect(self) -> Graph:
+        """Gather the shards back into one molecule"""
+        graph = Graph()
+        for shard_graph in self._call_all("collect"):
+            graph.merge(shard_graph)
+        for name in self.cuts:
+            try:
+                graph.link_boundary(name, name)
+            except ValueError:
+                # A cut with a dangling end: drop its stubs
+                graph.take_output(name)
+                graph.take_input(name)
+        return graph
+
+    def get_stats(self) -> dict:
+        """Get statistics about the sharded run"""
+        return {
+            "shards": self.num_shards,
+            "rounds": self.rounds,
+            "migrations": self.migrations,
+            "cut_edges": len(self.cuts),
+            "reaction_counts": dict(self.reaction_counts),
+        }
@@ -3,21 +3,76 @@ Chemlambda Simulator
 Runs graph rewriting simulations
 """
 
+import copy
+import os
 import random
-from typing import List, Optional, Callable
+import signal
+import time
+from multiprocessing import Pipe
+from multiprocessing.connection import wait
+from typing import Any, Dict, Iterator, List, Optional, Callable, Sequence, Set, Tuple
 from .graph import Graph, NodeType
 from .reactions import Reaction, ALL_REACTIONS
+from .canonical import canonical_hash
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+MEMORY_CHECK_PERIOD = 100  # Steps between memory checks in Simulator.run()
+
+# Priority order of deterministic runs: BETA/FAN-IN > DIST > PRUNING > COMB
+PRIORITY_ORDER = ["BETA", "FAN-IN", "DIST", "PRUNING", "COMB"]
+
+
+def _priority(candidate: Tuple[Reaction, tuple]) -> int:
+    name = candidate[0].get_name()
+    return PRIORITY_ORDER.index(name) if name in PRIORITY_ORDER else 999
+
+
+def _memory_usage() -> int:
+    """Resident memory of this process in bytes (peak if the current size is unknown)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in KiB on Linux but in bytes on macOS
+        return peak if os.uname().sysname == "Darwin" else peak * 1024
+    return 0
 
 
 class Simulator:
-    """Simulates chemlambda graph rewriting"""
+    """
+    Simulates chemlambda graph rewriting
     
-    def __init__(self, graph: Graph, reactions: Optional[List[Reaction]] = None):
+    Besides the sequence of rewrites, the simulator records their causal
+    dependencies: rewrite i depends on rewrite j < i if j was the last
+    rewrite to create or rewire a node that i consumed. causal_parents[i]
+    lists those j, so the rewrites form a DAG whose longest path bounds
+    how fast any parallel engine could reduce the molecule.
+    """
+    
+    def __init__(self, graph: Graph, reactions: Optional[List[Reaction]] = None,
+                 record_history: bool = True, seed: Optional[int] = None):
         self.graph = graph
         self.reactions = reactions or ALL_REACTIONS
+        self.record_history = record_history  # Clone the graph before every step
         self.step_count = 0
         self.history: List[Graph] = []
         self.reaction_history: List[tuple] = []  # (step, reaction_name, match)
+        self.causal_parents: List[Tuple[int, ...]] = []  # Per rewrite, rewrites it depends on
+        self._depths: List[int] = []  # Per rewrite, length of the longest causal chain ending there
+        self._last_writer: Dict[int, int] = {}  # Node id -> last rewrite that changed it
+        self.termination_reason: Optional[str] = None  # Why the last run() stopped
+        self.last_touched: Set[int] = set()  # Nodes changed by the last step, COMB clean-up included
+        self.round_sizes: List[int] = []  # Rewrites applied in each parallel_step() round
+        # Random order of rewrites; without a seed, the global random module
+        self.rng: Optional[random.Random] = random.Random(seed) if seed is not None else None
     
     def step(self, random_order: bool = True) -> bool:
         """
@@ -28,7 +83,7 @@ class Simulator:
         all_matches = []
         
         for reaction in self.reactions:
-            matches = reaction.can_apply(self.graph)
+            matches = self.graph.matches(reaction)
             for match in matches:
                 all_matches.append((reaction, match))
         
@@ -37,31 +92,110 @@ class Simulator:
         
         # Select a match
         if random_order:
-            reaction, match = random.choice(all_matches)
+            reaction, match = (self.rng or random).choice(all_matches)
         else:
-            # Priority order: BETA/FAN-IN > DIST > PRUNING > COMB
-            priority_order = ["BETA", "FAN-IN", "DIST", "PRUNING", "COMB"]
-            sorted_matches = sorted(all_matches, 
-                                  key=lambda x: priority_order.index(x[0].get_name()) 
-                                  if x[0].get_name() in priority_order else 999)
-            reaction, match = sorted_matches[0]
+            reaction, match = min(all_matches, key=_priority)
         
-        # Save current state
-        self.history.append(self.graph.clone())
+        return self.apply_match(reaction, match)
+    
+    def parallel_step(self, random_order: bool = True) -> int:
+        """
+        Perform one synchronous round of reduction
         
-        # Apply reaction
-        success = reaction.apply(self.graph, match)
+        All matches are found in the current graph, and a maximal set of
+        them with no node in common is applied, as one round of a parallel
+        machine would. Matches are taken in random order, or in priority
+        order if random_order is False. Afterwards `last_touched` holds
+        the nodes changed by the whole round.
         
-        if success:
-            self.step_count += 1
-            self.reaction_history.append((self.step_count, reaction.get_name(), match))
+        Returns number of rewrites applied (0 if no reaction applies)
+        """
+        candidates = [(reaction, match) for reaction in self.reactions
+                      for match in self.graph.matches(reaction)]
+        if random_order:
+            (self.rng or random).shuffle(candidates)
+        else:
+            candidates.sort(key=_priority)
+        
+        used = set()
+        chosen = []
+        for reaction, match in candidates:
+            nodes = reaction.match_nodes(match)
+            if used.isdisjoint(nodes):
+                used.update(nodes)
+                chosen.append((reaction, match))
+        
+        applied = 0
+        touched = set()
+        for reaction, match in chosen:
+            # A match can go stale when an earlier COMB clean-up removes its Arrows
+            if self.apply_match(reaction, match):
+                applied += 1
+                touched |= self.last_touched
+        if applied:
+            self.round_sizes.append(applied)
+            self.last_touched = touched
+        return applied
+    
+    def run_parallel(self, max_rounds: int = 1000, random_order: bool = True) -> int:
+        """
+        Run synchronous rounds until no reaction applies or max_rounds
+        Returns number of rounds taken
+        """
+        rounds = 0
+        while rounds < max_rounds and self.parallel_step(random_order):
+            rounds += 1
+        return rounds
+    
+    def apply_match(self, reaction: Reaction, match: tuple) -> bool:
+        """
+        Apply a chosen match as one step, followed by the COMB clean-up.
+        Returns True if the reaction was applied
+        """
+        # Save current state (a full copy, so benchmarks turn this off)
+        if self.record_history:
+            self.history.append(self.graph.clone())
+        
+        # Apply reaction, recording which nodes it changes
+        first_new_id = self.graph.next_node_id
+        touched = self.graph.touched = set()
+        try:
+            success = reaction.apply(self.graph, match)
+            consumed = [node_id for node_id in touched
+                        if node_id < first_new_id and node_id not in self.graph.nodes]
             
-            # Apply COMB cycle after other reactions
-            if reaction.get_name() != "COMB":
-                self._comb_cycle()
+            if success:
+                self.step_count += 1
+                self.reaction_history.append((self.step_count, reaction.get_name(), match))
+                
+                # Apply COMB cycle after other reactions
+                if reaction.get_name() != "COMB":
+                    self._comb_cycle()
+        finally:
+            self.graph.touched = None
+        
+        if success:
+            self.last_touched = touched
+            self._record_causality(consumed, touched)
         
         return success
     
+    def _record_causality(self, consumed: List[int], touched: set):
+        """Add the last rewrite to the causal DAG"""
+        index = len(self.causal_parents)
+        last_writer = self._last_writer
+        parents = tuple(sorted({last_writer[node_id] for node_id in consumed
+                                if node_id in last_writer}))
+        self.causal_parents.append(parents)
+        self._depths.append(1 + max((self._depths[p] for p in parents), default=0))
+        
+        for node_id in consumed:
+            last_writer.pop(node_id, None)
+        nodes = self.graph.nodes
+        for node_id in touched:
+            if node_id in nodes:
+                last_writer[node_id] = index
+    
     def _comb_cycle(self):
         """Apply COMB moves until no more can be applied"""
         comb_reaction = None
@@ -77,7 +211,7 @@ class Simulator:
         iterations = 0
         
         while iterations < max_comb_iterations:
-            matches = comb_reaction.can_apply(self.graph)
+            matches = self.graph.matches(comb_reaction)
             if not matches:
                 break
             
@@ -88,18 +222,162 @@ class Simulator:
             
             iterations += 1
     
-    def run(self, max_steps: int = 1000, random_order: bool = True) -> int:
+    def run(self, max_steps: int = 1000, random_order: bool = True,
+            max_time: Optional[float] = None, max_nodes: Optional[int] = None,
+            max_memory: Optional[int] = None, max_growth: Optional[float] = None,
+            check_period: Optional[int] = None) -> int:
         """
-        Run simulation until no more reactions can be applied or max_steps reached
+        Run simulation until no more reactions can be applied or a budget runs out
+        
+        Afterwards `termination_reason` says why the run stopped:
+        "normal_form" (no reaction applies), "max_steps", "max_time",
+        "max_nodes", "max_memory", "exploding" (more than max_growth times
+        the initial number of nodes) or "periodic" (a state seen at an
+        earlier check came back, so the run would loop forever).
+        
+        Args:
+            max_steps: Maximum number of steps
+            max_time: Wall-clock budget in seconds
+            max_nodes: Maximum number of nodes
+            max_memory: Maximum resident memory of the process in bytes
+            max_growth: Maximum ratio of current to initial node count
+            check_period: Every this many steps, compare the canonical hash
+                with earlier checks to detect periodic runs (off by default,
+                since hashing takes time linear in the graph)
+        
         Returns number of steps taken
         """
+        start = time.perf_counter()
+        growth_limit = max_growth * max(1, len(self.graph.nodes)) if max_growth else None
+        seen_states = set()
+        if check_period:
+            seen_states.add(canonical_hash(self.graph))
+        
         steps = 0
+        self.termination_reason = "max_steps"
         while steps < max_steps:
             if not self.step(random_order):
+                self.termination_reason = "normal_form"
                 break
             steps += 1
+            
+            node_count = len(self.graph.nodes)
+            if max_nodes is not None and node_count > max_nodes:
+                self.termination_reason = "max_nodes"
+                break
+            if growth_limit is not None and node_count > growth_limit:
+                self.termination_reason = "exploding"
+                break
+            if max_time is not None and time.perf_counter() - start > max_time:
+                self.termination_reason = "max_time"
+                break
+            
+            if max_memory is not None and steps % MEMORY_CHECK_PERIOD == 0:
+                if _memory_usage() > max_memory:
+                    self.termination_reason = "max_memory"
+                    break
+            if check_period and steps % check_period == 0:
+                state = canonical_hash(self.graph)
+                if state in seen_states:
+                    self.termination_reason = "periodic"
+                    break
+                seen_states.add(state)
         return steps
     
+    def branch(self, n: int, seeds: Optional[Sequence[int]] = None, max_steps: int = 1000,
+               summarize: Optional[Callable[['Simulator'], Any]] = None,
+               max_workers: Optional[int] = None) -> list:
+        """
+        Run n random continuations from the current state.
+        
+        Run the shared (e.g. deterministic warm-up) prefix once, then call
+        branch() to fan out. See iter_branches() for the arguments.
+        
+        Returns:
+            List of the n summaries, in seed order
+        """
+        results = [None] * n
+        for index, summary in self.iter_branches(n, seeds, max_steps, summarize, max_workers):
+            results[index] = summary
+        return results
+    
+    def iter_branches(self, n: int, seeds: Optional[Sequence[int]] = None, max_steps: int = 1000,
+                      summarize: Optional[Callable[['Simulator'], Any]] = None,
+                      max_workers: Optional[int] = None) -> Iterator[Tuple[int, Any]]:
+        """
+        Yield (index, summary) for n random continuations as they finish.
+        
+        Each continuation is a forked child process, so it starts from a
+        copy-on-write image of this simulator instead of a pickled copy;
+        only its summary is sent back. Where os.fork is not available the
+        continuations run here, one after the other, on deep copies. This
+        simulator is never modified.
+        
+        Args:
+            n: Number of continuations
+            seeds: Random seed of each continuation (defaults to 0..n-1)
+            max_steps: Maximum random steps per continuation
+            summarize: Maps the finished simulator to a picklable summary
+                (defaults to get_stats())
+            max_workers: Maximum children alive at once (defaults to the CPU count)
+        """
+        seeds = list(seeds) if seeds is not None else list(range(n))
+        if len(seeds) < n:
+            raise ValueError(f"Need {n} seeds, got {len(seeds)}")
+        summarize = summarize or Simulator.get_stats
+        
+        if not hasattr(os, "fork"):
+            for index in range(n):
+                yield index, copy.deepcopy(self)._continue(seeds[index], max_steps, summarize)
+            return
+        
+        max_workers = max_workers or os.cpu_count() or 1
+        pending = {}  # Result pipe -> (index, child pid)
+        next_index = 0
+        try:
+            while next_index < n or pending:
+                while next_index < n and len(pending) < max_workers:
+                    reader, writer = Pipe(duplex=False)
+                    pid = os.fork()
+                    if pid == 0:
+                        # Child: never return into the caller's code
+                        status = 0
+                        try:
+                            reader.close()
+                            writer.send((True, self._continue(seeds[next_index], max_steps, summarize)))
+                        except BaseException as e:
+                            writer.send((False, repr(e)))
+                            status = 1
+                        finally:
+                            os._exit(status)
+                    writer.close()
+                    pending[reader] = (next_index, pid)
+                    next_index += 1
+                
+                for reader in wait(list(pending)):
+                    index, pid = pending.pop(reader)
+                    try:
+                        ok, value = reader.recv()
+                    except EOFError:
+                        ok, value = False, "exited without a result"
+                    reader.close()
+                    os.waitpid(pid, 0)
+                    if not ok:
+                        raise RuntimeError(f"Continuation {index} (seed {seeds[index]}) failed: {value}")
+                    yield index, value
+        finally:
+            # Stop children left over if the caller stopped iterating
+            for reader, (_, pid) in pending.items():
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+                reader.close()
+    
+    def _continue(self, seed: int, max_steps: int, summarize: Callable[['Simulator'], Any]) -> Any:
+        """Run a random continuation of this simulator and summarize it"""
+        self.rng = random.Random(seed)
+        self.run(max_steps=max_steps, random_order=True)
+        return summarize(self)
+    
     def get_stats(self) -> dict:
         """Get statistics about the simulation"""
         reaction_counts = {}
@@ -111,7 +389,47 @@ class Simulator:
             "reaction_counts": reaction_counts,
             "final_nodes": len(self.graph.nodes),
             "final_edges": len(self.graph.edges) // 2,
+            "termination_reason": self.termination_reason,
+            "rounds": len(self.round_sizes),
         }
+    
+    def get_parallelism_profile(self) -> dict:
+        """
+        Work/span analysis of the rewrites performed so far.
+        
+        Rewrites are scheduled as soon as all rewrites they depend on are
+        done, so round r holds every rewrite whose longest causal chain
+        has length r. With unlimited cores the reduction takes `span`
+        rounds instead of `work` steps.
+        
+        Returns:
+            Dictionary with work (number of rewrites), span (critical path
+            length), parallelism (work / span) and rounds (rewrites
+            available in each round)
+        """
+        work = len(self._depths)
+        span = max(self._depths, default=0)
+        rounds = [0] * span
+        for depth in self._depths:
+            rounds[depth - 1] += 1
+        
+        return {
+            "work": work,
+            "span": span,
+            "parallelism": work / span if span else 0.0,
+            "rounds": rounds,
+        }
+    
+    def estimated_speedup(self, processors: int) -> float:
+        """
+        Speedup of a round-by-round schedule on `processors` cores.
+        
+        Each round of get_parallelism_profile() takes ceil(size / processors)
+        steps, so the result is at most min(processors, parallelism).
+        """
+        profile = self.get_parallelism_profile()
+        steps = sum(-(-size // processors) for size in profile["rounds"])
+        return profile["work"] / steps if steps else 0.0
 
 
 def create_identity_function() -> Graph:
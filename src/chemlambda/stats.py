@@ -0,0 +1,89 @@
+"""
+Running Statistics
+Constant-memory mean, variance, min and max for streams of measurements
+"""
+
+import math
+from statistics import NormalDist
+from typing import Dict, Iterable, Optional, Tuple
+
+
+class RunningStats:
+    """
+    Online summary of a stream of numbers (Welford's algorithm).
+
+    Values are folded in one at a time, so memory does not grow with the
+    number of values and the statistics can be read at any point. Two
+    summaries of separate streams can be merged (Chan et al.), e.g. when
+    worker processes each summarize part of a batch.
+    """
+
+    def __init__(self, values: Optional[Iterable[float]] = None):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0  # Sum of squared deviations from the mean
+        self.min = math.inf
+        self.max = -math.inf
+        for value in values or ():
+            self.add(value)
+
+    def add(self, value: float):
+        """Fold in one value"""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: 'RunningStats'):
+        """Fold in another summary, as if its values had been added here"""
+        if other.count == 0:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self._m2 += other._m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (0 with fewer than two values)"""
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        """Sample standard deviation (0 with fewer than two values)"""
+        return math.sqrt(self.variance)
+
+    def half_width(self, confidence: float = 0.95) -> float:
+        """
+        Half-width of the confidence interval of the mean.
+
+        Uses the normal approximation z * std / sqrt(count), so it is only
+        meaningful once a few tens of values are in; infinite with fewer
+        than two values.
+        """
+        if self.count < 2:
+            return math.inf
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        return z * self.std / math.sqrt(self.count)
+
+    def confidence_interval(self, confidence: float = 0.95) -> Tuple[float, float]:
+        """Confidence interval of the mean, see half_width()"""
+        half_width = self.half_width(confidence)
+        return self.mean - half_width, self.mean + half_width
+
+    def as_dict(self) -> Dict[str, float]:
+        """Mean, std, min and max (all 0 before the first value)"""
+        if self.count == 0:
+            return {'count': 0, 'mean': 0, 'std': 0, 'min': 0, 'max': 0}
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'std': self.std,
+            'min': self.min,
+            'max': self.max,
+        }
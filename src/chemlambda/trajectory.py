@@ -0,0 +1,230 @@
+"""
+Trajectory Output
+Streams per-step simulation metrics to columnar .npz or CSV files
+"""
+
+import ast
+import csv
+import math
+import struct
+import sys
+import tempfile
+import zipfile
+from array import array
+from typing import Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+
+BASE_COLUMNS = ("step", "reaction", "nodes", "edges")  # Integer columns of every trajectory
+ENTROPY_METRICS = ("node_entropy", "high_order_entropy", "synergistic")
+NPY_MAGIC = b"\x93NUMPY\x01\x00"
+
+
+def _npy_header(descr: str, length: int) -> bytes:
+    """Header of a version 1.0 .npy file holding a 1-d array"""
+    header = repr({"descr": descr, "fortran_order": False, "shape": (length,)})
+    # Magic, header length and header are padded to a multiple of 64 bytes
+    padding = -(len(NPY_MAGIC) + 2 + len(header) + 1) % 64
+    header = (header + " " * padding + "\n").encode("latin1")
+    return NPY_MAGIC + struct.pack("<H", len(header)) + header
+
+
+class TrajectoryWriter:
+    """
+    Writes one row of metrics per simulation step without keeping rows.
+
+    Every trajectory has the columns step, reaction, nodes and edges,
+    followed by one float column per name in `metrics`. Rows are
+    collected in preallocated typed arrays (the stdlib `array` module) of
+    `chunk_size` rows; a full chunk is flushed to disk and the arrays are
+    reused, so memory stays constant however long the run is.
+
+    Two formats are supported, chosen by the file suffix:
+
+    - .npz: the layout of numpy.savez, one 1-d array per column plus
+      `reaction_names`, which maps the integer reaction codes to names.
+      Columns are streamed to temporary files and assembled on close, so
+      writing does not need NumPy; loading with numpy.load does.
+    - .csv: a header line, then the rows, written a chunk at a time. The
+      reaction column holds the reaction name.
+    """
+
+    def __init__(self, path: str, metrics: Sequence[str] = ENTROPY_METRICS,
+                 chunk_size: int = 65536):
+        """
+        Args:
+            path: Output file, ending in .npz or .csv
+            metrics: Names of the float columns after the base columns
+            chunk_size: Rows held in memory before a flush
+        """
+        if path.endswith(".npz"):
+            self.format = "npz"
+        elif path.endswith(".csv"):
+            self.format = "csv"
+        else:
+            raise ValueError(f"Unknown trajectory format: {path} (expected .npz or .csv)")
+        self.path = path
+        self.columns = BASE_COLUMNS + tuple(metrics)
+        self.chunk_size = chunk_size
+        self.rows = 0
+        self.reaction_codes: Dict[str, int] = {}  # Reaction name -> code, in order of first use
+        self.closed = False
+
+        typecodes = ["q"] * len(BASE_COLUMNS) + ["d"] * len(metrics)
+        self._buffers = [array(typecode, bytes(array(typecode).itemsize * chunk_size))
+                         for typecode in typecodes]
+        self._filled = 0
+
+        if self.format == "npz":
+            self._spools = [tempfile.TemporaryFile() for _ in self.columns]
+        else:
+            self._file = open(path, "w", newline="")
+            self._csv = csv.writer(self._file)
+            self._csv.writerow(self.columns)
+
+    def write(self, step: int, reaction: str, nodes: int, edges: int, *values: float):
+        """Append one row; `values` are the metric columns in order"""
+        if len(values) != len(self.columns) - len(BASE_COLUMNS):
+            raise ValueError(f"Expected {len(self.columns) - len(BASE_COLUMNS)} metric values, got {len(values)}")
+        code = self.reaction_codes.setdefault(reaction, len(self.reaction_codes))
+        row = self._filled
+        buffers = self._buffers
+        buffers[0][row] = step
+        buffers[1][row] = code
+        buffers[2][row] = nodes
+        buffers[3][row] = edges
+        for buffer, value in zip(buffers[len(BASE_COLUMNS):], values):
+            buffer[row] = value
+        self._filled += 1
+        self.rows += 1
+        if self._filled == self.chunk_size:
+            self.flush()
+
+    def record(self, simulator, tracker=None, reaction: Optional[str] = None):
+        """
+        Append the current state of a simulator.
+
+        Args:
+            simulator: Simulator after a step
+            tracker: EntropyTracker supplying the entropy metrics (the
+                metric columns must be ENTROPY_METRICS). Without a
+                tracker the metric columns are NaN
+            reaction: Reaction name (defaults to the last one applied)
+        """
+        if reaction is None:
+            reaction = simulator.reaction_history[-1][1] if simulator.reaction_history else ""
+        values = (math.nan,) * (len(self.columns) - len(BASE_COLUMNS))
+        if tracker is not None:
+            values = (tracker.node_entropy(), tracker.interaction_entropy(3),
+                      tracker.synergistic_information())
+        self.write(simulator.step_count, reaction, len(simulator.graph.nodes),
+                   len(simulator.graph.edges) // 2, *values)
+
+    def flush(self):
+        """Write the buffered rows"""
+        filled = self._filled
+        if not filled:
+            return
+        if self.format == "npz":
+            for buffer, spool in zip(self._buffers, self._spools):
+                chunk = buffer[:filled]
+                if sys.byteorder != "little":
+                    chunk.byteswap()
+                chunk.tofile(spool)
+        else:
+            names = list(self.reaction_codes)
+            columns = [buffer[:filled] for buffer in self._buffers]
+            columns[1] = [names[code] for code in columns[1]]
+            self._csv.writerows(zip(*columns))
+        self._filled = 0
+
+    def close(self):
+        """Flush and finish the file"""
+        if self.closed:
+            return
+        self.flush()
+        self.closed = True
+        if self.format == "csv":
+            self._file.close()
+            return
+
+        with zipfile.ZipFile(self.path, "w", zipfile.ZIP_STORED, allowZip64=True) as archive:
+            for name, buffer, spool in zip(self.columns, self._buffers, self._spools):
+                descr = "<i8" if buffer.typecode == "q" else "<f8"
+                spool.seek(0)
+                with archive.open(name + ".npy", "w", force_zip64=True) as entry:
+                    entry.write(_npy_header(descr, self.rows))
+                    while True:
+                        block = spool.read(1 << 20)
+                        if not block:
+                            break
+                        entry.write(block)
+                spool.close()
+
+            names = list(self.reaction_codes)
+            width = max((len(name) for name in names), default=1) or 1
+            with archive.open("reaction_names.npy", "w") as entry:
+                entry.write(_npy_header(f"<U{width}", len(names)))
+                for name in names:
+                    entry.write(name.ljust(width, "\0").encode("utf-32-le"))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def load_trajectory(path: str) -> dict:
+    """
+    Load a trajectory written by TrajectoryWriter.
+
+    Returns:
+        Dictionary of columns by name. For .npz files these are NumPy
+        arrays if NumPy is installed (plus `reaction_names`), otherwise
+        `array` objects and a list of names. For .csv files they are
+        lists, with reaction names in the reaction column.
+    """
+    if path.endswith(".csv"):
+        with open(path, newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            columns: Dict[str, List] = {name: [] for name in header}
+            for row in reader:
+                for name, value in zip(header, row):
+                    columns[name].append(value)
+        for name in header:
+            if name == "reaction":
+                continue
+            convert = int if name in BASE_COLUMNS else float
+            columns[name] = [convert(value) for value in columns[name]]
+        return columns
+
+    if HAS_NUMPY:
+        with np.load(path) as data:
+            return {name: data[name] for name in data.files}
+
+    columns = {}
+    with zipfile.ZipFile(path) as archive:
+        for entry in archive.namelist():
+            raw = archive.read(entry)
+            header_length = struct.unpack("<H", raw[8:10])[0]
+            header = ast.literal_eval(raw[10:10 + header_length].decode("latin1"))
+            data = raw[10 + header_length:]
+            descr = header["descr"]
+            if descr.startswith("<U"):
+                width = int(descr[2:])
+                text = data.decode("utf-32-le")
+                values = [text[i:i + width].rstrip("\0") for i in range(0, len(text), width)]
+            else:
+                values = array("q" if descr == "<i8" else "d")
+                values.frombytes(data)
+                if sys.byteorder != "little":
+                    values.byteswap()
+            columns[entry[:-len(".npy")]] = values
+    return columns
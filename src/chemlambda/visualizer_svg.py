@@ -3,23 +3,205 @@ SVG Visualizer for chemlambda graphs
 Creates visual representations similar to Buliga's original demos
 """
 
-from typing import Dict, Tuple, Optional
+from typing import Callable, Dict, Iterator, Tuple, Optional, TextIO
+import io
 import math
-from .graph import Graph, Node, NodeType
+from .graph import Graph, Node, NodeType, Port, _port_name
+from .layout import force_layout
+
+
+# Node colors (matching Buliga's conventions)
+NODE_COLORS = {
+    NodeType.L: "#4ec9b0",      # Cyan/teal for Lambda
+    NodeType.A: "#ce9178",      # Orange/brown for Application
+    NodeType.FI: "#569cd6",     # Blue for Fan-In
+    NodeType.FO: "#dcdcaa",     # Yellow for Fan-Out
+    NodeType.FOE: "#d7ba7d",    # Light yellow for Fan-Out-Extra
+    NodeType.T: "#808080",      # Gray for Termination
+    NodeType.ARROW: "#c586c0",  # Purple for Arrow
+    NodeType.FRIN: "#9cdcfe",   # Light blue for Free In
+    NodeType.FROUT: "#9cdcfe",  # Light blue for Free Out
+    NodeType.S: "#f44747",      # Red for chemSKI S
+    NodeType.K: "#b5cea8",      # Green for chemSKI K
+    NodeType.I: "#ffd700",      # Gold for chemSKI I
+}
+NODE_RADIUS = 15
+BATCH_LINES = 4096  # Lines formatted per write() call when streaming
+
+
+def iter_edges(graph: Graph) -> Iterator[Tuple[Port, Port]]:
+    """
+    Every edge of the graph once, as (source port, target port).
+    
+    graph.edges holds each edge in both directions; only the entry whose
+    key is the smaller port is kept, which also keeps edges from a node to
+    itself. The source is the out port where the edge has one, so drawn
+    arrows follow the flow from out ports to in ports.
+    """
+    for port1, port2 in graph.edges.items():
+        if port1 < port2:
+            if port1.direction == "in" and port2.direction == "out":
+                yield port2, port1
+            else:
+                yield port1, port2
+
+
+def _write_batched(file: TextIO, lines):
+    """Write an iterable of lines, a batch at a time, without joining them all"""
+    batch = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) == BATCH_LINES:
+            batch.append("")
+            file.write("\n".join(batch))
+            batch = []
+    if batch:
+        batch.append("")
+        file.write("\n".join(batch))
+
+
+def node_color(node_type: NodeType) -> str:
+    """Fill color of a node type (matching Buliga's conventions)"""
+    return NODE_COLORS.get(node_type, "#ffffff")
+
+
+def node_label(node_type: NodeType) -> str:
+    """Label of a node type"""
+    return node_type.value
+
+
+def write_svg(graph: Graph, file: TextIO, positions: Dict[int, Tuple[float, float]],
+              width=800, height=600, color: Callable[[NodeType], str] = node_color,
+              label: Callable[[NodeType], str] = node_label):
+    """
+    Stream an SVG drawing of the graph to an open text file.
+    
+    Lines are formatted and written a batch at a time, so the document is
+    never held in memory and a graph of millions of nodes and edges can be
+    written with only the positions in memory. Each edge is drawn once
+    (see iter_edges); nodes and edges without a position are skipped.
+    
+    Args:
+        graph: Molecule to draw
+        file: Text file (or io.StringIO) to write to
+        positions: Position of each node, e.g. from layout.force_layout or
+            LayoutSession.positions()
+        width, height: Size of the drawing
+        color, label: Fill color and text of a node, given its type
+    """
+    file.write(
+        f'<svg width="{width}" height="{height}" xmlns="http://www.w3.org/2000/svg">\n'
+        '<defs>\n'
+        '<marker id="arrowhead" markerWidth="10" markerHeight="10" refX="9" refY="3" orient="auto">\n'
+        '<polygon points="0 0, 10 3, 0 6" fill="#888" />\n'
+        '</marker>\n'
+        '</defs>\n'
+        '<rect width="100%" height="100%" fill="#1e1e1e"/>\n'
+    )
+    
+    def edge_lines():
+        for source, target in iter_edges(graph):
+            start = positions.get(source.node_id)
+            end = positions.get(target.node_id)
+            if start is not None and end is not None:
+                yield (f'<line x1="{start[0]:.2f}" y1="{start[1]:.2f}" x2="{end[0]:.2f}" y2="{end[1]:.2f}" '
+                       f'stroke="#666" stroke-width="2" marker-end="url(#arrowhead)"/>')
+    
+    def node_lines():
+        nodes = graph.nodes
+        for node_id, (x, y) in positions.items():
+            node = nodes.get(node_id)
+            if node is None:
+                continue
+            yield (f'<circle cx="{x:.2f}" cy="{y:.2f}" r="{NODE_RADIUS}" '
+                   f'fill="{color(node.node_type)}" stroke="#fff" stroke-width="2"/>')
+            yield (f'<text x="{x:.2f}" y="{y + 5:.2f}" text-anchor="middle" fill="#fff" '
+                   f'font-size="10" font-family="monospace">{label(node.node_type)}</text>')
+    
+    # Edges first, so they appear behind nodes
+    _write_batched(file, edge_lines())
+    _write_batched(file, node_lines())
+    file.write('</svg>\n')
+
+
+def write_dot(graph: Graph, file: TextIO, positions: Optional[Dict[int, Tuple[float, float]]] = None,
+              color: Callable[[NodeType], str] = node_color,
+              label: Callable[[NodeType], str] = node_label):
+    """
+    Stream the graph to an open text file in Graphviz DOT format.
+    
+    Nodes are labelled and colored by type; each edge is written once,
+    from its out port to its in port, with the port names as tail and
+    head labels. Like write_svg() nothing but the current batch of lines
+    is held in memory.
+    
+    Args:
+        graph: Molecule to write
+        file: Text file (or io.StringIO) to write to
+        positions: Optional node positions, written as pinned `pos`
+            attributes (in points) for neato -n
+        color, label: Fill color and label of a node, given its type
+    """
+    file.write('digraph chemlambda {\n'
+               '  bgcolor="#1e1e1e";\n'
+               '  node [shape=circle, style=filled, fontname="monospace", fontsize=10];\n'
+               '  edge [color="#666", fontcolor="#888", fontsize=8];\n')
+    nodes = graph.nodes
+    
+    def node_lines():
+        for node_id, node in nodes.items():
+            attributes = f'label="{label(node.node_type)}", fillcolor="{color(node.node_type)}"'
+            if positions is not None and node_id in positions:
+                x, y = positions[node_id]
+                attributes += f', pos="{x:.2f},{-y:.2f}!"'
+            yield f'  n{node_id} [{attributes}];'
+    
+    def edge_lines():
+        for source, target in iter_edges(graph):
+            yield (f'  n{source.node_id} -> n{target.node_id} '
+                   f'[taillabel="{_port_name(nodes[source.node_id], source)}", '
+                   f'headlabel="{_port_name(nodes[target.node_id], target)}"];')
+    
+    _write_batched(file, node_lines())
+    _write_batched(file, edge_lines())
+    file.write('}\n')
 
 
 class SVGVisualizer:
-    """Creates SVG visualizations of chemlambda graphs"""
+    """
+    Creates SVG visualizations of chemlambda graphs
+    
+    Nodes are placed by a force-directed layout (see layout.force_layout)
+    or, with layout="circle", evenly on a circle. Passing the
+    node_positions of the visualizer of an earlier state as `positions`
+    warm-starts the force layout, so a rewrite moves only the nodes
+    around it. With layout="fixed", `positions` are drawn as given, e.g.
+    the positions() of a layout.LayoutSession that follows a run.
+    The force layout runs `iterations` steps, by default fewer the larger
+    the molecule (see layout.default_iterations).
+    """
     
-    def __init__(self, graph: Graph, width=800, height=600):
+    def __init__(self, graph: Graph, width=800, height=600, layout: str = "force",
+                 positions: Optional[Dict[int, Tuple[float, float]]] = None,
+                 iterations: Optional[int] = None):
         self.graph = graph
         self.width = width
         self.height = height
         self.node_positions: Dict[int, Tuple[float, float]] = {}
-        self._layout_graph()
+        if layout == "force":
+            self.node_positions = force_layout(graph, width, height, iterations=iterations,
+                                               initial=positions)
+        elif layout == "circle":
+            self._layout_graph()
+        elif layout == "fixed":
+            if positions is None:
+                raise ValueError("layout='fixed' needs positions")
+            self.node_positions = dict(positions)
+        else:
+            raise ValueError(f"Unknown layout: {layout}")
     
     def _layout_graph(self):
-        """Layout nodes in a circular/force-directed manner"""
+        """Layout nodes on a circle"""
         nodes = list(self.graph.nodes.keys())
         n = len(nodes)
         
@@ -44,77 +226,36 @@ class SVGVisualizer:
             self.node_positions[node_id] = (x, y)
     
     def _get_node_color(self, node_type: NodeType) -> str:
-        """Get color for node type (matching Buliga's conventions)"""
-        colors = {
-            NodeType.L: "#4ec9b0",      # Cyan/teal for Lambda
-            NodeType.A: "#ce9178",      # Orange/brown for Application
-            NodeType.FI: "#569cd6",     # Blue for Fan-In
-            NodeType.FO: "#dcdcaa",     # Yellow for Fan-Out
-            NodeType.FOE: "#d7ba7d",    # Light yellow for Fan-Out-Extra
-            NodeType.T: "#808080",      # Gray for Termination
-            NodeType.ARROW: "#c586c0",  # Purple for Arrow
-            NodeType.FRIN: "#9cdcfe",   # Light blue for Free In
-            NodeType.FROUT: "#9cdcfe",  # Light blue for Free Out
-        }
-        return colors.get(node_type, "#ffffff")
+        """Get color for node type (override to recolor the drawing)"""
+        return node_color(node_type)
     
     def _get_node_label(self, node_type: NodeType) -> str:
-        """Get label for node type"""
-        return node_type.value
+        """Get label for node type (override to relabel the drawing)"""
+        return node_label(node_type)
+    
+    def write_svg(self, file: TextIO):
+        """Stream the SVG to an open text file (see write_svg)"""
+        write_svg(self.graph, file, self.node_positions, self.width, self.height,
+                  self._get_node_color, self._get_node_label)
     
     def to_svg(self) -> str:
         """Generate SVG representation of the graph"""
-        svg_parts = [
-            f'<svg width="{self.width}" height="{self.height}" xmlns="http://www.w3.org/2000/svg">',
-            '<defs>',
-            '<marker id="arrowhead" markerWidth="10" markerHeight="10" refX="9" refY="3" orient="auto">',
-            '<polygon points="0 0, 10 3, 0 6" fill="#888" />',
-            '</marker>',
-            '</defs>',
-            '<rect width="100%" height="100%" fill="#1e1e1e"/>',
-        ]
-        
-        # Draw edges first (so they appear behind nodes)
-        for port1, port2 in self.graph.edges.items():
-            if port1.node_id in self.node_positions and port2.node_id in self.node_positions:
-                x1, y1 = self.node_positions[port1.node_id]
-                x2, y2 = self.node_positions[port2.node_id]
-                
-                # Only draw each edge once
-                if port1.node_id < port2.node_id:
-                    svg_parts.append(
-                        f'<line x1="{x1}" y1="{y1}" x2="{x2}" y2="{y2}" '
-                        f'stroke="#666" stroke-width="2" marker-end="url(#arrowhead)"/>'
-                    )
-        
-        # Draw nodes
-        for node_id, (x, y) in self.node_positions.items():
-            node = self.graph.nodes[node_id]
-            color = self._get_node_color(node.node_type)
-            label = self._get_node_label(node.node_type)
-            
-            # Node circle
-            radius = 15
-            svg_parts.append(
-                f'<circle cx="{x}" cy="{y}" r="{radius}" fill="{color}" stroke="#fff" stroke-width="2"/>'
-            )
-            
-            # Node label
-            svg_parts.append(
-                f'<text x="{x}" y="{y + 5}" text-anchor="middle" fill="#fff" font-size="10" font-family="monospace">{label}</text>'
-            )
-        
-        svg_parts.append('</svg>')
-        return '\n'.join(svg_parts)
+        buffer = io.StringIO()
+        self.write_svg(buffer)
+        return buffer.getvalue()
     
     def save_svg(self, filename: str):
         """Save SVG to file"""
         with open(filename, 'w') as f:
-            f.write(self.to_svg())
+            self.write_svg(f)
+    
+    def save_dot(self, filename: str):
+        """Save the graph in Graphviz DOT format, with the layout as pinned positions"""
+        with open(filename, 'w') as f:
+            write_dot(self.graph, f, self.node_positions, self._get_node_color, self._get_node_label)
 
 
-def visualize_graph(graph: Graph, width=800, height=600) -> str:
+def visualize_graph(graph: Graph, width=800, height=600, layout: str = "force") -> str:
     """Convenience function to get SVG string"""
-    viz = SVGVisualizer(graph, width, height)
+    viz = SVGVisualizer(graph, width, height, layout)
     return viz.to_svg()
-
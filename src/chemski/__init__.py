@@ -0,0 +1,26 @@
+"""
+chemSKI - SKI combinator graph rewriting
+Runs on the chemlambda graph and simulator infrastructure
+"""
+
+from .reactions import (
+    IReaction,
+    KReaction,
+    SReaction,
+    DupReaction,
+    EraseReaction,
+    SKI_REACTIONS,
+)
+from .loader import tokenize_ski, ski_to_graph, graph_to_ski
+
+__all__ = [
+    'IReaction',
+    'KReaction',
+    'SReaction',
+    'DupReaction',
+    'EraseReaction',
+    'SKI_REACTIONS',
+    'tokenize_ski',
+    'ski_to_graph',
+    'graph_to_ski',
+]
@@ -0,0 +1,190 @@
+"""
+SKI Term Loader
+Builds chemSKI graphs from SKI combinator terms and reads them back
+"""
+
+import re
+from typing import Dict, List, Optional
+from chemlambda.graph import Graph, NodeType, Port
+from .reactions import COMBINATOR_TYPES
+
+
+_TOKEN_RE = re.compile(r"\s*(?:([SKI])|([a-z_][a-z0-9_]*)|([()]))")
+
+_COMBINATORS = {"S": NodeType.S, "K": NodeType.K, "I": NodeType.I}
+
+
+def tokenize_ski(term: str) -> List[str]:
+    """
+    Split an SKI term into tokens.
+
+    Combinators are the single capital letters S, K and I; free variables
+    are lowercase identifiers. Application is juxtaposition, so "SKKx",
+    "S K K x" and "((S K) K) x" all describe the same term.
+    """
+    tokens = []
+    pos = 0
+    end = len(term.rstrip())
+    while pos < end:
+        match = _TOKEN_RE.match(term, pos)
+        if not match or match.end() == pos:
+            raise ValueError(f"Unexpected character in SKI term at {pos}: {term[pos:pos + 10]!r}")
+        tokens.append(match.group(1) or match.group(2) or match.group(3))
+        pos = match.end()
+    return tokens
+
+
+def ski_to_graph(term: str, free_vars: Optional[Dict[str, int]] = None) -> Graph:
+    """
+    Build a chemSKI graph for an SKI term in a single pass.
+
+    The parser keeps an explicit stack of partial applications, so nesting
+    depth is not limited by Python recursion and the cost is linear in the
+    term length. The root of the term feeds a FROUT node (output "out");
+    every free variable becomes one FRIN node (an input named after the
+    variable), shared through a balanced FO tree when it occurs more than once.
+
+    Args:
+        term: SKI term as string, e.g. "S (K (S I)) K x y"
+        free_vars: Optional dict, filled with free variable name -> FRIN node id
+
+    Returns:
+        chemSKI graph representing the term
+    """
+    tokens = tokenize_ski(term)
+    if free_vars is None:
+        free_vars = {}
+
+    graph = Graph()
+
+    # Variable occurrences are counted first so each FO tree is built once
+    occurrences: Dict[str, int] = {}
+    for token in tokens:
+        if token not in _COMBINATORS and token not in "()":
+            occurrences[token] = occurrences.get(token, 0) + 1
+
+    var_ports: Dict[str, List[Port]] = {}
+    for name, count in occurrences.items():
+        frin_port = graph.add_input(name)
+        free_vars[name] = frin_port.node_id
+        var_ports[name] = graph.fan_out(frin_port, count)
+
+    # Each stack entry is the out port of the application built so far
+    # at that parenthesis level (None until the level has a head)
+    stack: List[Optional[Port]] = [None]
+
+    for token in tokens:
+        if token == "(":
+            stack.append(None)
+            continue
+
+        if token == ")":
+            if len(stack) == 1:
+                raise ValueError(f"Unbalanced ')' in SKI term: {term}")
+            operand = stack.pop()
+            if operand is None:
+                raise ValueError(f"Empty parentheses in SKI term: {term}")
+        elif token in _COMBINATORS:
+            node_id = graph.add_node(_COMBINATORS[token])
+            operand = graph.nodes[node_id].ports["middle"]
+        else:
+            operand = var_ports[token].pop()
+
+        head = stack[-1]
+        if head is None:
+            stack[-1] = operand
+        else:
+            a_id = graph.add_node(NodeType.A)
+            a_node = graph.nodes[a_id]
+            graph.connect(head, a_node.ports["left"])
+            graph.connect(operand, a_node.ports["right"])
+            stack[-1] = a_node.ports["middle"]
+
+    if len(stack) != 1:
+        raise ValueError(f"Unbalanced '(' in SKI term: {term}")
+    if stack[0] is None:
+        raise ValueError(f"Empty SKI term: {term!r}")
+
+    graph.add_output("out", stack[0])
+
+    return graph
+
+
+def graph_to_ski(graph: Graph, free_vars: Optional[Dict[str, int]] = None) -> Optional[str]:
+    """
+    Read the SKI term feeding the graph's FROUT node back as a string.
+
+    Fan-outs and Arrows are followed to the node producing the value, so a
+    term with shared subterms is printed unshared. Returns None if there is
+    no FROUT node or the graph contains something that is not an SKI term.
+    Raises ValueError if the term feeds back into itself through an
+    application or fan-out, as it would then have no finite reading.
+
+    Args:
+        graph: chemSKI graph, e.g. the result of a simulation
+        free_vars: Free variable name -> FRIN node id, as filled by ski_to_graph
+
+    Returns:
+        SKI term as string (fully left-associated, minimal parentheses)
+    """
+    names = {node_id: name for name, node_id in (free_vars or {}).items()}
+
+    frout = next((node for node in graph.nodes.values()
+                  if node.node_type == NodeType.FROUT), None)
+    if frout is None:
+        return None
+
+    # Explicit stack: ("visit", port) pushes a subterm, ("app", None)
+    # combines the two subterms below it on the output stack, and
+    # ("leave", node id) takes a node off the path from the FROUT
+    output: List[str] = []
+    work = [("visit", graph.get_connected(frout.ports["middle"]))]
+    on_path = set()
+
+    while work:
+        action, port = work.pop()
+
+        if action == "app":
+            arg = output.pop()
+            func = output.pop()
+            if " " in arg:
+                arg = f"({arg})"
+            output.append(f"{func} {arg}")
+            continue
+        if action == "leave":
+            on_path.discard(port)
+            continue
+
+        # Skip over Arrow chains, giving up on Arrow cycles
+        seen_arrows = set()
+        node = graph.nodes.get(port.node_id) if port else None
+        while node is not None and node.node_type == NodeType.ARROW:
+            if node.node_id in seen_arrows:
+                return None
+            seen_arrows.add(node.node_id)
+            port = graph.get_connected(node.ports["middle"])
+            node = graph.nodes.get(port.node_id) if port else None
+        if node is None:
+            return None
+
+        if node.node_type in (NodeType.A, NodeType.FO):
+            if node.node_id in on_path:
+                raise ValueError(f"Cycle through node {node.node_id}: the graph is not an SKI term")
+            on_path.add(node.node_id)
+            work.append(("leave", node.node_id))
+
+        if node.node_type in COMBINATOR_TYPES:
+            output.append(node.node_type.value)
+        elif node.node_type == NodeType.FRIN:
+            output.append(names.get(node.node_id, f"v{node.node_id}"))
+        elif node.node_type == NodeType.A and port == node.ports["middle"]:
+            work.append(("app", None))
+            work.append(("visit", graph.get_connected(node.ports["right"])))
+            work.append(("visit", graph.get_connected(node.ports["left"])))
+        elif node.node_type == NodeType.FO:
+            work.append(("visit", graph.get_connected(node.ports["middle"])))
+        else:
+            return None
+
+    return output[0] if len(output) == 1 else None
+
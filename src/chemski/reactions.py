@@ -0,0 +1,277 @@
+"""
+chemSKI Reaction Implementations
+Graph rewrites for the SKI combinator calculus on the chemlambda graph
+
+Combinators are one-port nodes (S, K, I) whose middle.out carries the
+combinator; applications reuse the chemlambda A node (left.in function,
+right.in argument, middle.out result). Sharing uses FO and erasure uses T.
+"""
+
+from typing import List, Tuple
+from chemlambda.graph import Graph, NodeType
+from chemlambda.reactions import Reaction, CombReaction, rewire
+
+
+COMBINATOR_TYPES = (NodeType.S, NodeType.K, NodeType.I)
+
+
+def _consumer(graph: Graph, node_id: int, port_name: str, node_type: NodeType,
+              consumer_port: str):
+    """Return the node fed by node_id.port_name if it has the given type and port"""
+    port = graph.nodes[node_id].ports.get(port_name)
+    connected = graph.get_connected(port) if port else None
+    if not connected:
+        return None
+    node = graph.nodes.get(connected.node_id)
+    if not node or node.node_type != node_type:
+        return None
+    if connected != node.ports.get(consumer_port):
+        return None
+    return connected.node_id
+
+
+def _application_spine(graph: Graph, comb_id: int, length: int) -> List[int]:
+    """Follow the chain comb → A.left, A.middle → A.left, ... for `length` applications"""
+    spine = []
+    current, port_name = comb_id, "middle"
+    for _ in range(length):
+        a_id = _consumer(graph, current, port_name, NodeType.A, "left")
+        if a_id is None or a_id in spine:
+            return []
+        spine.append(a_id)
+        current = a_id
+    return spine
+
+
+class IReaction(Reaction):
+    """I move: I c, A c a d → Arrow a d"""
+
+    def get_name(self):
+        return "I"
+
+    def can_apply(self, graph: Graph) -> List[Tuple]:
+        """Find all I nodes applied to an argument"""
+        matches = []
+        for node_id, node in graph.nodes.items():
+            if node.node_type != NodeType.I:
+                continue
+            spine = _application_spine(graph, node_id, 1)
+            if spine:
+                matches.append((node_id, *spine))
+        return matches
+
+    def apply(self, graph: Graph, match: Tuple) -> bool:
+        """Apply I move"""
+        i_id, a_id = match
+        if i_id not in graph.nodes or graph.nodes[i_id].node_type != NodeType.I:
+            return False
+        if _application_spine(graph, i_id, 1) != [a_id]:
+            return False
+
+        a = graph.nodes[a_id]
+        rewire(graph, [i_id, a_id],
+               {"a": a.ports["right"], "d": a.ports["middle"]},
+               [(NodeType.ARROW, {"middle": "a", "middle_out": "d"})])
+        return True
+
+
+class KReaction(Reaction):
+    """K move: K c, A c a e, A e b d → Arrow a d, T b"""
+
+    pattern_radius = 2
+
+    def get_name(self):
+        return "K"
+
+    def can_apply(self, graph: Graph) -> List[Tuple]:
+        """Find all K nodes applied to two arguments"""
+        matches = []
+        for node_id, node in graph.nodes.items():
+            if node.node_type != NodeType.K:
+                continue
+            spine = _application_spine(graph, node_id, 2)
+            if spine:
+                matches.append((node_id, *spine))
+        return matches
+
+    def apply(self, graph: Graph, match: Tuple) -> bool:
+        """Apply K move"""
+        k_id, a1_id, a2_id = match
+        if k_id not in graph.nodes or graph.nodes[k_id].node_type != NodeType.K:
+            return False
+        if _application_spine(graph, k_id, 2) != [a1_id, a2_id]:
+            return False
+
+        a1 = graph.nodes[a1_id]
+        a2 = graph.nodes[a2_id]
+        rewire(graph, [k_id, a1_id, a2_id],
+               {"a": a1.ports["right"], "b": a2.ports["right"], "d": a2.ports["middle"]},
+               [(NodeType.ARROW, {"middle": "a", "middle_out": "d"}),
+                (NodeType.T, {"middle": "b"})])
+        return True
+
+
+class SReaction(Reaction):
+    """S move: S c, A c a e, A e b f, A f x d → FO x i j, A a i g, A b j h, A g h d"""
+
+    pattern_radius = 3
+
+    def get_name(self):
+        return "S"
+
+    def can_apply(self, graph: Graph) -> List[Tuple]:
+        """Find all S nodes applied to three arguments"""
+        matches = []
+        for node_id, node in graph.nodes.items():
+            if node.node_type != NodeType.S:
+                continue
+            spine = _application_spine(graph, node_id, 3)
+            if spine:
+                matches.append((node_id, *spine))
+        return matches
+
+    def apply(self, graph: Graph, match: Tuple) -> bool:
+        """Apply S move"""
+        s_id, a1_id, a2_id, a3_id = match
+        if s_id not in graph.nodes or graph.nodes[s_id].node_type != NodeType.S:
+            return False
+        if _application_spine(graph, s_id, 3) != [a1_id, a2_id, a3_id]:
+            return False
+
+        a1 = graph.nodes[a1_id]
+        a2 = graph.nodes[a2_id]
+        a3 = graph.nodes[a3_id]
+        rewire(graph, [s_id, a1_id, a2_id, a3_id],
+               {"a": a1.ports["right"], "b": a2.ports["right"],
+                "x": a3.ports["right"], "d": a3.ports["middle"]},
+               [(NodeType.FO, {"middle": "x", "left": "i", "right": "j"}),
+                (NodeType.A, {"left": "a", "right": "i", "middle": "g"}),
+                (NodeType.A, {"left": "b", "right": "j", "middle": "h"}),
+                (NodeType.A, {"left": "g", "right": "h", "middle": "d"})])
+        return True
+
+
+class DupReaction(Reaction):
+    """
+    DUP moves: duplicate the term feeding a fan-out
+    - S/K/I c, FO c 1 2 → S/K/I 1, S/K/I 2
+    - A a b c, FO c 1 2 → FO a i j, FO b k l, A i k 1, A j l 2
+    """
+
+    def get_name(self):
+        return "DUP"
+
+    def can_apply(self, graph: Graph) -> List[Tuple]:
+        """Find all combinators and applications feeding an FO node"""
+        matches = []
+        for node_id, node in graph.nodes.items():
+            if node.node_type in COMBINATOR_TYPES:
+                fo_id = _consumer(graph, node_id, "middle", NodeType.FO, "middle")
+                if fo_id is not None:
+                    matches.append(("COMB_FO", node_id, fo_id))
+            elif node.node_type == NodeType.A:
+                fo_id = _consumer(graph, node_id, "middle", NodeType.FO, "middle")
+                if fo_id is not None:
+                    matches.append(("A_FO", node_id, fo_id))
+        return matches
+
+    def apply(self, graph: Graph, match: Tuple) -> bool:
+        """Apply DUP move"""
+        dup_type, node_id, fo_id = match
+        if node_id not in graph.nodes or fo_id not in graph.nodes:
+            return False
+        if _consumer(graph, node_id, "middle", NodeType.FO, "middle") != fo_id:
+            return False
+
+        node = graph.nodes[node_id]
+        fo = graph.nodes[fo_id]
+
+        if dup_type == "COMB_FO" and node.node_type in COMBINATOR_TYPES:
+            rewire(graph, [node_id, fo_id],
+                   {"1": fo.ports["left"], "2": fo.ports["right"]},
+                   [(node.node_type, {"middle": "1"}),
+                    (node.node_type, {"middle": "2"})])
+            return True
+
+        if dup_type == "A_FO" and node.node_type == NodeType.A:
+            rewire(graph, [node_id, fo_id],
+                   {"a": node.ports["left"], "b": node.ports["right"],
+                    "1": fo.ports["left"], "2": fo.ports["right"]},
+                   [(NodeType.FO, {"middle": "a", "left": "i", "right": "j"}),
+                    (NodeType.FO, {"middle": "b", "left": "k", "right": "l"}),
+                    (NodeType.A, {"left": "i", "right": "k", "middle": "1"}),
+                    (NodeType.A, {"left": "j", "right": "l", "middle": "2"})])
+            return True
+
+        return False
+
+
+class EraseReaction(Reaction):
+    """
+    ERASE moves: garbage collect terms fed into a T node
+    - S/K/I c, T c → (nothing)
+    - A a b c, T c → T a, T b
+    - FO 1 2 3, T 2 → Arrow 1 3 (and symmetrically for the right output)
+    """
+
+    def get_name(self):
+        return "ERASE"
+
+    def can_apply(self, graph: Graph) -> List[Tuple]:
+        """Find all erasable terms"""
+        matches = []
+        for node_id, node in graph.nodes.items():
+            if node.node_type in COMBINATOR_TYPES or node.node_type == NodeType.A:
+                t_id = _consumer(graph, node_id, "middle", NodeType.T, "middle")
+                if t_id is not None:
+                    matches.append(("TERM_T", node_id, t_id))
+            elif node.node_type == NodeType.FO:
+                for side in ("left", "right"):
+                    t_id = _consumer(graph, node_id, side, NodeType.T, "middle")
+                    if t_id is not None:
+                        matches.append((f"FO_T_{side}", node_id, t_id))
+        return matches
+
+    def apply(self, graph: Graph, match: Tuple) -> bool:
+        """Apply ERASE move"""
+        erase_type, node_id, t_id = match
+        if node_id not in graph.nodes or t_id not in graph.nodes:
+            return False
+
+        node = graph.nodes[node_id]
+
+        if erase_type == "TERM_T":
+            if _consumer(graph, node_id, "middle", NodeType.T, "middle") != t_id:
+                return False
+            if node.node_type in COMBINATOR_TYPES:
+                rewire(graph, [node_id, t_id], {}, [])
+                return True
+            if node.node_type == NodeType.A:
+                rewire(graph, [node_id, t_id],
+                       {"a": node.ports["left"], "b": node.ports["right"]},
+                       [(NodeType.T, {"middle": "a"}), (NodeType.T, {"middle": "b"})])
+                return True
+            return False
+
+        if erase_type.startswith("FO_T_") and node.node_type == NodeType.FO:
+            side = erase_type[len("FO_T_"):]
+            kept = "right" if side == "left" else "left"
+            if _consumer(graph, node_id, side, NodeType.T, "middle") != t_id:
+                return False
+            rewire(graph, [node_id, t_id],
+                   {"1": node.ports["middle"], "3": node.ports[kept]},
+                   [(NodeType.ARROW, {"middle": "1", "middle_out": "3"})])
+            return True
+
+        return False
+
+
+# Export all chemSKI reactions
+SKI_REACTIONS = [
+    IReaction(),
+    KReaction(),
+    SReaction(),
+    DupReaction(),
+    EraseReaction(),
+    CombReaction(),  # COMB should be last (lowest priority)
+]
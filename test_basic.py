@@ -7,10 +7,108 @@ import sys
 import os
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'examples'))
 
 from chemlambda import Graph, NodeType, Simulator
 
 
+# Port order of each node type in a mol line
+MOL_PORTS = {
+    "L": ("middle", "left", "right"),
+    "A": ("left", "right", "middle"),
+    "FI": ("left", "right", "middle"),
+    "FO": ("middle", "left", "right"),
+    "FOE": ("middle", "left", "right"),
+    "T": ("middle",),
+    "Arrow": ("middle", "middle_out"),
+    "FRIN": ("middle",),
+    "FROUT": ("middle",),
+}
+
+
+def mol_graph(text):
+    """Build a graph from mol lines; FRIN x / FROUT x become boundaries named x"""
+    graph = Graph()
+    ends = {}
+    for line in text.strip().splitlines():
+        node_type, *names = line.split()
+        node_id = graph.add_node(NodeType(node_type))
+        node = graph.nodes[node_id]
+        for port_name, name in zip(MOL_PORTS[node_type], names):
+            ends.setdefault(name, []).append(node.ports[port_name])
+        if node_type == "FRIN":
+            graph.inputs[names[0]] = node_id
+        elif node_type == "FROUT":
+            graph.outputs[names[0]] = node_id
+    for ports in ends.values():
+        if len(ports) == 2:
+            graph.connect(*ports)
+    return graph
+
+
+def wiring(graph):
+    """
+    Port-exact description of a graph, independent of node ids.
+    
+    Nodes are numbered in breadth-first order from the named outputs,
+    then the named inputs (in name order), so two graphs get the same
+    description when the same boundaries reach the same ports; parts not
+    connected to a boundary are compared by canonical form.
+    """
+    from chemlambda.canonical import canonical_form
+    roots = ([graph.outputs[name] for name in sorted(graph.outputs)] +
+             [graph.inputs[name] for name in sorted(graph.inputs)])
+    index = {}
+    order = []
+    for root in roots:
+        if root in index:
+            continue
+        index[root] = len(order)
+        order.append(root)
+        position = len(order) - 1
+        while position < len(order):
+            for port in graph.nodes[order[position]].ports.values():
+                other = graph.edges.get(port)
+                if other is not None and other.node_id not in index:
+                    index[other.node_id] = len(order)
+                    order.append(other.node_id)
+            position += 1
+    lines = []
+    for node_id in order:
+        node = graph.nodes[node_id]
+        links = []
+        for name, port in node.ports.items():
+            other = graph.edges.get(port)
+            links.append(f"{name}>-" if other is None else f"{name}>{index[other.node_id]}.{other.port_type}.{other.direction}")
+        lines.append(f"{node.node_type.value}[{','.join(links)}]")
+    rest = graph.clone()
+    for node_id in order:
+        rest.remove_node(node_id)
+    return "\n".join(lines) + "\n" + canonical_form(rest)
+
+
+def identity_soup(copies):
+    """`copies` disconnected copies of (λx.x) y, with inputs y<i> and outputs out<i>"""
+    graph = Graph()
+    for i in range(copies):
+        l_node = graph.nodes[graph.add_node(NodeType.L)]
+        a_node = graph.nodes[graph.add_node(NodeType.A)]
+        graph.link(l_node.ports["left"], l_node.ports["middle"])
+        graph.link(l_node.ports["right"], a_node.ports["left"])
+        graph.link(graph.add_input(f"y{i}"), a_node.ports["right"])
+        graph.add_output(f"out{i}", a_node.ports["middle"])
+    return graph
+
+
+def rewrite_once(reaction, before, kind=None):
+    """Apply the single match of `reaction` (of the given kind) to a mol graph"""
+    graph = mol_graph(before)
+    matches = [match for match in reaction.can_apply(graph) if kind is None or match[0] == kind]
+    assert len(matches) == 1, matches
+    assert reaction.apply(graph, matches[0])
+    return graph
+
+
 def test_graph_creation():
     """Test basic graph creation"""
     print("Test 1: Graph Creation")
@@ -43,6 +141,16 @@ def test_connections():
     connected = graph.get_connected(l_node.ports["right"])
     assert connected == a_node.ports["left"]
     
+    # Ports are immutable named tuples; nodes have fixed attributes
+    port = l_node.ports["right"]
+    assert port == (l_id, "right", "out") and port.node_id == l_id
+    for target, attribute in ((port, "node_id"), (l_node, "label")):
+        try:
+            setattr(target, attribute, 0)
+        except AttributeError:
+            continue
+        raise AssertionError(f"{attribute} should not be settable")
+    
     print("  ✓ Node connections work")
     return True
 
@@ -96,6 +204,977 @@ def test_simulator():
     return True
 
 
+def test_chemski_reduction():
+    """Test chemSKI loader and rewrites"""
+    print("Test 5: chemSKI Reduction")
+    from chemski import SKI_REACTIONS, ski_to_graph, graph_to_ski
+    
+    free_vars = {}
+    graph = ski_to_graph("S (K (S I)) K x y", free_vars)
+    assert graph_to_ski(graph, free_vars) == "S (K (S I)) K x y"
+    
+    simulator = Simulator(graph, SKI_REACTIONS)
+    simulator.run(max_steps=100)
+    
+    assert graph_to_ski(simulator.graph, free_vars) == "y x"
+    assert 'S' in simulator.get_stats()['reaction_counts']
+    
+    # A term applied to itself through a fan-out has no finite reading,
+    # while sharing without a cycle reads back unshared
+    try:
+        graph_to_ski(mol_graph("FRIN x\nA p x m\nFO m p r\nFROUT r"))
+        assert False, "cyclic graph should be rejected"
+    except ValueError:
+        pass
+    shared = mol_graph("FRIN x\nFO x p q\nA p q r\nFROUT r")
+    assert graph_to_ski(shared, shared.inputs) == "x x"
+    
+    print("  ✓ chemSKI reduction works")
+    return True
+
+
+def test_reduction_cache():
+    """Test canonical hashing and the reduction cache"""
+    print("Test 6: Reduction Cache")
+    import tempfile
+    from chemski import SKI_REACTIONS, ski_to_graph
+    from chemlambda.canonical import canonical_hash
+    from chemlambda.cache import ReductionCache
+    
+    # Same molecule, nodes created in a different order
+    first_order = Graph()
+    a_id = first_order.add_node(NodeType.A)
+    t_id = first_order.add_node(NodeType.T)
+    first_order.connect(first_order.nodes[a_id].ports["middle"], first_order.nodes[t_id].ports["middle"])
+    second_order = Graph()
+    t_id = second_order.add_node(NodeType.T)
+    a_id = second_order.add_node(NodeType.A)
+    second_order.connect(second_order.nodes[a_id].ports["middle"], second_order.nodes[t_id].ports["middle"])
+    assert canonical_hash(first_order) == canonical_hash(second_order)
+    
+    graph = ski_to_graph("S K K x")
+    assert canonical_hash(graph) == canonical_hash(ski_to_graph("S K K x"))
+    assert canonical_hash(graph) != canonical_hash(ski_to_graph("S K S x"))
+    
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ReductionCache(max_entries=4, directory=directory)
+        first, stats = cache.reduce(graph, max_steps=100, reactions=SKI_REACTIONS)
+        assert not stats["cached"]
+        second, stats = cache.reduce(ski_to_graph("S K K x"), max_steps=100,
+                                     reactions=SKI_REACTIONS)
+        assert stats["cached"]
+        assert canonical_hash(first) == canonical_hash(second)
+        
+        # A fresh cache on the same directory hits the disk tier
+        cache = ReductionCache(directory=directory)
+        _, stats = cache.reduce(graph, max_steps=100, reactions=SKI_REACTIONS)
+        assert stats["cached"] and cache.get_stats()["disk_hits"] == 1
+    
+    # Terms differing only in their free variables do not share an entry
+    from lambda_compiler import compile_lambda_string, graph_to_lambda
+    cache = ReductionCache()
+    first, stats = cache.reduce(compile_lambda_string("(λz.z) (x y)"))
+    assert not stats["cached"] and repr(graph_to_lambda(first)) == "(x y)"
+    second, stats = cache.reduce(compile_lambda_string("(λz.z) (y x)"))
+    assert not stats["cached"] and repr(graph_to_lambda(second)) == "(y x)"
+    
+    # Reactions are told apart by class, not by name
+    from chemlambda.reactions import BetaReaction
+    
+    class RenamedBeta(BetaReaction):
+        pass
+    
+    assert RenamedBeta().get_name() == BetaReaction().get_name()
+    assert cache.key_for(graph, 100, [RenamedBeta()]) != cache.key_for(graph, 100, [BetaReaction()])
+    assert cache.key_for(graph, 100, [BetaReaction()]) != cache.key_for(graph, 200, [BetaReaction()])
+    
+    print("  ✓ Reduction cache works")
+    return True
+
+
+def test_graph_composition():
+    """Test merging graphs and linking named boundaries"""
+    print("Test 7: Graph Composition")
+    from chemski import SKI_REACTIONS, ski_to_graph, graph_to_ski
+    
+    # Module computing "K x y" and a module feeding its result to I
+    module = ski_to_graph("K x y")
+    program = ski_to_graph("I z")
+    offset = program.merge(module, prefix="m.")
+    assert offset > 0 and len(program.nodes) == offset + len(module.nodes)
+    assert set(program.inputs) == {"z", "m.x", "m.y"}
+    
+    # Arrow out ports must survive copying
+    arrow = program.add_node(NodeType.ARROW)
+    program.link(program.take_output("m.out"), program.nodes[arrow].ports["middle"])
+    program.add_output("m.out", program.nodes[arrow].ports["middle_out"])
+    assert program.clone().edges == program.edges
+    try:
+        program.link(program.nodes[arrow].ports["middle"], program.nodes[arrow].ports["middle"])
+        assert False, "linking an in port as source should fail"
+    except ValueError:
+        pass
+    
+    program.link_boundary("m.out", "z")
+    assert "z" not in program.inputs and "m.out" not in program.outputs
+    
+    names = {"x": program.inputs["m.x"], "y": program.inputs["m.y"]}
+    simulator = Simulator(program, SKI_REACTIONS)
+    simulator.run(max_steps=100)
+    assert graph_to_ski(simulator.graph, names) == "x"
+    
+    print("  ✓ Graph composition works")
+    return True
+
+
+def test_parallelism_profile():
+    """Test the causal work/span profile of a reduction"""
+    print("Test 8: Parallelism Profile")
+    from chemski import SKI_REACTIONS, ski_to_graph
+    
+    # Five independent BETA redexes can all fire in the first round
+    graph = Graph()
+    for _ in range(5):
+        l_node = graph.nodes[graph.add_node(NodeType.L)]
+        a_node = graph.nodes[graph.add_node(NodeType.A)]
+        graph.connect(l_node.ports["right"], a_node.ports["left"])
+        graph.connect(l_node.ports["left"], a_node.ports["middle"])
+    simulator = Simulator(graph)
+    simulator.run(max_steps=100, random_order=False)
+    profile = simulator.get_parallelism_profile()
+    assert profile["work"] == 5 and profile["span"] == 1
+    assert profile["rounds"] == [5]
+    assert simulator.estimated_speedup(2) == 5 / 3
+    
+    # In "K I x y" the I redex only exists after the K rewrite
+    simulator = Simulator(ski_to_graph("K I x y"), SKI_REACTIONS)
+    simulator.run(max_steps=100)
+    assert simulator.causal_parents == [(), (0,)]
+    assert simulator.get_parallelism_profile()["span"] == 2
+    
+    print("  ✓ Parallelism profile works")
+    return True
+
+
+def test_sharded_simulator():
+    """Test reducing a molecule split across worker processes"""
+    print("Test 9: Sharded Simulator")
+    from chemlambda.canonical import canonical_hash
+    from chemlambda.sharded import ShardedSimulator
+    
+    # Six copies of (λx.x) y over five shards: some redexes are cut in
+    # half and can only fire after a node migrates
+    graph = identity_soup(6)
+    
+    expected = Simulator(graph.clone())
+    expected.run(max_steps=100, random_order=False)
+    
+    with ShardedSimulator(graph, num_shards=5) as sharded:
+        assert sharded.cuts
+        assert sharded.run() == 6
+        result = sharded.collect()
+        stats = sharded.get_stats()
+    assert stats["migrations"] > 0
+    assert stats["reaction_counts"]["BETA"] == 6
+    assert canonical_hash(result) == canonical_hash(expected.graph)
+    
+    print("  ✓ Sharded simulator works")
+    return True
+
+
+def test_component_simulator():
+    """Test reducing disconnected molecules in a worker pool"""
+    print("Test 10: Component Simulator")
+    from chemlambda.canonical import canonical_hash
+    from chemlambda.components import ComponentSimulator, split_components
+    
+    # Four copies of (λx.x) y, plus a free-standing T node
+    soup = identity_soup(4)
+    soup.add_node(NodeType.T)
+    assert len(split_components(soup)) == 5
+    
+    expected = Simulator(soup.clone())
+    expected.run(max_steps=100, random_order=False)
+    
+    simulator = ComponentSimulator(soup, max_workers=2)
+    assert simulator.run(steps_per_round=1) == 4
+    result = simulator.get_graph()
+    assert canonical_hash(result) == canonical_hash(expected.graph)
+    assert set(result.outputs) == {"out0", "out1", "out2", "out3"}
+    assert simulator.get_stats()["reaction_counts"] == {"BETA": 4}
+    
+    print("  ✓ Component simulator works")
+    return True
+
+
+def test_gillespie_kinetics():
+    """Test continuous-time simulation with per-move rates"""
+    print("Test 11: Gillespie Kinetics")
+    import math
+    from chemlambda.kinetics import GillespieSimulator
+    
+    # Three BETA events, each leaving two Arrows that COMB removes at once
+    simulator = GillespieSimulator(identity_soup(3), rates={"COMB": math.inf}, seed=0)
+    assert simulator.propensities() == {"BETA": 3.0}
+    assert simulator.run() == 9
+    stats = simulator.get_stats()
+    assert stats["channel_counts"] == {"BETA": 3, "COMB": 6}
+    assert stats["species"]["L"] == 0 and stats["species"]["Arrow"] == 0
+    times = [time for time, _, _ in simulator.trajectory]
+    assert times == sorted(times) and times[-1] > 0
+    
+    # A zero rate switches a move off
+    assert GillespieSimulator(identity_soup(3), rates={"BETA": 0}).run() == 0
+    
+    print("  ✓ Gillespie kinetics works")
+    return True
+
+
+def test_state_space_explorer():
+    """Test exhaustive exploration of rewrite orders"""
+    print("Test 12: State-Space Explorer")
+    from chemlambda.explorer import explore
+    from chemski import SKI_REACTIONS, ski_to_graph, graph_to_ski
+    
+    # Three redexes in any order reach the same normal form
+    names = {}
+    result = explore(ski_to_graph("K (I x) (I y)", names), SKI_REACTIONS)
+    assert result["complete"] and result["confluent"] and result["terminating"]
+    assert result["divergent"] == []
+    (normal_form,) = result["normal_forms"].values()
+    assert graph_to_ski(normal_form["graph"], names) == "x"
+    assert normal_form["path"] == ["I", "I", "K"]
+    
+    # Worker processes sharing the visited set find the same state graph
+    shared = explore(ski_to_graph("K (I x) (I y)"), SKI_REACTIONS, processes=2)
+    assert (shared["states"], shared["transitions"]) == (result["states"], result["transitions"])
+    
+    # S I I (S I I) loops back to states it has already visited
+    result = explore(ski_to_graph("S I I (S I I)"), SKI_REACTIONS, max_states=200)
+    assert result["terminating"] is False and not result["complete"]
+    
+    # The bound holds inside a level: six independent redexes give 64
+    # states, 20 of them at depth 3
+    result = explore(ski_to_graph("f (I a) (I b) (I c) (I d) (I e) (I g)"), SKI_REACTIONS, max_states=10)
+    assert result["states"] == 10 and not result["complete"]
+    
+    print("  ✓ State-space explorer works")
+    return True
+
+
+def test_simulator_branch():
+    """Test forking random continuations from a shared prefix"""
+    print("Test 13: Simulator Branch")
+    import copy
+    import random
+    from chemski import SKI_REACTIONS, ski_to_graph
+    
+    simulator = Simulator(ski_to_graph("K (I x) (I y) (I z)"), SKI_REACTIONS)
+    simulator.run(max_steps=1, random_order=False)
+    prefix = [name for _, name, _ in simulator.reaction_history]
+    
+    def order(sim):
+        return [name for _, name, _ in sim.reaction_history]
+    
+    orders = simulator.branch(8, seeds=range(100, 108), summarize=order)
+    assert len(orders) == 8 and all(o[:1] == prefix for o in orders)
+    assert len(set(map(tuple, orders))) > 1
+    assert orders == simulator.branch(8, seeds=range(100, 108), summarize=order)
+    assert simulator.step_count == 1  # The parent never moves past the branch point
+    
+    # A continuation draws from its own generator, not the global one
+    state = random.getstate()
+    assert copy.deepcopy(simulator)._continue(100, 1000, order) == orders[0]
+    assert random.getstate() == state
+    
+    print("  ✓ Simulator branch works")
+    return True
+
+
+def test_run_budgets():
+    """Test termination reasons and resource budgets of Simulator.run"""
+    print("Test 14: Run Budgets")
+    from chemski import SKI_REACTIONS, ski_to_graph
+    
+    def run(term, **budgets):
+        simulator = Simulator(ski_to_graph(term), SKI_REACTIONS, record_history=False)
+        simulator.run(max_steps=500, random_order=False, **budgets)
+        return simulator
+    
+    assert run("K x y").termination_reason == "normal_form"
+    assert run("S I I (S I I)").termination_reason == "max_steps"
+    assert run("S I I (S I I)", check_period=5).termination_reason == "periodic"
+    
+    # S I (S I I) (S I (S I I)) keeps copying itself and grows without bound
+    growing = "S I (S I I) (S I (S I I))"
+    assert run(growing, max_growth=3).termination_reason == "exploding"
+    simulator = run(growing, max_nodes=40)
+    assert simulator.termination_reason == "max_nodes" and len(simulator.graph.nodes) > 40
+    assert run(growing, max_time=0.0).termination_reason == "max_time"
+    assert run(growing, max_memory=1).termination_reason == "max_memory"
+    assert simulator.get_stats()["termination_reason"] == "max_nodes"
+    
+    print("  ✓ Run budgets work")
+    return True
+
+
+def test_entropy_tracker():
+    """Test that incrementally tracked entropy matches a full recount"""
+    print("Test 15: Entropy Tracker")
+    import random
+    from chemlambda.entropy import EntropyTracker
+    from chemski import SKI_REACTIONS, ski_to_graph
+    
+    random.seed(3)
+    simulator = Simulator(ski_to_graph("S K K (K x (I y)) (I z)"), SKI_REACTIONS, record_history=False)
+    tracker = EntropyTracker(simulator.graph, SKI_REACTIONS)
+    while simulator.step():
+        tracker.update(simulator.last_touched)
+        fresh = EntropyTracker(simulator.graph, SKI_REACTIONS)
+        assert tracker.types.counts == fresh.types.counts
+        assert tracker.patterns[2].counts == fresh.patterns[2].counts
+        for name, value in fresh.measure().items():
+            assert abs(tracker.measure()[name] - value) < 1e-9
+    assert tracker.measure()["nodes"] == len(simulator.graph.nodes)
+    
+    print("  ✓ Entropy tracker works")
+    return True
+
+
+def test_match_cache():
+    """Test that matches are cached per graph modification epoch"""
+    print("Test 16: Match Cache")
+    import pickle
+    from chemlambda import create_simple_application
+    from chemlambda.reactions import BetaReaction
+    
+    class CountingBeta(BetaReaction):
+        calls = 0
+        
+        def can_apply(self, graph):
+            CountingBeta.calls += 1
+            return super().can_apply(graph)
+    
+    beta = CountingBeta()
+    graph = create_simple_application()
+    epoch = graph.epoch
+    assert len(graph.matches(beta)) == 1
+    graph.matches(beta).clear()  # Callers get their own list
+    assert len(graph.matches(beta)) == 1 and CountingBeta.calls == 1
+    
+    # Any modification invalidates the cache
+    graph.add_node(NodeType.T)
+    assert graph.epoch > epoch
+    assert len(graph.matches(beta)) == 1 and CountingBeta.calls == 2
+    
+    beta.apply(graph, graph.matches(beta)[0])
+    assert graph.matches(beta) == [] and CountingBeta.calls == 3
+    assert pickle.loads(pickle.dumps(graph))._match_cache == {}
+    
+    print("  ✓ Match cache works")
+    return True
+
+
+def test_running_stats():
+    """Test online mean, variance, min and max"""
+    print("Test 17: Running Statistics")
+    import statistics
+    from chemlambda.stats import RunningStats
+    
+    values = [2.0, 4.0, 4.0, 4.0, 5.0, 5.0, 7.0, 9.0, 1.5]
+    running = RunningStats(values)
+    assert running.count == len(values)
+    assert abs(running.mean - statistics.mean(values)) < 1e-12
+    assert abs(running.std - statistics.stdev(values)) < 1e-12
+    assert (running.min, running.max) == (1.5, 9.0)
+    
+    # Summaries of two halves merge into the summary of the whole
+    merged = RunningStats(values[:4])
+    merged.merge(RunningStats(values[4:]))
+    merged.merge(RunningStats())
+    for key, value in running.as_dict().items():
+        assert abs(merged.as_dict()[key] - value) < 1e-12
+    
+    assert RunningStats().as_dict()["mean"] == 0 and RunningStats([3.0]).std == 0.0
+    
+    # The 95% confidence interval narrows as 1/sqrt(n)
+    import math
+    assert RunningStats([1.0]).half_width() == math.inf
+    small, large = RunningStats([0.0, 1.0] * 50), RunningStats([0.0, 1.0] * 5000)
+    assert abs(small.half_width() / large.half_width() - 10) < 0.1
+    low, high = large.confidence_interval()
+    assert low < 0.5 < high and abs((high - low) - 2 * 1.96 * large.std / 100) < 1e-3
+    
+    print("  ✓ Running statistics work")
+    return True
+
+
+def test_parallel_step():
+    """Test synchronous rounds of non-conflicting rewrites"""
+    print("Test 18: Parallel Step")
+    from chemski import SKI_REACTIONS, ski_to_graph, graph_to_ski
+    
+    # K and the three I redexes share no node, so one round applies all four
+    names = {}
+    simulator = Simulator(ski_to_graph("K (I x) (I y) (I z)", names), SKI_REACTIONS)
+    assert simulator.run_parallel() == 1
+    assert simulator.round_sizes == [4] and simulator.step_count == 4
+    assert graph_to_ski(simulator.graph, names) == "x z"
+    assert simulator.parallel_step() == 0
+    assert simulator.get_stats()["rounds"] == 1
+    
+    # Same normal form as one rewrite at a time
+    names = {}
+    sequential = Simulator(ski_to_graph("S K K (K x (I y)) (I z)", names), SKI_REACTIONS)
+    sequential.run(random_order=False)
+    parallel = Simulator(ski_to_graph("S K K (K x (I y)) (I z)"), SKI_REACTIONS)
+    rounds = parallel.run_parallel(random_order=False)
+    assert graph_to_ski(parallel.graph, names) == graph_to_ski(sequential.graph, names)
+    assert rounds < sequential.step_count
+    
+    print("  ✓ Parallel step works")
+    return True
+
+
+def test_trajectory_writer():
+    """Test streaming trajectories to .npz and CSV"""
+    print("Test 19: Trajectory Writer")
+    import tempfile
+    import math
+    from chemlambda.trajectory import ENTROPY_METRICS, TrajectoryWriter, load_trajectory
+    from chemlambda.entropy import EntropyTracker
+    from chemski import SKI_REACTIONS, ski_to_graph
+    
+    with tempfile.TemporaryDirectory() as directory:
+        for suffix in (".npz", ".csv"):
+            path = os.path.join(directory, "run" + suffix)
+            simulator = Simulator(ski_to_graph("S K K (K x (I y)) (I z)"), SKI_REACTIONS,
+                                  record_history=False)
+            tracker = EntropyTracker(simulator.graph, SKI_REACTIONS)
+            # A small chunk size so rows are flushed several times
+            with TrajectoryWriter(path, chunk_size=2) as writer:
+                while simulator.step(random_order=False):
+                    tracker.update(simulator.last_touched)
+                    writer.record(simulator, tracker)
+            
+            columns = load_trajectory(path)
+            assert list(columns["step"]) == list(range(1, simulator.step_count + 1))
+            assert columns["nodes"][-1] == len(simulator.graph.nodes)
+            assert abs(columns["node_entropy"][-1] - tracker.node_entropy()) < 1e-12
+            names = [name for _, name, _ in simulator.reaction_history]
+            if suffix == ".npz":
+                codes = list(columns["reaction"])
+                assert [columns["reaction_names"][code] for code in codes] == names
+            else:
+                assert columns["reaction"] == names
+            
+            # Without a tracker the metric columns are NaN
+            path = os.path.join(directory, "plain" + suffix)
+            simulator = Simulator(ski_to_graph("K x y"), SKI_REACTIONS)
+            with TrajectoryWriter(path) as writer:
+                simulator.step()
+                writer.record(simulator)
+            columns = load_trajectory(path)
+            assert list(columns["nodes"]) == [len(simulator.graph.nodes)]
+            assert all(math.isnan(columns[name][0]) for name in ENTROPY_METRICS)
+    
+    print("  ✓ Trajectory writer works")
+    return True
+
+
+def test_motif_census():
+    """Test counting connected subgraphs by port-labelled motif"""
+    print("Test 20: Motif Census")
+    from chemlambda import create_simple_application
+    from chemlambda.motifs import MotifCensus, canonical_motif
+    
+    # L-A redex whose result feeds the right input of a second A
+    graph = create_simple_application()
+    census = MotifCensus(graph)
+    assert [census.total(size) for size in (1, 2, 3, 4)] == [3, 2, 1, 0]
+    assert census.counts_by_size(2)[(("A", "A"), ((0, "middle", 1, "right"),))] == 1
+    assert census.entropy(2) == 1.0 and census.entropy(3) == 0.0
+    
+    # Relabelling nodes does not change a motif
+    edges = [(0, "right", 1, "left"), (1, "middle", 2, "right")]
+    swapped = [(2, "right", 1, "left"), (1, "middle", 0, "right")]
+    assert canonical_motif(("L", "A", "A"), edges) == canonical_motif(("A", "A", "L"), swapped)
+    
+    # Two disjoint copies double every count
+    soup = Graph()
+    soup.merge(graph, prefix="a.")
+    soup.merge(graph, prefix="b.")
+    doubled = MotifCensus(soup)
+    for size in (1, 2, 3):
+        assert doubled.counts_by_size(size) == {motif: 2 * count
+                                               for motif, count in census.counts_by_size(size).items()}
+    
+    print("  ✓ Motif census works")
+    return True
+
+
+def test_force_layout():
+    """Test the Barnes-Hut force-directed layout"""
+    print("Test 21: Force Layout")
+    import math
+    from chemlambda.layout import default_iterations, force_layout
+    from chemlambda.visualizer_svg import SVGVisualizer
+    from chemski import SKI_REACTIONS, ski_to_graph
+    
+    graph = ski_to_graph("S (K (S I)) (S (K K) I) x y")
+    positions = force_layout(graph, 400, 300, seed=1)
+    assert set(positions) == set(graph.nodes)
+    assert all(0 <= x <= 400 and 0 <= y <= 300 for x, y in positions.values())
+    assert positions == force_layout(graph, 400, 300, seed=1)
+    
+    # Springs pull neighbors closer together than nodes are on average
+    edges = [math.dist(positions[p.node_id], positions[q.node_id]) for p, q in graph.edges.items()]
+    ids = sorted(positions)
+    pairs = [math.dist(positions[a], positions[b]) for a in ids for b in ids if a < b]
+    assert sum(edges) / len(edges) < 0.5 * sum(pairs) / len(pairs)
+    
+    # A warm start without iterations keeps the previous layout
+    again = force_layout(graph, 400, 300, iterations=0, initial=positions)
+    assert all(math.dist(again[node_id], positions[node_id]) < 1e-6 for node_id in positions)
+    
+    # After a rewrite, nodes that survive start where they were
+    simulator = Simulator(graph, SKI_REACTIONS)
+    simulator.step(random_order=False)
+    viz = SVGVisualizer(simulator.graph, 400, 300, positions=positions)
+    assert set(viz.node_positions) == set(simulator.graph.nodes)
+    assert "<circle" in viz.to_svg()
+    
+    # Large molecules get fewer default iterations
+    assert [default_iterations(n) for n in (0, 150, 500, 5000)] == [100, 100, 40, 20]
+    
+    print("  ✓ Force layout works")
+    return True
+
+
+def test_layout_session():
+    """Test the incremental layout session"""
+    print("Test 22: Layout Session")
+    import math
+    from chemlambda.layout import LayoutSession
+    from chemlambda.visualizer_svg import SVGVisualizer
+    from chemski import SKI_REACTIONS, ski_to_graph
+    
+    graph = ski_to_graph("S (K (S I)) (S (K K) I) x y")
+    simulator = Simulator(graph, SKI_REACTIONS)
+    session = LayoutSession(graph, seed=1)
+    before = session.positions(400, 300)
+    
+    simulator.step(random_order=False)
+    touched = simulator.last_touched
+    removed = [node_id for node_id in touched if node_id not in graph.nodes]
+    center = (sum(session.coordinates[node_id][0] for node_id in removed) / len(removed),
+              sum(session.coordinates[node_id][1] for node_id in removed) / len(removed))
+    session.frame_iterations = 0
+    session.update(touched)
+    assert set(session.coordinates) == set(graph.nodes)
+    # New nodes start around the centroid of the nodes they replace
+    for node_id in touched & graph.nodes.keys():
+        if node_id not in before:
+            assert math.dist(session.coordinates[node_id], center) < 1
+    
+    # Relaxation moves only nodes near the rewrite
+    session.frame_iterations = 5
+    coordinates = dict(session.coordinates)
+    simulator.step(random_order=False)
+    touched = simulator.last_touched
+    relaxed = session.update(touched)
+    region = touched & graph.nodes.keys()
+    for _ in range(session.radius):
+        region |= {graph.edges[port].node_id for node_id in region
+                   for port in graph.nodes[node_id].ports.values() if port in graph.edges}
+    assert relaxed == len(region) < len(graph.nodes)
+    outside = graph.nodes.keys() - region
+    assert outside and all(session.coordinates[node_id] == coordinates[node_id] for node_id in outside)
+    after = session.positions(400, 300)
+    assert all(0 <= x <= 400 and 0 <= y <= 300 for x, y in after.values())
+    
+    viz = SVGVisualizer(graph, 400, 300, layout="fixed", positions=after)
+    assert viz.node_positions == after
+    assert "<circle" in viz.to_svg()
+    
+    print("  ✓ Layout session works")
+    return True
+
+
+def test_streaming_writers():
+    """Test the streaming SVG and DOT writers"""
+    print("Test 23: Streaming SVG and DOT Writers")
+    import io
+    from chemlambda import create_simple_application
+    from chemlambda.visualizer_svg import SVGVisualizer, iter_edges, write_dot, write_svg
+    
+    graph = create_simple_application()
+    loop = graph.add_node(NodeType.ARROW)
+    arrow = graph.nodes[loop]
+    graph.connect(arrow.ports["middle_out"], arrow.ports["middle"])
+    
+    # Every edge once, including the loop, from out port to in port
+    edges = list(iter_edges(graph))
+    assert len(edges) == len(graph.edges) // 2
+    assert all(source.direction == "out" for source, target in edges if source.direction != target.direction)
+    
+    viz = SVGVisualizer(graph, 400, 300, layout="circle")
+    svg = viz.to_svg()
+    assert svg.startswith("<svg") and svg.rstrip().endswith("</svg>")
+    assert svg.count("<line") == len(edges)
+    assert svg.count("<circle") == len(graph.nodes)
+    
+    buffer = io.StringIO()
+    write_svg(graph, buffer, viz.node_positions, 400, 300)
+    assert buffer.getvalue() == svg
+    
+    buffer = io.StringIO()
+    write_dot(graph, buffer, viz.node_positions)
+    dot = buffer.getvalue()
+    assert dot.startswith("digraph") and dot.rstrip().endswith("}")
+    assert dot.count("->") == len(edges)
+    assert 'headlabel="middle"' in dot and "pos=" in dot
+    
+    # Subclasses restyle nodes through the color and label hooks
+    class Plain(SVGVisualizer):
+        def _get_node_color(self, node_type):
+            return "#000000"
+        
+        def _get_node_label(self, node_type):
+            return node_type.name.lower()
+    
+    svg = Plain(graph, 400, 300, layout="circle").to_svg()
+    assert svg.count('fill="#000000"') == len(graph.nodes) and ">l<" in svg
+    
+    print("  ✓ Streaming writers work")
+    return True
+
+
+def test_beta_loops():
+    """Test BETA on redexes whose ports loop back into the redex"""
+    print("Test 24: BETA Through Loops")
+    from chemlambda.reactions import BetaReaction
+    
+    # L 1 2 c, A c 4 3 → Arrow 1 3, Arrow 4 2
+    graph = rewrite_once(BetaReaction(), "FRIN a\nFRIN b\nL a x c\nA c b r\nFROUT x\nFROUT r")
+    assert wiring(graph) == wiring(mol_graph("FRIN a\nFRIN b\nArrow a r\nArrow b x\nFROUT x\nFROUT r"))
+    
+    # The bound variable is the argument: 2 = 4 leaves a closed Arrow
+    graph = rewrite_once(BetaReaction(), "FRIN a\nL a x c\nA c x r\nFROUT r")
+    assert wiring(graph) == wiring(mol_graph("FRIN a\nArrow a r\nFROUT r\nArrow x x"))
+    
+    # The result feeds the body: 1 = 3
+    graph = rewrite_once(BetaReaction(), "FRIN b\nL m x c\nA c b m\nFROUT x")
+    assert wiring(graph) == wiring(mol_graph("FRIN b\nArrow b x\nFROUT x\nArrow m m"))
+    
+    print("  ✓ BETA through loops works")
+    return True
+
+
+def test_dist_orientation():
+    """Test that the DIST moves wire the new nodes in the right orientation"""
+    print("Test 25: DIST Orientation")
+    from chemlambda.dist_reactions import DistReaction
+    
+    # Ports 2, 3, 4 of each rule end in outputs p, q, s
+    l_rule = "FRIN a\nFI j i p\nL k i q\nL l j s\nFOE a k l"
+    a_rule = "FRIN a\nFRIN b\nFOE a i j\nA i k q\nA j l s\nFOE b k l"
+    cases = [
+        ("FO_FOE", "FRIN a\nFO a p c\nFOE c q s", "FRIN a\nFI j i p\nFO k i q\nFO l j s\nFOE a k l"),
+        ("FI_FO", "FRIN a\nFRIN b\nFI a b c\nFO c q s", "FRIN a\nFRIN b\nFO a i j\nFI i k q\nFI j l s\nFO b k l"),
+        ("L_FO", "FRIN a\nL a p c\nFO c q s", l_rule),
+        ("L_FOE", "FRIN a\nL a p c\nFOE c q s", l_rule),
+        ("A_FO", "FRIN a\nFRIN b\nA a b c\nFO c q s", a_rule),
+        ("A_FOE", "FRIN a\nFRIN b\nA a b c\nFOE c q s", a_rule),
+    ]
+    for kind, before, after in cases:
+        outputs = "".join(f"\nFROUT {name}" for name in "pqs" if f" {name}" in before)
+        graph = rewrite_once(DistReaction(), before + outputs, kind)
+        assert wiring(graph) == wiring(mol_graph(after + outputs)), kind
+    
+    print("  ✓ DIST orientation works")
+    return True
+
+
+def test_fo_foe_side():
+    """Test that FO-FOE only applies to an FOE on the right output of the FO"""
+    print("Test 26: FO-FOE Matching")
+    from chemlambda.dist_reactions import DistReaction
+    
+    graph = mol_graph("FRIN a\nFO a c p\nFOE c q s\nFROUT p\nFROUT q\nFROUT s")
+    assert DistReaction().can_apply(graph) == []
+    
+    graph = mol_graph("FRIN a\nFO a p c\nFOE c q s\nFROUT p\nFROUT q\nFROUT s")
+    assert [match[0] for match in DistReaction().can_apply(graph)] == ["FO_FOE"]
+    
+    print("  ✓ FO-FOE matching works")
+    return True
+
+
+def test_l_t_pruning():
+    """Test that pruning an abstraction frees its variable"""
+    print("Test 27: L-T Pruning")
+    from chemlambda.reactions import PruningReaction
+    
+    # L 1 2 3, T 3 → T 1, FRIN 2
+    graph = rewrite_once(PruningReaction(), "FRIN a\nL a x c\nT c\nFROUT x", "L_T")
+    assert wiring(graph) == wiring(mol_graph("FRIN a\nT a\nFRIN x\nFROUT x"))
+    
+    # A 1 2 3, T 3 → T 1, T 2
+    graph = rewrite_once(PruningReaction(), "FRIN a\nFRIN b\nA a b c\nT c", "A_FI_T")
+    assert wiring(graph) == wiring(mol_graph("FRIN a\nFRIN b\nT a\nT b"))
+    
+    print("  ✓ L-T pruning works")
+    return True
+
+
+def test_fan_out_pruning():
+    """Test pruning of a terminated FO/FOE output"""
+    print("Test 28: FO/FOE-T Pruning")
+    from chemlambda.reactions import PruningReaction
+    
+    # FO 1 2 3, T 2 → Arrow 1 3, and symmetrically
+    for node_type in ("FO", "FOE"):
+        graph = rewrite_once(PruningReaction(), f"FRIN a\n{node_type} a t q\nT t\nFROUT q", "FO_T_left")
+        assert wiring(graph) == wiring(mol_graph("FRIN a\nArrow a q\nFROUT q"))
+        graph = rewrite_once(PruningReaction(), f"FRIN a\n{node_type} a p t\nT t\nFROUT p", "FO_T_right")
+        assert wiring(graph) == wiring(mol_graph("FRIN a\nArrow a p\nFROUT p"))
+    
+    print("  ✓ FO/FOE-T pruning works")
+    return True
+
+
+def test_comb_self_loop():
+    """Test that COMB merges Arrows but leaves a closed Arrow alone"""
+    print("Test 29: COMB Self-Loop Guard")
+    from chemlambda.reactions import CombReaction
+    
+    graph = rewrite_once(CombReaction(), "FRIN a\nArrow a b\nFROUT b")
+    assert wiring(graph) == wiring(mol_graph("FRIN a\nFROUT a"))
+    
+    graph = mol_graph("Arrow x x")
+    arrow_id = next(iter(graph.nodes))
+    assert CombReaction().can_apply(graph) == []
+    assert not CombReaction().apply(graph, (arrow_id,))
+    assert wiring(graph) == wiring(mol_graph("Arrow x x"))
+    
+    print("  ✓ COMB self-loop guard works")
+    return True
+
+
+def test_lambda_compiler():
+    """Test compiling lambda terms into one shared graph"""
+    print("Test 30: Lambda Compiler")
+    from lambda_compiler import LambdaTerm, compile_lambda_string, compile_to_graph
+    
+    # A variable used twice is shared through an FO
+    graph = compile_lambda_string("λx.x x")
+    assert wiring(graph) == wiring(mol_graph("L a x r\nFO x p q\nA q p a\nFROUT r"))
+    
+    # ... and k times through a balanced tree of k - 1 FOs
+    graph = compile_lambda_string("λx." + " ".join(["x"] * 8))
+    fo_ids = [node_id for node_id, node in graph.nodes.items() if node.node_type == NodeType.FO]
+    assert len(fo_ids) == 7
+    for node_id, node in graph.nodes.items():
+        if node.node_type != NodeType.A:
+            continue
+        for side in ("left", "right"):
+            depth = 0
+            port = graph.edges[node.ports[side]]
+            while graph.nodes[port.node_id].node_type == NodeType.FO:
+                depth += 1
+                port = graph.edges[graph.nodes[port.node_id].ports["middle"]]
+            assert port.node_id in graph.nodes and depth in (0, 3)
+    
+    # An unused binder is terminated with T
+    graph = compile_lambda_string("λx.λy.x")
+    assert wiring(graph) == wiring(mol_graph("L b x r\nL x y b\nT y\nFROUT r"))
+    
+    # Free variables become named FRIN inputs
+    var_map = {}
+    graph = compile_to_graph(LambdaTerm('app', func=LambdaTerm('var', value='f'),
+                                        arg=LambdaTerm('app', func=LambdaTerm('var', value='f'),
+                                                       arg=LambdaTerm('var', value='x'))), var_map)
+    assert var_map == graph.inputs and set(var_map) == {"f", "x"}
+    assert wiring(graph) == wiring(mol_graph("FRIN f\nFRIN x\nFO f p q\nA q i r\nA p x i\nFROUT r"))
+    
+    # A term far deeper than the recursion limit
+    depth = 100000
+    term = LambdaTerm('var', value='x')
+    for _ in range(depth):
+        term = LambdaTerm('app', func=LambdaTerm('var', value='f'), arg=term)
+    graph = compile_to_graph(LambdaTerm('abs', var='f', body=term))
+    counts = {}
+    for node in graph.nodes.values():
+        counts[node.node_type] = counts.get(node.node_type, 0) + 1
+    assert counts[NodeType.A] == depth and counts[NodeType.FO] == depth - 1
+    assert counts[NodeType.L] == 1 and counts[NodeType.FRIN] == 1
+    
+    print("  ✓ Lambda compiler works")
+    return True
+
+
+def test_lambda_parser():
+    """Test the iterative lambda term parser and printer"""
+    print("Test 31: Lambda Parser")
+    from lambda_compiler import parse_lambda_term
+    
+    # Printing and parsing again gives the same term
+    for text, printed in [
+        ("x", "x"),
+        ("f x y", "((f x) y)"),
+        ("f (x y)", "(f (x y))"),
+        ("λx y.x", "λx.λy.x"),
+        ("\\x.x x", "λx.(x x)"),
+        ("(λx.x) y", "((λx.x) y)"),
+        ("f (λx.x) z", "((f λx.x) z)"),
+        ("(λf.λx.f (f x)) (λy.y) z", "(((λf.λx.(f (f x))) λy.y) z)"),
+    ]:
+        term = parse_lambda_term(text)
+        assert repr(term) == printed, (text, repr(term))
+        assert repr(parse_lambda_term(repr(term))) == printed
+    
+    for bad in ["(x y", "x y)", "λx.", "()", "λ.x", "x . y", "λx y", "x $ y"]:
+        try:
+            parse_lambda_term(bad)
+        except ValueError:
+            continue
+        raise AssertionError(f"{bad!r} should not parse")
+    
+    # Nesting far beyond the recursion limit
+    depth = 100000
+    term = parse_lambda_term("λx." * depth + "(" * depth + "x" + ")" * depth)
+    assert repr(term) == "λx." * depth + "x"
+    term = parse_lambda_term("f (" * depth + "x" + ")" * depth)
+    printed = repr(term)
+    assert printed == "(f " * depth + "x" + ")" * depth
+    assert repr(parse_lambda_term(printed)) == printed
+    
+    print("  ✓ Lambda parser works")
+    return True
+
+
+def test_church_numeral():
+    """Test the directly built Church numerals"""
+    print("Test 32: Church Numerals")
+    from church_encodings import church_numeral
+    from lambda_compiler import compile_lambda_string
+    from result_extractor import decode_church_numeral
+    
+    for n in (0, 1, 2, 1000):
+        numeral = church_numeral(n)
+        assert decode_church_numeral(numeral) == n
+        fo_count = sum(node.node_type == NodeType.FO for node in numeral.nodes.values())
+        assert fo_count == max(n - 1, 0)
+        
+        # Successor of the numeral, reduced by the simulator
+        graph = compile_lambda_string("(λn.λf.λx.f (n f x)) m")
+        graph.merge(numeral, prefix="numeral_")
+        graph.link_boundary("numeral_out", "m")
+        simulator = Simulator(graph, record_history=False)
+        simulator.run(max_steps=100000, random_order=False)
+        assert decode_church_numeral(simulator.graph) == n + 1
+    
+    # f reaches each application through a balanced FO tree
+    numeral = church_numeral(1000)
+    for node in numeral.nodes.values():
+        if node.node_type == NodeType.A:
+            depth = 0
+            port = numeral.edges[node.ports["left"]]
+            while numeral.nodes[port.node_id].node_type == NodeType.FO:
+                depth += 1
+                port = numeral.edges[numeral.nodes[port.node_id].ports["middle"]]
+            assert depth <= 10
+    
+    print("  ✓ Church numerals work")
+    return True
+
+
+def test_lambda_readback():
+    """Test reading graphs back as lambda terms"""
+    print("Test 33: Lambda Readback")
+    from lambda_compiler import compile_lambda_string, graph_to_lambda, parse_lambda_term, to_de_bruijn
+    from result_extractor import extract_result
+    
+    # Compiling and reading back gives the same term up to bound variable names
+    for text in ["x", "λx.x", "λx.λy.y", "λf.λx.f (f x)", "λx.x x x", "f (g x) (λy.y f)",
+                 "(λx.x) (λy.y y)", "λa.λb.λc.a c (b c)"]:
+        term = graph_to_lambda(compile_lambda_string(text))
+        assert to_de_bruijn(term) == to_de_bruijn(parse_lambda_term(text)), text
+    
+    # Free variables keep their names, bound ones avoid them
+    term = graph_to_lambda(compile_lambda_string("λy.x0 y"))
+    assert repr(term) == "λx0'.(x0 x0')"
+    
+    # De Bruijn form identifies α-equivalent terms only
+    assert to_de_bruijn(parse_lambda_term("λx.λy.x y")) == "λλ(1 0)"
+    assert to_de_bruijn(parse_lambda_term("λa.λb.a b")) == "λλ(1 0)"
+    assert to_de_bruijn(parse_lambda_term("λa.λb.b a")) == "λλ(0 1)"
+    assert to_de_bruijn(parse_lambda_term("λx.λx.x")) == "λλ0"
+    assert to_de_bruijn(parse_lambda_term("λx.y")) == "λy"
+    
+    assert extract_result(compile_lambda_string("λf.λx.f (f (f x))")) == ("number", 3)
+    assert extract_result(compile_lambda_string("λx.λy.x")) == ("boolean", True)
+    
+    # Graphs that are not terms read back as None: a cycle, a dangling
+    # port and a node without lambda meaning
+    assert graph_to_lambda(mol_graph("FRIN x\nFO m r y\nA y x m\nFROUT r")) is None
+    assert graph_to_lambda(mol_graph("A f x r\nFRIN x\nFROUT r")) is None
+    assert graph_to_lambda(mol_graph("FRIN a\nFRIN b\nFI a b r\nFROUT r")) is None
+    
+    print("  ✓ Lambda readback works")
+    return True
+
+
+def test_adaptive_batch():
+    """Test stopping a batch once its confidence intervals are narrow enough"""
+    print("Test 34: Adaptive Batch")
+    import contextlib
+    import io
+    from batch_entropy_analysis import BatchEntropyAnalyzer, CONVERGENCE_FIELDS
+    
+    analyzer = BatchEntropyAnalyzer()
+    assert not analyzer.has_converged(1.0)
+    
+    # One redex: every run gives the same values, so the intervals have
+    # zero width as soon as min_runs results are in
+    def single_pair(seed=None):
+        return analyzer.create_random_graph(num_pairs=1, seed=0)
+    
+    with contextlib.redirect_stdout(io.StringIO()):
+        stats = analyzer.run_batch(single_pair, num_runs=50, max_steps=5, processes=False,
+                                   target_width=0.01, min_runs=5)
+    assert stats["converged"] and stats["num_runs"] == analyzer.completed == 5
+    assert analyzer.has_converged(0.0)
+    
+    # Random graphs differ from run to run: the budget runs out first
+    def random_pairs(seed=None):
+        return analyzer.create_random_graph(num_pairs=6, seed=seed)
+    
+    with contextlib.redirect_stdout(io.StringIO()):
+        stats = analyzer.run_batch(random_pairs, num_runs=8, max_steps=5, processes=False,
+                                   target_width=1e-6, min_runs=3)
+    assert not stats["converged"] and stats["num_runs"] == 8
+    assert not analyzer.has_converged(1e-6)
+    
+    # Widths can be given per metric; metrics left out are not checked
+    wide = {target: 1e6 for target in CONVERGENCE_FIELDS}
+    assert analyzer.has_converged(wide)
+    assert not analyzer.has_converged({**wide, ("initial", "node_entropy"): 1e-6})
+    assert analyzer.has_converged({("simulation", "final_nodes"): 1e6})
+    
+    # Seeded runs use their own generators and leave the global one alone
+    import random
+    state = random.getstate()
+    first = analyzer.run_single_simulation(random_pairs(seed=5), max_steps=5, seed=5)
+    assert random.getstate() == state
+    again = analyzer.run_single_simulation(random_pairs(seed=5), max_steps=5, seed=5)
+    assert first["final"] == again["final"] and first["steps"] == again["steps"]
+    
+    print("  ✓ Adaptive batch works")
+    return True
+
+
 def run_all_tests():
     """Run all tests"""
     print("=" * 60)
@@ -108,6 +1187,36 @@ def run_all_tests():
         test_connections,
         test_beta_reaction,
         test_simulator,
+        test_chemski_reduction,
+        test_reduction_cache,
+        test_graph_composition,
+        test_parallelism_profile,
+        test_sharded_simulator,
+        test_component_simulator,
+        test_gillespie_kinetics,
+        test_state_space_explorer,
+        test_simulator_branch,
+        test_run_budgets,
+        test_entropy_tracker,
+        test_match_cache,
+        test_running_stats,
+        test_parallel_step,
+        test_trajectory_writer,
+        test_motif_census,
+        test_force_layout,
+        test_layout_session,
+        test_streaming_writers,
+        test_beta_loops,
+        test_dist_orientation,
+        test_fo_foe_side,
+        test_l_t_pruning,
+        test_fan_out_pruning,
+        test_comb_self_loop,
+        test_lambda_compiler,
+        test_lambda_parser,
+        test_church_numeral,
+        test_lambda_readback,
+        test_adaptive_batch,
     ]
     
     passed = 0